@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from core.kpi import kpi_delta
+from utils.helpers import format_currency
+from utils.resources import get_average_risk_score, get_kpi_deltas, get_portfolio_cube
 
 st.set_page_config(
     page_title="Dashboard - KCB SmartCredit",
@@ -30,51 +33,64 @@ st.markdown("""
 st.title("🏠 Dashboard Overview")
 st.markdown("Comprehensive view of your credit portfolio performance and key metrics")
 
-# KPI Metrics with enhanced styling
+# KPI Metrics with enhanced styling, with deltas against the previous portfolio snapshot
+kpis = get_kpi_deltas()
+value = kpis['value']
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-    st.metric("Total Portfolio", "KES 245.7M", "2.1%")
-    st.caption("📈 +KES 5.1M this month")
+    st.metric("Total Portfolio", format_currency(value['total_outstanding']), kpi_delta(kpis, 'total_outstanding'))
+    change = kpis.at['total_outstanding', 'change']
+    st.caption("📈 No earlier snapshot" if np.isnan(change)
+               else f"📈 {'+' if change >= 0 else '-'}{format_currency(abs(change))} since the last snapshot")
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col2:
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-    st.metric("Active Loans", "1,247", "+18")
-    st.caption("🏦 89.3% performing")
+    st.metric("Active Loans", f"{value['open_loans']:,.0f}", kpi_delta(kpis, 'open_loans', digits=0))
+    st.caption(f"🏦 {100 - value['npl_ratio']:.1f}% performing")
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col3:
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-    st.metric("Avg. Loan Size", "KES 197K", "-3.2%")
+    st.metric("Avg. Loan Size", format_currency(value['average_loan_size']), kpi_delta(kpis, 'average_loan_size'))
     st.caption("📊 Diversified portfolio")
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col4:
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-    st.metric("Recovery Rate", "78.5%", "+5.2%")
-    st.caption("🎯 Above target (75%)")
+    st.metric("Recovery Rate", f"{value['recovery_rate']:.1f}%", kpi_delta(kpis, 'recovery_rate', '%'))
+    st.caption("🎯 Above target (75%)" if value['recovery_rate'] >= 75 else "🎯 Below target (75%)")
     st.markdown('</div>', unsafe_allow_html=True)
 
 # Additional metrics row
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric("NPL Ratio", "8.2%", "-1.2%", delta_color="inverse")
+    st.metric("NPL Ratio", f"{value['npl_ratio']:.1f}%", kpi_delta(kpis, 'npl_ratio', '%'), delta_color="inverse")
 
 with col2:
-    st.metric("Risk Score", "64.2", "-2.1")
+    # Saved borrower scores are not part of the snapshot, so there is no earlier value to compare
+    risk_score = get_average_risk_score()
+    st.metric("Risk Score", "Not scored" if risk_score is None else f"{risk_score:.1f}")
 
 with col3:
-    st.metric("Restructured", "47", "+5")
+    st.metric("Restructured", f"{value['restructured_loans']:,.0f}", kpi_delta(kpis, 'restructured_loans', digits=0))
 
 with col4:
+    # Illustrative: the store keeps no per-period collections to total yet
     st.metric("Collections", "KES 12.4M", "+1.2M")
 
-# Charts using native Streamlit
+# Charts using native Streamlit; breakdowns are roll-ups of the cached portfolio cube
 st.subheader("📊 Portfolio Analytics")
 
+cube = get_portfolio_cube()
+total_outstanding = cube.totals()['outstanding']
+
+def portfolio_share(outstanding):
+    return (outstanding / total_outstanding * 100 if total_outstanding else outstanding * 0).map('{:.1f}%'.format)
+
 col1, col2 = st.columns(2)
 
 with col1:
@@ -96,11 +112,11 @@ with col1:
 with col2:
     # Loan distribution by product
     st.write("**Loan Distribution by Product Type**")
+    products = cube.rollup('product_type')
     product_data = pd.DataFrame({
-        'Product': ['Personal Loans', 'Business Loans', 'Mortgages', 'Auto Loans', 'SME Credit'],
-        'Count': [450, 320, 280, 150, 47],
-        'Value (KES M)': [85.5, 98.2, 45.3, 12.5, 4.2]
-    })
+        'Count': products['loans'],
+        'Value (KES M)': (products['outstanding'] / 1e6).round(1)
+    }).rename_axis('Product').reset_index()
     
     st.bar_chart(product_data, x='Product', y='Count')
 
@@ -120,20 +136,20 @@ with col1:
 
 with col2:
     st.write("**Top Performing Sectors**")
+    sectors = cube.rollup('segment').sort_values('npl_ratio').head(5)
     sectors_data = pd.DataFrame({
-        'Sector': ['Services', 'Manufacturing', 'Healthcare', 'Education', 'Retail'],
-        'Growth': ['+12.5%', '+8.7%', '+15.2%', '+6.3%', '+4.1%'],
-        'NPL Ratio': ['3.2%', '5.1%', '2.8%', '4.5%', '6.7%']
-    })
+        'Share': portfolio_share(sectors['outstanding']),
+        'NPL Ratio': sectors['npl_ratio'].map('{:.1f}%'.format)
+    }).rename_axis('Sector').reset_index()
     st.dataframe(sectors_data, use_container_width=True, hide_index=True)
 
 with col3:
     st.write("**Regional Performance**")
+    regions = cube.rollup('region').sort_values('outstanding', ascending=False)
     region_data = pd.DataFrame({
-        'Region': ['Nairobi', 'Coast', 'Central', 'Rift Valley', 'Western'],
-        'Portfolio (KES M)': [145.2, 38.7, 42.3, 15.8, 3.7],
-        'Growth': ['+3.2%', '+1.8%', '+2.5%', '+4.1%', '+0.8%']
-    })
+        'Portfolio (KES M)': (regions['outstanding'] / 1e6).round(1),
+        'Share': portfolio_share(regions['outstanding'])
+    }).rename_axis('Region').reset_index()
     st.dataframe(region_data, use_container_width=True, hide_index=True)
 
 # Recent alerts with enhanced styling
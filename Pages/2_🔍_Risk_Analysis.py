@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from core.factors import describe_factors, risk_factor_mask
+from core.models import assess_application
+from utils.resources import HEATMAP_ROWS, get_model_registry, get_risk_heatmap
 
 st.set_page_config(
     page_title="Risk Analysis - KCB SmartCredit",
@@ -32,82 +35,35 @@ with col1:
     if st.button("Assess Risk", type="primary"):
         st.success("Risk assessment completed!")
         
-        # Calculate risk score based on inputs
-        debt_to_income = (existing_debt + loan_amount) / (monthly_income * 12) * 100
-        risk_score = min(100, max(20, debt_to_income + (120 - credit_history) * 0.5))
-        
-        # Determine risk band
-        if risk_score >= 80:
-            risk_band = "Critical"
-            risk_color = "red"
-        elif risk_score >= 60:
-            risk_band = "High"
-            risk_color = "orange"
-        elif risk_score >= 40:
-            risk_band = "Medium" 
-            risk_color = "yellow"
-        else:
-            risk_band = "Low"
-            risk_color = "green"
+        # Score the application with the active risk model, banded with the saved Admin thresholds;
+        # repeat and what-if assessments of the same inputs come from the assessment cache
+        assessment = assess_application(monthly_income, existing_debt, loan_amount, credit_history,
+                                        st.session_state.get('risk_thresholds'), get_model_registry())
+        debt_to_income = assessment['debt_to_income']
+        risk_score = assessment['risk_score']
+        risk_band = assessment['risk_band']
+        risk_color = {'Critical': 'red', 'High': 'orange', 'Medium': 'yellow', 'Low': 'green'}[risk_band]
         
         st.metric("Risk Score", f"{risk_score:.1f}/100")
         st.markdown(f"**Risk Band:** :{risk_color}[{risk_band} Risk]")
         
         # Risk factors
         st.subheader("Key Risk Factors")
-        risk_factors = []
+        factor_mask = risk_factor_mask(debt_to_income, credit_history, employment_type, monthly_income, loan_amount)
         
-        if debt_to_income > 50:
-            risk_factors.append(f"High debt-to-income ratio ({debt_to_income:.1f}%)")
-        if credit_history < 24:
-            risk_factors.append("Limited credit history")
-        if employment_type == "Self-Employed":
-            risk_factors.append("Variable income source")
-        if monthly_income < 100000:
-            risk_factors.append("Low income level")
-        if loan_amount > monthly_income * 6:
-            risk_factors.append("High loan-to-income ratio")
-            
-        if not risk_factors:
-            risk_factors.append("No major risk factors identified")
-            
-        for factor in risk_factors:
+        for factor in describe_factors(factor_mask, debt_to_income):
             st.write(f"• {factor}")
 
 with col2:
     st.subheader("Portfolio Risk Heatmap")
     
-    # Generate sample heatmap data
-    sectors = ['Agriculture', 'Manufacturing', 'Services', 'Retail', 'Tourism']
-    risk_bands = ['Low', 'Medium', 'High', 'Critical']
-    
-    # Create a matrix for the heatmap
-    heatmap_data = []
-    for i, sector in enumerate(sectors):
-        row_data = {'Sector': sector}
-        for j, band in enumerate(risk_bands):
-            # Create a pattern where risk increases diagonally
-            count = max(5, 50 - (i * 10) - (j * 8) + np.random.randint(-5, 5))
-            row_data[band] = count
-        heatmap_data.append(row_data)
-    
-    heatmap_df = pd.DataFrame(heatmap_data)
+    # Loans by sector and risk band from the portfolio snapshot, the same cached heatmap as main.py
+    granularity = st.radio("Heatmap rows", list(HEATMAP_ROWS), horizontal=True)
+    heatmap, styles = get_risk_heatmap(HEATMAP_ROWS[granularity])
     
-    # Display as a styled dataframe (heatmap alternative)
+    # Display as a styled dataframe; the style matrix is precomputed, coloured by each band's share of the row
     st.write("**Risk Distribution by Sector**")
-    
-    def color_risk_cells(val):
-        if val > 40:
-            return 'background-color: #d4edda'  # Green for low risk
-        elif val > 25:
-            return 'background-color: #fff3cd'  # Yellow for medium risk
-        elif val > 15:
-            return 'background-color: #ffeaa7'  # Orange for high risk
-        else:
-            return 'background-color: #f8d7da'  # Red for critical
-    
-    display_df = heatmap_df.set_index('Sector')
-    st.dataframe(display_df.style.applymap(color_risk_cells), use_container_width=True)
+    st.dataframe(heatmap.style.apply(lambda _: styles, axis=None), use_container_width=True)
     
     # Risk over time - using native Streamlit charts
     st.subheader("Risk Trend Analysis")
@@ -204,7 +160,7 @@ if st.button("Generate Risk Analysis Report"):
         st.json(report_data)
         
         # Provide download option
-        csv_data = heatmap_df.to_csv(index=False)
+        csv_data = heatmap.reset_index().to_csv(index=False)
         st.download_button(
             label="Download Risk Data as CSV",
             data=csv_data,
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from core.affordability import calculate_affordability_batch
 
 st.set_page_config(
     page_title="Restructuring - KCB SmartCredit",
@@ -49,17 +50,19 @@ with col1:
     term_extension = st.slider("Proposed Term Extension (Months)", 0, 24, 12)
     interest_reduction = st.slider("Interest Rate Reduction (%)", 0.0, 5.0, 1.5, step=0.1)
     
-    # Calculate affordability metrics
+    # Calculate affordability for the current and proposed (38% lower) payment in one pass
+    affordability = calculate_affordability_batch(
+        borrower_income, monthly_expenses, [current_payment, current_payment * 0.62]
+    )
     disposable_income = borrower_income - monthly_expenses
-    current_affordability_ratio = current_payment / disposable_income if disposable_income > 0 else 1
+    current_affordability_ratio, new_affordability_ratio = affordability['affordability_ratio']
     
     st.write("### Affordability Assessment")
     col_a, col_b = st.columns(2)
     with col_a:
         st.metric("Disposable Income", f"KES {disposable_income:,}")
     with col_b:
-        affordability_status = "Good" if current_affordability_ratio < 0.4 else "Fair" if current_affordability_ratio < 0.6 else "Poor"
-        st.metric("Affordability", affordability_status)
+        st.metric("Affordability", affordability['status'].iloc[0])
     
     if st.button("Generate Restructuring Proposal", type="primary"):
         st.success("AI restructuring proposal generated!")
@@ -67,7 +70,6 @@ with col1:
         # Calculate proposed payment (simplified logic)
         proposed_payment = current_payment * 0.62  # 38% reduction
         payment_reduction = ((current_payment - proposed_payment) / current_payment) * 100
-        new_affordability_ratio = proposed_payment / disposable_income if disposable_income > 0 else 1
         affordability_improvement = ((current_affordability_ratio - new_affordability_ratio) / current_affordability_ratio) * 100
         
         # Display proposal in a nice card
@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from core.kpi import kpi_delta
+from utils.helpers import format_currency
+from utils.resources import get_kpi_deltas, get_portfolio_cube
 
 st.set_page_config(
     page_title="Portfolio Overview - KCB SmartCredit",
@@ -39,30 +42,35 @@ st.markdown("""
 st.title("📊 Portfolio Overview")
 st.markdown("Comprehensive analysis of your loan portfolio performance")
 
-# Portfolio metrics with enhanced styling
+# Portfolio metrics with enhanced styling, with deltas against the previous portfolio snapshot
+kpis = get_kpi_deltas()
+value = kpis['value']
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
     st.markdown('<div class="portfolio-card">', unsafe_allow_html=True)
-    st.metric("Total Outstanding", "KES 245.7M", "2.1%")
-    st.caption("📈 +KES 5.1M this month")
+    st.metric("Total Outstanding", format_currency(value['total_outstanding']), kpi_delta(kpis, 'total_outstanding'))
+    change = kpis.at['total_outstanding', 'change']
+    st.caption("📈 No earlier snapshot" if np.isnan(change)
+               else f"📈 {'+' if change >= 0 else '-'}{format_currency(abs(change))} since the last snapshot")
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col2:
     st.markdown('<div class="portfolio-card">', unsafe_allow_html=True)
-    st.metric("NPL Ratio", "8.2%", "-1.2%", delta_color="inverse")
+    st.metric("NPL Ratio", f"{value['npl_ratio']:.1f}%", kpi_delta(kpis, 'npl_ratio', '%'), delta_color="inverse")
     st.caption("🎯 Target: <7.5%")
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col3:
     st.markdown('<div class="portfolio-card">', unsafe_allow_html=True)
-    st.metric("Avg. Days Past Due", "14.2", "+0.8", delta_color="inverse")
-    st.caption("📊 30+ DPD: 89 loans")
+    st.metric("Avg. Days Past Due", f"{value['average_dpd']:.1f}", kpi_delta(kpis, 'average_dpd'),
+              delta_color="inverse")
+    st.caption(f"📊 90+ DPD: {value['npl_count']:,.0f} loans")
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col4:
     st.markdown('<div class="portfolio-card">', unsafe_allow_html=True)
-    st.metric("Recovery Rate", "78.5%", "+5.2%")
+    st.metric("Recovery Rate", f"{value['recovery_rate']:.1f}%", kpi_delta(kpis, 'recovery_rate', '%'))
     st.caption("💪 Above industry average")
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -70,7 +78,7 @@ with col4:
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric("Portfolio Yield", "15.2%", "+0.3%")
+    st.metric("Portfolio Yield", f"{value['portfolio_yield']:.1f}%", kpi_delta(kpis, 'portfolio_yield', '%'))
 
 with col2:
     st.metric("Cost of Risk", "1.8%", "-0.2%")
@@ -81,20 +89,26 @@ with col3:
 with col4:
     st.metric("ROA", "2.8%", "+0.4%")
 
-# Portfolio composition
+# Portfolio composition, rolled up from the cached portfolio cube of the current snapshot
 st.subheader("🏗️ Portfolio Composition")
 
+cube = get_portfolio_cube()
+total_outstanding = cube.totals()['outstanding']
+
+def portfolio_share(outstanding):
+    return (outstanding / total_outstanding * 100 if total_outstanding else outstanding * 0).map('{:.1f}%'.format)
+
 col1, col2 = st.columns(2)
 
 with col1:
     # By sector - using native Streamlit
     st.write("**Portfolio Distribution by Sector**")
+    sectors = cube.rollup('segment')
     sector_data = pd.DataFrame({
-        'Sector': ['Agriculture', 'Manufacturing', 'Services', 'Retail', 'Tourism', 'Other'],
-        'Value (KES M)': [45.0, 68.0, 55.7, 34.2, 23.8, 19.0],
-        'Loans': [230, 320, 280, 180, 95, 142],
-        'Growth': ['+2.1%', '+3.8%', '+1.5%', '-0.8%', '+5.2%', '+1.1%']
-    })
+        'Value (KES M)': (sectors['outstanding'] / 1e6).round(1),
+        'Loans': sectors['loans'],
+        'Share': portfolio_share(sectors['outstanding'])
+    }).rename_axis('Sector').reset_index()
     
     # Display as bar chart
     st.bar_chart(sector_data.set_index('Sector')['Value (KES M)'])
@@ -106,12 +120,12 @@ with col1:
 with col2:
     # By product type - using native Streamlit
     st.write("**NPL Ratio by Product Type**")
+    products = cube.rollup('product_type')
     product_data = pd.DataFrame({
-        'Product': ['Personal Loans', 'Business Loans', 'Mortgages', 'Auto Loans', 'SME Credit'],
-        'NPL Ratio': [6.2, 9.8, 3.4, 5.1, 11.2],
-        'Avg. Risk Score': [58, 72, 45, 52, 68],
-        'Portfolio Share': ['34.8%', '40.0%', '18.4%', '5.1%', '1.7%']
-    })
+        'NPL Ratio': products['npl_ratio'].round(1),
+        'Avg. Credit Score': products['average_score'].round(0),
+        'Portfolio Share': portfolio_share(products['outstanding'])
+    }).rename_axis('Product').reset_index()
     
     # Display as bar chart
     st.bar_chart(product_data.set_index('Product')['NPL Ratio'])
@@ -185,11 +199,11 @@ with col1:
 
 with col2:
     st.write("**Geographic Distribution**")
+    regions = cube.rollup('region').sort_values('outstanding', ascending=False)
     geo_data = pd.DataFrame({
-        'Region': ['Nairobi', 'Central', 'Coast', 'Rift Valley', 'Western', 'Eastern'],
-        'Portfolio (KES M)': [145.2, 38.7, 28.4, 15.8, 12.3, 5.3],
-        'Growth': ['+3.2%', '+1.8%', '+2.1%', '+4.1%', '+0.8%', '+1.2%']
-    })
+        'Portfolio (KES M)': (regions['outstanding'] / 1e6).round(1),
+        'Share': portfolio_share(regions['outstanding'])
+    }).rename_axis('Region').reset_index()
     st.dataframe(geo_data, use_container_width=True, hide_index=True)
 
 with col3:
@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from core.cache import dataset_cache
+from core.models import MODEL_NAMES, assessment_cache
+from core.risk import risk_thresholds
+from utils.resources import get_model_registry
 
 st.set_page_config(
     page_title="Admin - KCB SmartCredit",
@@ -44,9 +48,16 @@ with tab1:
     with col1:
         st.markdown('<div class="admin-card">', unsafe_allow_html=True)
         st.write("**Model Version Control**")
-        st.selectbox("Active Risk Model Version", ["v2.1.0 (Production)", "v2.0.0", "v1.5.0"], key="risk_model")
-        st.selectbox("NPL Forecast Model", ["v1.2.0 (Production)", "v1.1.0"], key="npl_model")
-        st.selectbox("Restructuring Optimizer", ["v1.0.0 (Production)"], key="restructure_model")
+        registry = get_model_registry()
+        selected = {}
+        for kind, label, key in [('risk', "Active Risk Model Version", "risk_model"),
+                                 ('npl_forecast', "NPL Forecast Model", "npl_model"),
+                                 ('restructuring', "Restructuring Optimizer", "restructure_model")]:
+            versions = registry.versions(kind)
+            active = registry.active_version(kind)
+            selected[kind] = st.selectbox(label, versions, index=versions.index(active), key=key,
+                                          format_func=lambda version, active=active: (
+                                              f"{version} (Active)" if version == active else version))
         st.markdown('</div>', unsafe_allow_html=True)
         
         st.markdown('<div class="admin-card">', unsafe_allow_html=True)
@@ -61,7 +72,14 @@ with tab1:
                 st.success("Model retraining scheduled for tonight!")
         with train_col2:
             if st.button("🚀 Deploy to Production", use_container_width=True):
-                st.info("Model deployment initiated...")
+                # Each new version is loaded before the pointer swaps, so scoring never waits on it
+                changed = {kind: version for kind, version in selected.items()
+                           if version != registry.active_version(kind)}
+                for kind, version in changed.items():
+                    seconds = registry.activate(kind, version)
+                    st.success(f"{MODEL_NAMES[kind]} {version} deployed (pre-warmed in {seconds * 1000:.1f} ms)")
+                if not changed:
+                    st.info("The selected model versions are already in production")
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
@@ -167,6 +185,52 @@ with tab2:
     with res_col4:
         st.metric("Network Latency", "28ms", "+2ms")
     
+    # Shared dataset cache used by the dashboard pages
+    st.subheader("🗄️ Dataset Cache")
+    
+    cache_stats = dataset_cache.stats()
+    cache_col1, cache_col2, cache_col3, cache_col4 = st.columns(4)
+    
+    with cache_col1:
+        st.metric("Cache Hits", f"{cache_stats['hits']:,}")
+    
+    with cache_col2:
+        st.metric("Cache Misses", f"{cache_stats['misses']:,}")
+    
+    with cache_col3:
+        st.metric("Hit Rate", f"{cache_stats['hit_rate']:.1f}%")
+    
+    with cache_col4:
+        st.metric("Cached Datasets", cache_stats['entries'], f"{cache_stats['bytes'] / 1024 ** 2:.1f} MB", delta_color="off")
+    
+    st.caption(f"Evictions: {cache_stats['evictions']} · Expirations: {cache_stats['expirations']} · "
+               f"Invalidations: {cache_stats['invalidations']}")
+    if st.button("🧹 Clear Dataset Cache"):
+        st.success(f"Invalidated {dataset_cache.invalidate()} cached datasets")
+    
+    # Memoised Risk Analysis assessments, keyed by inputs and model version
+    st.subheader("🧮 Assessment Cache")
+    
+    assessment_stats = assessment_cache.stats()
+    assess_col1, assess_col2, assess_col3, assess_col4 = st.columns(4)
+    
+    with assess_col1:
+        st.metric("Cache Hits", f"{assessment_stats['hits']:,}")
+    
+    with assess_col2:
+        st.metric("Cache Misses", f"{assessment_stats['misses']:,}")
+    
+    with assess_col3:
+        st.metric("Hit Rate", f"{assessment_stats['hit_rate']:.1f}%")
+    
+    with assess_col4:
+        st.metric("Cached Assessments", f"{assessment_stats['entries']:,} / {assessment_cache.max_entries:,}")
+    
+    st.caption(f"Evictions: {assessment_stats['evictions']} · Expirations: {assessment_stats['expirations']} · "
+               f"Replaced by a new model version: {assessment_stats['invalidations']}")
+    if st.button("🧹 Clear Assessment Cache"):
+        st.success(f"Invalidated {assessment_cache.invalidate()} cached assessments")
+    
     # System logs with enhanced styling
     st.subheader("📋 Recent System Logs")
     
@@ -320,7 +384,11 @@ with tab4:
     config_col1, config_col2, config_col3 = st.columns(3)
     with config_col1:
         if st.button("💾 Save Configuration", type="primary", use_container_width=True):
-            st.success("Configuration saved successfully!")
+            try:
+                st.session_state.risk_thresholds = risk_thresholds(st.session_state)
+                st.success("Configuration saved successfully!")
+            except ValueError:
+                st.error("Risk thresholds must be ordered Critical > High > Medium")
     with config_col2:
         if st.button("🔄 Reset to Defaults", use_container_width=True):
             st.warning("Configuration reset to default values")
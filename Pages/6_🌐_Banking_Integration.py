@@ -4,6 +4,7 @@ import numpy as np
 import time
 from datetime import datetime, timedelta
 import random
+from core.ingest import REQUIRED_COLUMNS, TAPE_MAPPING
 
 st.set_page_config(
     page_title="Banking Integration - KCB SmartCredit",
@@ -258,12 +259,11 @@ def main():
     with tab2:
         st.write("**Data Field Mapping**")
         
-        mapping_data = pd.DataFrame({
-            'KCB Field': ['CustomerID', 'LoanAmount', 'OutstandingBalance', 'LastPaymentDate', 'ProductType'],
-            'External System': ['ClientID', 'Principal', 'CurrentBalance', 'PaymentDate', 'LoanProduct'],
-            'Status': ['✅ Mapped', '✅ Mapped', '🔄 Syncing', '✅ Mapped', '⚠️ Review'],
-            'Last Sync': ['2 min ago', '2 min ago', 'Updating...', '5 min ago', '1 hour ago']
-        })
+        mapping_data = pd.DataFrame([
+            {'KCB Field': field, 'External System': external, 'Status': '✅ Mapped',
+             'Required': '✅' if column in REQUIRED_COLUMNS else ''}
+            for external, (field, column) in TAPE_MAPPING.items()
+        ])
         
         st.dataframe(mapping_data, use_container_width=True, hide_index=True)
         
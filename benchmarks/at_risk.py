@@ -0,0 +1,59 @@
+"""
+Benchmark the maintained at-risk index against sorting the book
+
+Times a full sort of a sample book for the top 5 loans, the same answer from
+``AtRiskIndex`` (overall and filtered), and the cost of applying loan events. Run
+from the repository root:
+
+    python -m benchmarks.at_risk [loans]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from core.ranking import AtRiskIndex
+from core.schema import compact_loans
+from utils.helpers import generate_sample_book
+
+
+def timed(label, func, repeats=20):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<45} {best * 1000:8.3f} ms")
+    return best
+
+
+def main(count=2000000):
+    borrowers, loans = generate_sample_book(count // 2, count, seed=0)
+    loans = compact_loans(loans.merge(borrowers[['borrower_id', 'region']], on='borrower_id'))
+    print(f"{count:,} loans")
+
+    timed("full sort (sort_values, head 5)", lambda: loans.sort_values(
+        ['risk_band', 'days_past_due'], ascending=False).head(5), repeats=3)
+
+    start = time.perf_counter()
+    index = AtRiskIndex(loans)
+    print(f"  {'build index':<45} {(time.perf_counter() - start) * 1000:8.3f} ms")
+
+    timed("top 5", lambda: index.top(5))
+    timed("top 5, region", lambda: index.top(5, region='Coast'))
+    timed("top 5, region and product", lambda: index.top(5, region='Coast', product_type='Mortgage'))
+
+    rng = np.random.default_rng(0)
+    loan_ids = rng.integers(1, count + 1, 100000)
+    events = [{'type': 'dpd_change', 'loan_id': int(loan_id), 'days_past_due': int(dpd)}
+              for loan_id, dpd in zip(loan_ids, rng.integers(0, 365, len(loan_ids)))]
+    start = time.perf_counter()
+    index.apply_events(events)
+    elapsed = time.perf_counter() - start
+    print(f"  {'apply DPD change events':<45} {len(events) / elapsed:8,.0f} events/s")
+    timed("top 5 after events", lambda: index.top(5))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000000)
@@ -0,0 +1,48 @@
+"""
+Benchmark portfolio cube drill-downs against grouping the raw book
+
+Builds a ``PortfolioCube`` over a sample book and times the region -> sector ->
+product drill-down against the equivalent ``groupby`` over the loans. Run from the
+repository root:
+
+    python -m benchmarks.cube [loans]
+"""
+
+import sys
+import time
+
+from core.cube import PortfolioCube
+from core.schema import compact_loans
+from utils.helpers import generate_sample_book
+
+
+def timed(label, func, repeats=10):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<45} {best * 1000:8.2f} ms")
+
+
+def main(count=2000000):
+    borrowers, loans = generate_sample_book(count // 2, count, seed=0)
+    loans = compact_loans(loans.merge(borrowers[['borrower_id', 'segment', 'region', 'credit_score']],
+                                      on='borrower_id'))
+    print(f"{count:,} loans")
+
+    start = time.perf_counter()
+    cube = PortfolioCube(loans)
+    print(f"  {'build cube':<45} {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    coast = loans[loans['region'] == 'Coast']
+    timed("groupby region", lambda: loans.groupby('region', observed=True)['outstanding_balance'].sum(), 3)
+    timed("groupby sector within a region", lambda: coast.groupby('segment', observed=True)['outstanding_balance'].sum(), 3)
+    timed("cube: region", lambda: cube.rollup('region'))
+    timed("cube: sector within a region", lambda: cube.rollup('segment', region='Coast'))
+    timed("cube: product within region and sector", lambda: cube.rollup('product_type', region='Coast', segment='SME'))
+    timed("cube: month x sector", lambda: cube.rollup('month', 'segment'))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000000)
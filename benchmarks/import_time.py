@@ -0,0 +1,49 @@
+"""
+Benchmark cold-start import cost of the compute packages
+
+Each import runs in a fresh interpreter, so module caches do not carry over. The
+last row is roughly what ``import utils`` cost before the package went lazy, when it
+eagerly loaded helpers together with pandas and Streamlit. Run from the repository
+root:
+
+    python -m benchmarks.import_time [repeats]
+"""
+
+import subprocess
+import sys
+import time
+
+STATEMENTS = [
+    'import core',
+    'import utils',
+    'import core.risk',
+    'import core.portfolio',
+    'import utils.helpers',
+    'import pandas, streamlit',
+]
+
+
+def cold_import(statement, repeats=5):
+    """Best wall time in seconds to start an interpreter and run ``statement``"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(repeats=5):
+    baseline = cold_import('pass', repeats)
+    print(f"interpreter start-up: {baseline * 1000:7.1f} ms")
+    for statement in STATEMENTS:
+        try:
+            elapsed = cold_import(statement, repeats) - baseline
+        except subprocess.CalledProcessError:
+            print(f"  {statement:<26} not installed")
+            continue
+        print(f"  {statement:<26} {elapsed * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
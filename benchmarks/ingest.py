@@ -0,0 +1,51 @@
+"""
+Benchmark loan tape ingestion into the loan store
+
+Writes a sample loan tape with the external column names of the Banking Integration
+data mapping, then loads it into fresh stores holding the tape's borrowers with one
+worker and with one worker per core, as CSV and as Parquet. Run from the repository
+root:
+
+    python -m benchmarks.ingest [loans]
+"""
+
+import os
+import sys
+import tempfile
+
+from core.ingest import TAPE_MAPPING, ingest_tape
+from core.store import LoanStore
+from utils.helpers import generate_sample_book
+
+
+def load(label, path, directory, borrowers, **options):
+    store = LoanStore(os.path.join(directory, f'{label}.db'))
+    store.load_book(borrowers=borrowers)
+    result = ingest_tape(path, store, **options)
+    print(f"  {label:<45} {result['seconds']:8.2f} s {result['rows_per_second']:12,.0f} rows/s")
+
+
+def main(count=1000000):
+    borrowers, loans = generate_sample_book(count // 2, count, seed=0)
+    tape = loans.rename(columns={column: external for external, (_, column) in TAPE_MAPPING.items()})
+    cores = os.cpu_count() or 1
+    print(f"{count:,} loans, {cores} cores")
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'tape.csv')
+        tape.to_csv(csv_path, index=False)
+        load("csv, 1 worker", csv_path, directory, borrowers, workers=1)
+        load(f"csv, {cores} workers", csv_path, directory, borrowers, workers=cores)
+        load(f"csv, {cores} workers, indexes rebuilt", csv_path, directory, borrowers, workers=cores,
+             rebuild_indexes=True)
+        try:
+            parquet_path = os.path.join(directory, 'tape.parquet')
+            tape.to_parquet(parquet_path)
+        except ImportError:
+            return
+        load(f"parquet, {cores} workers, indexes rebuilt", parquet_path, directory, borrowers, workers=cores,
+             rebuild_indexes=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
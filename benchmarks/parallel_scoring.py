@@ -0,0 +1,50 @@
+"""
+Benchmark the scaling of whole-book scoring across worker processes
+
+Derives the features of a large sample book once, then scores and bands it with 1, 2,
+... up to N workers (one per core by default) over shared-memory feature arrays, and
+prints the scaling curve: time, speedup over one worker and parallel efficiency.
+The pool is used at every book size here, ignoring ``PARALLEL_MIN_ROWS``.
+Every run is checked against the single-process result. Run from the repository root:
+
+    python -m benchmarks.parallel_scoring [borrowers] [max_workers]
+"""
+
+import os
+import sys
+import time
+
+from benchmarks.scoring import sample_inputs
+from core.scoring import RiskScorer, borrower_features, score_features
+
+
+def best_of(func, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(count=5000000, max_workers=None):
+    max_workers = max_workers or os.cpu_count() or 1
+    borrowers, loans = sample_inputs(count)
+    features = borrower_features(borrowers, loans, as_of='2026-01-01')
+    scorer = RiskScorer()
+    print(f"{count:,} borrowers, {os.cpu_count()} cores")
+    print(f"  {'workers':>7} {'time':>11} {'speedup':>8} {'efficiency':>11}")
+
+    baseline, expected = best_of(lambda: score_features(features, scorer, workers=1))
+    for workers in range(1, max_workers + 1):
+        if workers == 1:
+            seconds = baseline
+        else:
+            seconds, scores = best_of(lambda: score_features(features, scorer, workers=workers, min_rows=0))
+            assert scores.equals(expected), f"{workers} workers disagree with one"
+        speedup = baseline / seconds
+        print(f"  {workers:>7} {seconds * 1000:8.2f} ms {speedup:7.2f}x {speedup / workers * 100:10.1f}%")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000000, int(sys.argv[2]) if len(sys.argv) > 2 else None)
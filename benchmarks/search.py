@@ -0,0 +1,49 @@
+"""
+Benchmark borrower search against scanning the borrower table
+
+Builds a ``SearchIndex`` over a sample borrower book and times prefix, ID, phone,
+multi-term and typo lookups against a ``str.contains`` scan of the names. Run from
+the repository root:
+
+    python -m benchmarks.search [borrowers]
+"""
+
+import sys
+import time
+
+from core.search import SearchIndex
+from utils.helpers import generate_sample_borrowers
+
+
+def timed(label, func, repeats=10):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<45} {best * 1000:8.2f} ms")
+
+
+def main(count=2000000):
+    borrowers = generate_sample_borrowers(count, seed=0)[['borrower_id', 'first_name', 'last_name', 'phone']]
+    print(f"{count:,} borrowers")
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    index.add_rows(borrowers, 'borrower_id')
+    print(f"  {'build index':<45} {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    phone = borrowers['phone'].iloc[count // 2]
+    timed("scan: name contains", lambda: borrowers[borrowers['first_name'].str.contains('FirstName12345')], 3)
+    timed("index: name prefix", lambda: index.search('FirstName12345'))
+    timed("index: borrower ID", lambda: index.search('BORR12345'))
+    timed("index: phone (national form)", lambda: index.search('0' + phone[4:]))
+    timed("index: first and last name", lambda: index.search('FirstName12 LastName123'))
+    timed("index: typo", lambda: index.search('FristName12345'))
+
+    index.add([count + 1] * 2, ['Zebedee', 'Quartermaine'])
+    timed("index: after an incremental add", lambda: index.search('Quartermaine'))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000000)
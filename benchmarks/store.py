@@ -0,0 +1,46 @@
+"""
+Benchmark filtered lookups against the indexed loan store
+
+Builds a throwaway store with a sample book and times the page queries. Run from
+the repository root:
+
+    python -m benchmarks.store [loans]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from core.store import LoanStore
+from utils.helpers import generate_sample_book
+
+
+def timed(label, func, repeats=5):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        rows = len(func())
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<40} {best * 1000:8.2f} ms  ({rows:,} rows)")
+
+
+def main(count=5000000):
+    borrowers, loans = generate_sample_book(count // 2, count, seed=0)
+    with tempfile.TemporaryDirectory() as directory:
+        store = LoanStore(os.path.join(directory, 'bench.db'))
+        start = time.perf_counter()
+        store.load_book(borrowers, loans)
+        print(f"loaded {count:,} loans in {time.perf_counter() - start:.1f}s")
+        del borrowers, loans
+
+        timed("critical loans over 30 DPD (first 100)", lambda: store.loans(risk_band='Critical', min_dpd=30, limit=100))
+        timed("critical loans over 30 DPD (all)", lambda: store.loans(risk_band='Critical', min_dpd=30))
+        timed("loans of one borrower", lambda: store.loans(borrower_id=12345))
+        timed("top 5 at-risk loans", lambda: store.at_risk_loans(5))
+        timed("risk distribution", store.risk_distribution)
+        timed("NPL ratio by origination month", store.npl_by_origination_month)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000000)
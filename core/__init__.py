@@ -0,0 +1,24 @@
+"""
+Headless compute core for KCB SmartCredit
+
+Risk, affordability and portfolio logic with no Streamlit dependency and no
+import-time side effects. Submodules are loaded on first attribute access, so
+``import core`` is cheap and NumPy/pandas are only imported when a submodule
+such as ``core.risk`` is actually used.
+"""
+
+import importlib
+
+__version__ = "1.0.0"
+
+_SUBMODULES = ('risk', 'affordability', 'portfolio', 'schema', 'store', 'snapshot', 'cache', 'ranking', 'cube', 'search', 'kpi', 'ingest', 'scoring', 'factors', 'models', 'heatmap')
+
+__all__ = list(_SUBMODULES)
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
@@ -0,0 +1,7 @@
+"""Column helpers shared by the core modules"""
+
+import pandas as pd
+
+def _categorical(codes, categories, ordered=False):
+    """Wrap integer codes as a pandas Categorical (-1 marks a missing value)"""
+    return pd.Categorical.from_codes(codes, categories=categories, ordered=ordered)
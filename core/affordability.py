@@ -0,0 +1,57 @@
+"""Borrower affordability metrics"""
+
+import numpy as np
+import pandas as pd
+
+from ._columns import _categorical
+
+AFFORDABILITY_STATUSES = ['Excellent', 'Good', 'Fair', 'Poor']
+AFFORDABILITY_COLORS = ['green', 'blue', 'orange', 'red']
+AFFORDABILITY_CUTOFFS = [30, 50, 70]
+# Status of rows with a missing income, expense or payment; never banded
+INSUFFICIENT_DATA = 'Insufficient data'
+INSUFFICIENT_DATA_COLOR = 'gray'
+_STATUSES = AFFORDABILITY_STATUSES + [INSUFFICIENT_DATA]
+_COLORS = AFFORDABILITY_COLORS + [INSUFFICIENT_DATA_COLOR]
+
+def _affordability_arrays(monthly_income, monthly_expenses, proposed_payment):
+    """Disposable income, affordability ratio and band index for aligned arrays
+
+    Rows with a missing input get a NaN ratio and the ``INSUFFICIENT_DATA`` band.
+    """
+    payment = np.asarray(proposed_payment, dtype=float)
+    disposable_income = np.asarray(monthly_income, dtype=float) - np.asarray(monthly_expenses, dtype=float)
+    missing = np.isnan(disposable_income) | np.isnan(payment)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = payment / disposable_income * 100
+    ratio = np.where(missing, np.nan, np.where(disposable_income > 0, ratio, 100.0))
+    band = np.where(missing, len(AFFORDABILITY_STATUSES), np.searchsorted(AFFORDABILITY_CUTOFFS, ratio, side='left'))
+    return disposable_income, ratio, band
+
+def calculate_affordability(monthly_income, monthly_expenses, proposed_payment):
+    """Calculate affordability metrics"""
+    disposable_income, ratio, band = _affordability_arrays(monthly_income, monthly_expenses, proposed_payment)
+    return {
+        "disposable_income": monthly_income - monthly_expenses,
+        "affordability_ratio": float(ratio),
+        "status": _STATUSES[band],
+        "color": _COLORS[band]
+    }
+
+def calculate_affordability_batch(monthly_income, monthly_expenses, proposed_payment):
+    """Calculate affordability metrics for aligned arrays or Series in one pass
+
+    Same rules as ``calculate_affordability``: the ratio is the payment as a percentage
+    of disposable income, or 100 when there is none, banded at 30/50/70; rows with a
+    missing input are ``INSUFFICIENT_DATA`` with a NaN ratio. Returns a frame
+    with ``disposable_income``, ``affordability_ratio`` and categorical ``status`` and
+    ``color`` columns, indexed like ``proposed_payment`` when it is a Series.
+    """
+    disposable_income, ratio, band = _affordability_arrays(monthly_income, monthly_expenses, proposed_payment)
+    index = proposed_payment.index if isinstance(proposed_payment, pd.Series) else None
+    return pd.DataFrame({
+        'disposable_income': disposable_income,
+        'affordability_ratio': ratio,
+        'status': _categorical(band, _STATUSES, ordered=True),
+        'color': _categorical(band, _COLORS)
+    }, index=index)
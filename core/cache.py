@@ -0,0 +1,101 @@
+"""Versioned dataset cache shared by every session in the process
+
+Entries are keyed by dataset name plus the version of the data they were computed
+from (a snapshot version, ``LoanStore.version()``, ...), so new data is a cache miss
+by construction and the stale entries for that name are dropped on the spot. Entries
+also expire after a TTL and are evicted least-recently-used once the entry count or
+estimated size exceeds its limit. Cached values are shared, so callers must not
+mutate them.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+def _size_of(value):
+    """Rough size of a cached value in bytes"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    return sys.getsizeof(value)
+
+class DatasetCache:
+    """Thread-safe TTL + LRU cache of datasets keyed by ``(name, version)``"""
+
+    def __init__(self, max_entries=128, max_bytes=256 * 1024 * 1024, ttl=300, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def get(self, name, version, compute):
+        """Return the cached ``name`` at ``version``, computing and storing it on a miss"""
+        key = (name, version)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] > self.ttl:
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = compute()
+        size = _size_of(value)
+        with self._lock:
+            for stale in [k for k in self._entries if k[0] == name and k[1] != version]:
+                self._drop(stale)
+                self.invalidations += 1
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, now, size)
+            self._bytes += size
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key)[2]
+
+    def invalidate(self, name=None, version=None):
+        """Drop entries for ``name`` (every dataset when None), optionally one version only
+
+        Returns the number of entries removed.
+        """
+        with self._lock:
+            keys = [key for key in self._entries
+                    if (name is None or key[0] == name) and (version is None or key[1] == version)]
+            for key in keys:
+                self._drop(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def stats(self):
+        """Hit/miss and eviction counters plus current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups * 100 if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+# Module-level instance: imported once per process, so every Streamlit session shares it
+dataset_cache = DatasetCache()
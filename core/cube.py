@@ -0,0 +1,156 @@
+"""Pre-aggregated portfolio cube over sector, product, region, risk band and month
+
+The cube is a dense NumPy array with one axis per dimension and one slot per measure,
+filled in a single ``np.bincount`` pass per chunk (the ``aggregate_portfolio``
+approach). Charts and drill-downs are then slices and sums over a few thousand
+cells, so they cost the same whatever the size of the book the cube was built from.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .portfolio import NPL_DPD_THRESHOLD, _grow, _label_codes
+from .risk import RISK_BANDS
+
+# Dimension name -> source column; 'month' is the origination month
+CUBE_DIMENSIONS = {
+    'segment': 'segment',
+    'product_type': 'product_type',
+    'region': 'region',
+    'risk_band': 'risk_band',
+    'month': 'origination_date'
+}
+CUBE_MEASURES = ('loans', 'outstanding', 'npl_count', 'dpd_sum', 'score_sum')
+
+def _dimension_values(chunk, dimension):
+    values = chunk[CUBE_DIMENSIONS[dimension]]
+    if dimension == 'month':
+        # Factorize months as integers; only the few unique labels become strings
+        months = values.to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+        return pd.Series(months.astype(np.int64)).where(~np.isnat(months))
+    return values
+
+def _month_label(month):
+    return str(np.datetime64(int(month), 'M'))
+
+def _as_list(values):
+    return [values] if isinstance(values, str) or not hasattr(values, '__iter__') else list(values)
+
+def _ordered(dimension, labels):
+    """Display order of a dimension's labels: risk bands by severity, the rest sorted"""
+    if dimension == 'risk_band':
+        return sorted(labels, key=lambda band: RISK_BANDS.index(band) if band in RISK_BANDS else len(RISK_BANDS))
+    return sorted(labels, key=str) if dimension != 'month' else sorted(labels)
+
+class PortfolioCube:
+    """Loan count, outstanding balance, NPL count, DPD and credit score sums per cell
+
+    ``loans`` is a loan frame, or an iterable of frames, carrying the borrower's
+    ``segment``, ``region`` and ``credit_score`` alongside the loan columns (see
+    ``LoanStore.loans(borrower_columns=...)``). Loans with a missing dimension value
+    are left out of the cube.
+    """
+
+    def __init__(self, loans, dimensions=tuple(CUBE_DIMENSIONS)):
+        if isinstance(loans, pd.DataFrame):
+            loans = [loans]
+        self.dimensions = tuple(dimensions)
+        labels = {dimension: {} for dimension in self.dimensions}
+        data = np.zeros((0,) * len(self.dimensions) + (len(CUBE_MEASURES),))
+
+        for chunk in loans:
+            codes = [_label_codes(_dimension_values(chunk, dimension), labels[dimension])
+                     for dimension in self.dimensions]
+            shape = tuple(len(labels[dimension]) for dimension in self.dimensions)
+            data = _grow(data, shape + (len(CUBE_MEASURES),))
+            if not len(chunk) or 0 in shape:
+                continue
+
+            known = np.logical_and.reduce([code >= 0 for code in codes])
+            cell = np.ravel_multi_index([code[known] for code in codes], shape)
+            balance = np.nan_to_num(chunk['outstanding_balance'].to_numpy(dtype=float)[known])
+            dpd = chunk['days_past_due'].to_numpy(dtype=float)[known]
+            score = (np.nan_to_num(chunk['credit_score'].to_numpy(dtype=float)[known])
+                     if 'credit_score' in chunk else np.zeros(len(cell)))
+            size = int(np.prod(shape))
+            for measure, weights in enumerate((None, balance, dpd > NPL_DPD_THRESHOLD, dpd, score)):
+                data[..., measure] += np.bincount(cell, weights=weights, minlength=size).reshape(shape)
+
+        # Reorder every axis into display order once, so slices come out sorted
+        self._labels = {}
+        for axis, dimension in enumerate(self.dimensions):
+            ordered = _ordered(dimension, labels[dimension])
+            data = np.take(data, [labels[dimension][label] for label in ordered], axis=axis)
+            self._labels[dimension] = [_month_label(month) for month in ordered] if dimension == 'month' else ordered
+        self._positions = {dimension: {label: i for i, label in enumerate(ordered)}
+                           for dimension, ordered in self._labels.items()}
+        self._data = data
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self._data.nbytes
+
+    def labels(self, dimension):
+        """Values of ``dimension`` present in the cube, in display order"""
+        return list(self._labels[dimension])
+
+    def _slice(self, filters):
+        unknown = set(filters) - set(self.dimensions)
+        if unknown:
+            raise ValueError(f"Unknown cube dimension: {', '.join(sorted(unknown))}")
+        data = self._data
+        for axis, dimension in enumerate(self.dimensions):
+            if filters.get(dimension) is None:
+                continue
+            positions = [self._positions[dimension][value] for value in _as_list(filters[dimension])
+                         if value in self._positions[dimension]]
+            data = np.take(data, positions, axis=axis)
+        return data
+
+    def rollup(self, *dimensions, **filters):
+        """Measures summed up to ``dimensions`` after slicing the cube by ``filters``
+
+        Filter values are one label or a list of labels, so drilling from a region to
+        its sectors is ``cube.rollup('segment', region='Coast')``. Returns a frame
+        indexed by ``dimensions`` (cells with no loans dropped) with the raw measures
+        plus ``npl_ratio``, ``average_loan_size``, ``average_dpd`` and ``average_score``.
+        """
+        unknown = set(dimensions) - set(self.dimensions)
+        if unknown:
+            raise ValueError(f"Unknown cube dimension: {', '.join(sorted(unknown))}")
+        data = self._slice(filters)
+        axes = [self.dimensions.index(dimension) for dimension in dimensions]
+        other = tuple(axis for axis in range(len(self.dimensions)) if axis not in axes)
+        data = data.sum(axis=other)
+        kept = sorted(axes)
+        data = np.moveaxis(data, [kept.index(axis) for axis in axes], list(range(len(axes))))
+
+        index_labels = []
+        for dimension in dimensions:
+            labels = self._labels[dimension]
+            if filters.get(dimension) is not None:
+                labels = [label for label in _as_list(filters[dimension]) if label in self._positions[dimension]]
+            index_labels.append(labels)
+        index = (pd.MultiIndex.from_product(index_labels, names=list(dimensions)) if len(dimensions) > 1
+                 else pd.Index(index_labels[0], name=dimensions[0]) if dimensions else None)
+
+        values = data.reshape(-1, len(CUBE_MEASURES))
+        present = values[:, 0] > 0
+        values = values[present]
+        loans = values[:, 0]
+        columns = dict(zip(CUBE_MEASURES, values.T))
+        columns.update(
+            loans=loans.astype(int),
+            npl_count=columns['npl_count'].astype(int),
+            npl_ratio=columns['npl_count'] / loans * 100,
+            average_loan_size=columns['outstanding'] / loans,
+            average_dpd=columns['dpd_sum'] / loans,
+            average_score=columns['score_sum'] / loans
+        )
+        return pd.DataFrame(columns, index=index[present] if index is not None else None)
+
+    def totals(self, **filters):
+        """Measures for the whole (optionally sliced) cube as a dict"""
+        frame = self.rollup(**filters)
+        if frame.empty:
+            return dict.fromkeys(frame.columns, 0)
+        return {column: values.iloc[0].item() for column, values in frame.items()}
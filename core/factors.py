@@ -0,0 +1,76 @@
+"""Risk factor explanations as per-borrower bitmasks
+
+Each rule behind the Risk Analysis "Key Risk Factors" list is one bit. The rules are
+evaluated column-wise over the whole book into a single ``uint8`` mask per borrower,
+so explaining every score costs one more vectorised pass and "limited credit history
+and high DTI" is the bitwise test ``mask & bits == bits``. Masks are turned into
+text only for display, once per distinct mask rather than once per borrower.
+"""
+
+import numpy as np
+import pandas as pd
+
+HIGH_DEBT_TO_INCOME = 50
+LIMITED_HISTORY_MONTHS = 24
+VARIABLE_INCOME_EMPLOYMENT = 'Self-Employed'
+LOW_MONTHLY_INCOME = 100000
+HIGH_LOAN_TO_INCOME_MONTHS = 6
+
+# Factor name -> display text, in bit order
+RISK_FACTORS = {
+    'high_debt_to_income': "High debt-to-income ratio",
+    'limited_credit_history': "Limited credit history",
+    'variable_income': "Variable income source",
+    'low_income': "Low income level",
+    'high_loan_to_income': "High loan-to-income ratio"
+}
+FACTOR_BITS = {name: 1 << bit for bit, name in enumerate(RISK_FACTORS)}
+NO_FACTORS = "No major risk factors identified"
+
+def factor_bits(factors):
+    """Combined bits of one factor name or a list of them"""
+    factors = [factors] if isinstance(factors, str) else factors
+    unknown = set(factors) - set(FACTOR_BITS)
+    if unknown:
+        raise ValueError(f"Unknown risk factor: {', '.join(sorted(unknown))}")
+    return sum(FACTOR_BITS[name] for name in set(factors))
+
+def _equals(values, target):
+    if np.ndim(values) == 0:
+        return np.asarray(values == target)
+    # Through pandas, so categorical columns compare by code instead of per string
+    return np.asarray(pd.Series(values) == target, dtype=bool)
+
+def risk_factor_mask(debt_to_income, credit_history, employment_type, monthly_income, loan_amount=0):
+    """Bitmask of the risk factors that apply, for scalars or whole arrays"""
+    income = np.asarray(monthly_income, dtype=float)
+    rules = (
+        np.asarray(debt_to_income, dtype=float) > HIGH_DEBT_TO_INCOME,
+        np.asarray(credit_history, dtype=float) < LIMITED_HISTORY_MONTHS,
+        _equals(employment_type, VARIABLE_INCOME_EMPLOYMENT),
+        income < LOW_MONTHLY_INCOME,
+        np.asarray(loan_amount, dtype=float) > income * HIGH_LOAN_TO_INCOME_MONTHS
+    )
+    mask = np.zeros(np.broadcast(*rules).shape, dtype=np.uint8)
+    for bit, applies in zip(FACTOR_BITS.values(), rules):
+        mask |= applies.astype(np.uint8) * np.uint8(bit)
+    return mask
+
+def has_factors(masks, factors, any_of=False):
+    """Boolean array of masks having every one (or, with ``any_of``, any) of ``factors``"""
+    bits = factor_bits(factors)
+    matched = np.asarray(masks, dtype=np.int64) & bits
+    return matched != 0 if any_of else matched == bits
+
+def describe_factors(mask, debt_to_income=None):
+    """Display lines for one mask; the ratio is added to the DTI line when given"""
+    lines = [text for name, text in RISK_FACTORS.items() if int(mask) & FACTOR_BITS[name]]
+    if debt_to_income is not None and int(mask) & FACTOR_BITS['high_debt_to_income']:
+        lines[0] = f"{lines[0]} ({debt_to_income:.1f}%)"
+    return lines or [NO_FACTORS]
+
+def decode_factors(masks, separator='; '):
+    """Masks as display strings, decoding each distinct mask once"""
+    masks = pd.Series(masks)
+    labels = {mask: separator.join(describe_factors(mask)) for mask in masks.dropna().unique().tolist()}
+    return masks.map(labels)
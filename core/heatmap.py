@@ -0,0 +1,43 @@
+"""Sector by risk band heatmaps read off the portfolio cube
+
+``risk_heatmap`` takes loan counts per row label and risk band from a
+``PortfolioCube`` at any granularity (sectors, sectors by product, ...), so it costs
+a cube slice rather than a pass over the book. ``heatmap_styles`` colours every cell
+at once: each cell's share of its row's loans is binned with ``np.digitize`` and the
+bin numbers index a precomputed array of CSS strings, so no Python runs per cell.
+The scale runs the other way for the adverse bands, so a row concentrated in High
+and Critical loans shows red rather than green. Hand the result to
+``Styler.apply(lambda _: styles, axis=None)``.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .risk import RISK_BANDS
+
+# Cut-offs on a cell's share of its row's loans (%), and the style of each bin from
+# the smallest share (red) to the largest (green); reversed for HEATMAP_ADVERSE_BANDS
+HEATMAP_BINS = (15, 25, 40)
+HEATMAP_ADVERSE_BANDS = ('High', 'Critical')
+HEATMAP_STYLES = np.array([
+    'background-color: #f8d7da',
+    'background-color: #ffeaa7',
+    'background-color: #fff3cd',
+    'background-color: #d4edda'
+])
+
+def risk_heatmap(cube, rows=('segment',), **filters):
+    """Loan counts with one row per ``rows`` label (or label combination) and one
+    column per risk band in ``RISK_BANDS`` order; ``filters`` slice the cube first"""
+    counts = cube.rollup(*rows, 'risk_band', **filters)['loans']
+    return counts.unstack('risk_band', fill_value=0).reindex(columns=RISK_BANDS, fill_value=0)
+
+def heatmap_styles(counts, bins=HEATMAP_BINS, styles=HEATMAP_STYLES, adverse=HEATMAP_ADVERSE_BANDS):
+    """CSS for every cell of ``counts``, labelled like it, from the cell's share of its
+    row; a large share is green in most columns and red in the ``adverse`` ones"""
+    values = counts.to_numpy(dtype=float)
+    totals = values.sum(axis=1, keepdims=True)
+    share = np.divide(values * 100, totals, out=np.zeros_like(values), where=totals > 0)
+    levels = np.digitize(share, bins, right=True)
+    levels = np.where(counts.columns.isin(adverse), len(styles) - 1 - levels, levels)
+    return pd.DataFrame(styles[levels], index=counts.index, columns=counts.columns)
@@ -0,0 +1,245 @@
+"""Bulk ingestion of loan tapes from core banking extracts
+
+A tape is a CSV or Parquet file using the external system's column names.
+``ingest_tape`` reads it in chunks, maps the columns through ``TAPE_MAPPING`` (the
+Banking Integration "Data Mapping"), coerces every chunk to store types, optionally in
+a pool of worker processes, and upserts the valid rows into a ``LoanStore`` in file
+order. CSV chunks are split on line boundaries and parsed by the workers themselves,
+so parsing scales with cores too. Rows that fail validation, including loans of borrowers the
+store does not hold, are returned with the reason instead of stopping the load.
+"""
+
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .risk import RISK_BANDS
+from .schema import ID_PREFIXES
+
+# External tape column -> (KCB field, loan store column)
+TAPE_MAPPING = {
+    'LoanID': ('LoanNumber', 'loan_id'),
+    'ClientID': ('CustomerID', 'borrower_id'),
+    'Principal': ('LoanAmount', 'loan_amount'),
+    'CurrentBalance': ('OutstandingBalance', 'outstanding_balance'),
+    'PaymentDate': ('LastPaymentDate', 'last_payment_date'),
+    'LoanProduct': ('ProductType', 'product_type'),
+    'InterestRate': ('InterestRate', 'interest_rate'),
+    'Tenor': ('TermMonths', 'term_months'),
+    'DaysInArrears': ('DaysPastDue', 'days_past_due'),
+    'AccountStatus': ('LoanStatus', 'status'),
+    'RiskGrade': ('RiskBand', 'risk_band'),
+    'SecurityValue': ('CollateralValue', 'collateral_value'),
+    'DisbursementDate': ('OriginationDate', 'origination_date')
+}
+REQUIRED_COLUMNS = ('loan_id', 'borrower_id', 'loan_amount', 'outstanding_balance', 'product_type')
+AMOUNT_COLUMNS = ('loan_amount', 'outstanding_balance', 'interest_rate', 'collateral_value')
+COUNT_COLUMNS = ('term_months', 'days_past_due')
+# last_payment_date is validated but not stored: the loan store has no column for it
+DATE_COLUMNS = ('origination_date', 'last_payment_date')
+CHUNK_BYTES = 8 * 1024 * 1024
+CHUNK_ROWS = 100000
+
+# Known borrower numbers of a worker process, sent once by the pool initializer
+_worker_borrower_ids = None
+
+def tape_columns(columns):
+    """Store column for each tape column; external names, KCB field names and store
+    column names are all accepted. Raises ValueError if a required field is missing."""
+    names = {}
+    for external, (field, column) in TAPE_MAPPING.items():
+        names.update({external: column, field: column, column: column})
+    mapped = {column: names[column] for column in columns if column in names}
+    missing = [column for column in REQUIRED_COLUMNS if column not in mapped.values()]
+    if missing:
+        fields = [external for external, (_, column) in TAPE_MAPPING.items() if column in missing]
+        raise ValueError(f"Loan tape is missing required fields: {', '.join(fields)}")
+    return mapped
+
+def _id_numbers(values, prefix):
+    """Numbers of IDs written as ``prefix`` plus digits (LOAN000042) or as plain
+    integers (42); NaN for any other form, such as another system's LN2024-0001"""
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return values.where(values % 1 == 0)
+    digits = values.astype(str).str.extract(rf'^\s*(?:{prefix})?(\d+)\s*$', expand=False)
+    return pd.to_numeric(digits, errors='coerce')
+
+def _text(values):
+    """Stripped strings of a column of any dtype (Parquet may give numbers or
+    categoricals); missing values stay NaN"""
+    values = values.astype(object)
+    return values.where(values.isna(), values.astype(str).str.strip())
+
+def coerce_tape(frame, mapping=None, borrower_ids=None):
+    """Rename a tape chunk to store columns and coerce its types
+
+    ``borrower_ids``, when given, are the known borrower numbers; loans of any other
+    borrower are rejected. Returns ``(loans, rejected)``: the valid rows with store
+    dtypes, and the rejected rows as they appeared in the tape plus a ``reason`` column.
+    """
+    mapping = mapping or tape_columns(frame.columns)
+    source = frame
+    frame = frame[list(mapping)].rename(columns=mapping)
+    reasons = pd.Series('', index=frame.index, dtype=object)
+
+    def reject(mask, reason):
+        reasons[mask & (reasons == '')] = reason
+
+    for column in ('loan_id', 'borrower_id'):
+        frame[column] = _id_numbers(frame[column], ID_PREFIXES[column])
+        reject(frame[column].isna(), f"invalid {column}")
+    for column in AMOUNT_COLUMNS + COUNT_COLUMNS:
+        if column in frame:
+            raw = frame[column]
+            frame[column] = pd.to_numeric(raw, errors='coerce')
+            reject(raw.notna() & frame[column].isna(), f"non-numeric {column}")
+            reject(frame[column] < 0, f"negative {column}")
+    for column in DATE_COLUMNS:
+        if column in frame:
+            raw = frame[column]
+            frame[column] = pd.to_datetime(raw, errors='coerce')
+            reject(raw.notna() & frame[column].isna(), f"invalid {column}")
+    for column in REQUIRED_COLUMNS:
+        reject(frame[column].isna(), f"missing {column}")
+    if borrower_ids is not None:
+        reject(~frame['borrower_id'].isin(borrower_ids), "unknown borrower_id")
+    if 'risk_band' in frame:
+        bands = _text(frame['risk_band']).str.title()
+        reject(bands.notna() & ~bands.isin(RISK_BANDS), "unknown risk_band")
+        frame['risk_band'] = bands
+    for column in ('product_type', 'status'):
+        if column in frame:
+            frame[column] = _text(frame[column])
+    if 'days_past_due' in frame:
+        frame['days_past_due'] = frame['days_past_due'].fillna(0)
+
+    valid = (reasons == '').to_numpy()
+    loans = frame[valid].drop(columns=['last_payment_date'], errors='ignore')
+    for column in ('loan_id', 'borrower_id') + COUNT_COLUMNS:
+        if column in loans:
+            loans[column] = loans[column].astype('Int64' if loans[column].isna().any() else np.int64)
+    rejected = source[~valid].assign(reason=reasons[~valid])
+    return loans, rejected
+
+def _parse_csv(header, block, mapping, borrower_ids):
+    frame = pd.read_csv(io.BytesIO(header + block), dtype=str)
+    return len(frame), coerce_tape(frame, mapping, borrower_ids)
+
+def _init_worker(borrower_ids):
+    global _worker_borrower_ids
+    _worker_borrower_ids = borrower_ids
+
+def _in_worker(func, *args):
+    return func(*args, _worker_borrower_ids)
+
+def _parse_frame(frame, mapping, borrower_ids):
+    return len(frame), coerce_tape(frame, mapping, borrower_ids)
+
+def _csv_blocks(source, chunk_bytes):
+    """The header line and line-aligned blocks of about ``chunk_bytes`` of a CSV file"""
+    header = source.readline()
+    yield header
+    while True:
+        block = source.read(chunk_bytes)
+        if not block:
+            return
+        yield block + source.readline()
+
+def _parquet_chunks(source, chunk_rows):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Parquet tapes require pyarrow (pip install pyarrow)") from exc
+    for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+def _tape_format(source, format):
+    if format:
+        return format
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', '')
+    return 'parquet' if str(name).lower().endswith(('.parquet', '.pq')) else 'csv'
+
+def _jobs(source, format, chunk_bytes, chunk_rows):
+    """(function, args) per chunk of the tape, plus the store column mapping; each
+    function also takes the known borrower numbers"""
+    if format == 'csv':
+        blocks = _csv_blocks(source, chunk_bytes)
+        header = next(blocks)
+        mapping = tape_columns(pd.read_csv(io.BytesIO(header), dtype=str).columns)
+        return mapping, ((_parse_csv, (header, block, mapping)) for block in blocks)
+    chunks = _parquet_chunks(source, chunk_rows)
+    first = next(chunks, None)
+    if first is None:
+        return {}, iter(())
+    mapping = tape_columns(first.columns)
+    chunks = (chunk for part in ([first], chunks) for chunk in part)
+    return mapping, ((_parse_frame, (chunk, mapping)) for chunk in chunks)
+
+def _run(jobs, workers, borrower_ids):
+    """Results of ``jobs`` in order, with at most two chunks in flight per worker
+
+    ``borrower_ids`` is sent to each worker once when the pool starts rather than
+    with every chunk.
+    """
+    if workers <= 1:
+        for func, args in jobs:
+            yield func(*args, borrower_ids)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(borrower_ids,)) as pool:
+        pending = deque()
+        for func, args in jobs:
+            pending.append(pool.submit(_in_worker, func, *args))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def ingest_tape(source, store, format=None, workers=1, chunk_bytes=CHUNK_BYTES, chunk_rows=CHUNK_ROWS,
+                rebuild_indexes=False):
+    """Load a CSV or Parquet loan tape into ``store`` and report throughput
+
+    ``source`` is a path or a binary file object; ``format`` ('csv' or 'parquet') is
+    taken from the file name by default. Chunks are parsed in this process unless
+    ``workers`` asks for a pool of worker processes (None for one per core).
+    The valid rows are upserted in one transaction (see ``LoanStore.upsert_loans`` for
+    ``rebuild_indexes``), so a failure part-way leaves the store unchanged. Loans whose
+    borrower is not in the store are rejected, so load borrowers first. Returns a
+    dict with the ``rows`` read, rows ``loaded``, the ``rejected`` rows (tape columns
+    plus ``row``, the 1-based data row, and ``reason``), ``seconds`` and
+    ``rows_per_second``.
+    """
+    start = time.perf_counter()
+    format = _tape_format(source, format)
+    workers = workers or os.cpu_count() or 1
+    handle = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    rows = 0
+    rejected = []
+
+    def valid_chunks(results):
+        nonlocal rows
+        for count, (loans, bad) in results:
+            if len(bad):
+                rejected.append(bad.assign(row=bad.index + rows + 1))
+            rows += count
+            yield loans
+
+    try:
+        _, jobs = _jobs(handle, format, chunk_bytes, chunk_rows)
+        results = _run(jobs, workers, store.borrower_ids())
+        loaded = store.upsert_loans(valid_chunks(results), rebuild_indexes=rebuild_indexes)
+    finally:
+        if handle is not source:
+            handle.close()
+    seconds = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'loaded': loaded,
+        'rejected': pd.concat(rejected, ignore_index=True) if rejected else pd.DataFrame(columns=['row', 'reason']),
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds else 0.0
+    }
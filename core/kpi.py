@@ -0,0 +1,166 @@
+"""Portfolio KPIs per snapshot and their deltas between snapshots
+
+``portfolio_kpis`` reduces a loan frame to one vector of headline KPIs. Each
+snapshot's vector is kept in a small ``kpis-<version>.json`` file next to the
+snapshot, so the previous period's aggregates outlive the snapshot file itself.
+``snapshot_deltas`` then compares the current vector with the previous one in a
+single vectorised subtraction, giving every value and delta the pages show, and
+``kpi_delta`` formats one delta for ``st.metric``. Only the ``KPI_HISTORY`` latest
+KPI files are kept.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .portfolio import NPL_DPD_THRESHOLD
+from .snapshot import _atomic_write, current_version, open_snapshot, snapshot_versions
+
+# KPI -> how its delta is reported: 'pct' is the change relative to the previous value,
+# 'abs' the plain difference (percentage points for ratios)
+KPI_DELTAS = {
+    'total_loans': 'abs',
+    'open_loans': 'abs',
+    'total_outstanding': 'pct',
+    'average_loan_size': 'pct',
+    'npl_count': 'abs',
+    'npl_ratio': 'abs',
+    'high_risk_loans': 'abs',
+    'restructured_loans': 'abs',
+    'average_dpd': 'abs',
+    'average_credit_score': 'abs',
+    'recovery_rate': 'abs',
+    'portfolio_yield': 'abs'
+}
+KPI_HISTORY = 2
+CLOSED_STATUSES = ['Closed', 'Written Off']
+RECOVERY_STATUSES = ['Restructured', 'Written Off']
+HIGH_RISK_BANDS = ['High', 'Critical']
+
+def _ratio(numerator, denominator, scale=1.0):
+    return float(numerator) / denominator * scale if denominator else 0.0
+
+def portfolio_kpis(loans):
+    """Headline KPIs of a loan frame as a Series indexed like ``KPI_DELTAS``
+
+    ``average_loan_size`` is taken over the loans with a known balance, like
+    ``aggregate_portfolio``; ``recovery_rate`` is the share of principal repaid on
+    restructured and written-off loans; ``portfolio_yield`` is the balance-weighted
+    ``interest_rate`` of the priced loans. ``average_credit_score`` needs the borrower's
+    ``credit_score`` column and is NaN without it.
+    """
+    amount = np.nan_to_num(loans['loan_amount'].to_numpy(dtype=float))
+    balance = loans['outstanding_balance'].to_numpy(dtype=float)
+    balance_count = int((~np.isnan(balance)).sum())
+    balance = np.nan_to_num(balance)
+    rate = loans['interest_rate'].to_numpy(dtype=float)
+    priced = ~np.isnan(rate)
+    dpd = loans['days_past_due'].to_numpy(dtype=float)
+    status = loans['status'].astype(str)
+    is_open = ~status.isin(CLOSED_STATUSES).to_numpy()
+    recovering = status.isin(RECOVERY_STATUSES).to_numpy()
+    npl_count = int((dpd > NPL_DPD_THRESHOLD).sum())
+    count = len(loans)
+
+    return pd.Series({
+        'total_loans': count,
+        'open_loans': int(is_open.sum()),
+        'total_outstanding': balance.sum(),
+        'average_loan_size': _ratio(balance.sum(), balance_count),
+        'npl_count': npl_count,
+        'npl_ratio': _ratio(npl_count, count, 100),
+        'high_risk_loans': int(loans['risk_band'].astype(str).isin(HIGH_RISK_BANDS).sum()),
+        'restructured_loans': int((status == 'Restructured').sum()),
+        'average_dpd': _ratio(dpd.sum(), count),
+        'average_credit_score': (loans['credit_score'].to_numpy(dtype=float).mean()
+                                 if 'credit_score' in loans and count else np.nan),
+        'recovery_rate': _ratio((amount - balance)[recovering].sum(), amount[recovering].sum(), 100),
+        'portfolio_yield': _ratio((balance * rate)[priced].sum(), balance[priced].sum())
+    }, dtype=float)
+
+def compare_kpis(current, previous=None):
+    """Frame of ``value``, ``previous``, ``change``, ``change_pct`` and the reported
+    ``delta`` per KPI; the previous columns are NaN when there is nothing to compare"""
+    if previous is None:
+        previous = pd.Series(np.nan, index=current.index)
+    previous = previous.reindex(current.index).astype(float)
+    change = current - previous
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_pct = change / previous.abs() * 100
+    relative = current.index.map(lambda name: KPI_DELTAS.get(name) == 'pct').to_numpy(dtype=bool)
+    return pd.DataFrame({
+        'value': current,
+        'previous': previous,
+        'change': change,
+        'change_pct': change_pct.replace([np.inf, -np.inf], np.nan),
+        'delta': np.where(relative, change_pct, change)
+    })
+
+def _kpi_path(directory, version):
+    return os.path.join(directory, f'kpis-{version}.json')
+
+def snapshot_kpis(directory, version=None):
+    """KPIs of a snapshot (the current one by default), computed once and kept on disk"""
+    version = version or current_version(directory)
+    path = _kpi_path(directory, version)
+    try:
+        with open(path) as source:
+            kpis = pd.Series(json.load(source), dtype=float)
+        # A file written before a KPI was added is refreshed while its snapshot is still kept
+        if set(KPI_DELTAS).issubset(kpis.index) or version not in snapshot_versions(directory):
+            return kpis.reindex(list(KPI_DELTAS))
+    except FileNotFoundError:
+        pass
+    kpis = portfolio_kpis(open_snapshot(directory, version))
+
+    def write(tmp_path):
+        with open(tmp_path, 'w') as sink:
+            json.dump({name: None if np.isnan(value) else value for name, value in kpis.items()}, sink)
+
+    _atomic_write(path, write)
+    prune_kpis(directory, keep=version)
+    return kpis
+
+def kpi_versions(directory):
+    """Versions with a KPI file in ``directory``, oldest first"""
+    return sorted(name[len('kpis-'):-len('.json')] for name in os.listdir(directory)
+                  if name.startswith('kpis-') and name.endswith('.json'))
+
+def prune_kpis(directory, history=KPI_HISTORY, keep=None):
+    """Delete all but the ``history`` latest KPI files, never the one of version ``keep``"""
+    for stale in kpi_versions(directory)[:-history]:
+        if stale != keep:
+            try:
+                os.unlink(_kpi_path(directory, stale))
+            except FileNotFoundError:
+                pass
+
+def previous_version(directory, version=None):
+    """The snapshot published before ``version`` (the current one by default) whose
+    KPIs are still available, or None"""
+    version = version or current_version(directory)
+    earlier = [other for other in set(kpi_versions(directory)).union(snapshot_versions(directory))
+               if other < version]
+    return max(earlier) if earlier else None
+
+def snapshot_deltas(directory, version=None, previous=None):
+    """``compare_kpis`` between a snapshot and the one before it (see ``previous_version``)"""
+    version = version or current_version(directory)
+    previous = previous or previous_version(directory, version)
+    return compare_kpis(snapshot_kpis(directory, version),
+                        snapshot_kpis(directory, previous) if previous else None)
+
+def kpi_delta(deltas, name, unit='', digits=1):
+    """``st.metric`` delta text for one KPI of a ``compare_kpis`` frame
+
+    None (no delta shown) when there is no previous value, and "n/a" when a relative
+    change has a zero baseline.
+    """
+    delta = deltas.at[name, 'delta']
+    if np.isnan(delta):
+        return None
+    if np.isinf(delta):
+        return "n/a"
+    return f"{delta:+,.{digits}f}{'%' if KPI_DELTAS[name] == 'pct' else unit}"
@@ -0,0 +1,199 @@
+"""Versioned model registry with a warm per-process model cache
+
+Each model kind has a directory of immutable ``<version>.json`` artifacts holding the
+model's parameters, next to a ``CURRENT`` file naming the active version, as with
+portfolio snapshots. A process builds each version it uses once and keeps it loaded.
+``ModelRegistry.activate`` loads the new version *before* it swaps ``CURRENT`` with
+``os.replace`` and then the in-process pointer, so scoring carries on with the old
+model until the new one is ready and never pays the load itself. ``current`` re-reads
+the small ``CURRENT`` file on each call, so activations made from another process
+are followed too.
+
+``assess_application`` memoises interactive assessments in ``assessment_cache``,
+keyed by a hash of the normalised inputs plus the active model version, so reruns
+and what-ifs that revisit the same inputs are dictionary lookups.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from .cache import DatasetCache
+from .risk import risk_thresholds
+from .scoring import RiskScorer
+from .snapshot import POINTER_FILE, _atomic_write
+
+DEFAULT_MODEL_DIR = os.environ.get('SMARTCREDIT_MODELS', os.path.join('data', 'models'))
+
+# Model kind -> callable building the model from its artifact's parameters. The NPL
+# forecast and restructuring optimizer have no engine in core yet, so their artifacts
+# load as the parameter dict itself.
+MODEL_LOADERS = {
+    'risk': RiskScorer,
+    'npl_forecast': dict,
+    'restructuring': dict
+}
+MODEL_NAMES = {
+    'risk': "Risk Assessment",
+    'npl_forecast': "NPL Forecast",
+    'restructuring': "Restructuring Optimizer"
+}
+
+def _version_key(version):
+    """Sort key comparing the numbers in a version, so v1.10.0 sorts after v1.9.0"""
+    return [int(part) for part in re.findall(r'\d+', version)], version
+
+class ModelRegistry:
+    """Model artifacts on disk plus the active version of each kind, loaded once per process"""
+
+    def __init__(self, directory=DEFAULT_MODEL_DIR, loaders=None):
+        self.directory = directory
+        self.loaders = loaders or MODEL_LOADERS
+        self._models = {}
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def _path(self, kind, name):
+        if kind not in self.loaders:
+            raise ValueError(f"Unknown model kind: {kind}")
+        return os.path.join(self.directory, kind, name)
+
+    def register(self, kind, version, params, description='', activate=False):
+        """Write a new model artifact and return its version
+
+        Versions are immutable: registering one that exists raises ValueError.
+        """
+        path = self._path(kind, f'{version}.json')
+        if os.path.exists(path):
+            raise ValueError(f"{MODEL_NAMES.get(kind, kind)} model {version} is already registered")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        artifact = {
+            'kind': kind,
+            'version': version,
+            'params': params,
+            'description': description,
+            'registered_at': datetime.now().isoformat(timespec='seconds')
+        }
+
+        def write(tmp_path):
+            with open(tmp_path, 'w') as sink:
+                json.dump(artifact, sink, indent=2)
+
+        _atomic_write(path, write)
+        if activate:
+            self.activate(kind, version)
+        return version
+
+    def versions(self, kind):
+        """Registered versions of ``kind``, oldest first"""
+        directory = os.path.dirname(self._path(kind, POINTER_FILE))
+        if not os.path.isdir(directory):
+            return []
+        return sorted((name[:-len('.json')] for name in os.listdir(directory) if name.endswith('.json')),
+                      key=_version_key)
+
+    def artifact(self, kind, version):
+        """The stored artifact of a version: its ``params``, ``description`` and ``registered_at``"""
+        with open(self._path(kind, f'{version}.json')) as source:
+            return json.load(source)
+
+    def active_version(self, kind):
+        """Version named by the kind's ``CURRENT`` file, or None"""
+        try:
+            with open(self._path(kind, POINTER_FILE)) as pointer:
+                return pointer.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _load(self, kind, version):
+        # Callers hold the lock; each version is built once per process
+        key = (kind, version)
+        if key not in self._models:
+            self._models[key] = self.loaders[kind](**self.artifact(kind, version)['params'])
+        return self._models[key]
+
+    def activate(self, kind, version):
+        """Make ``version`` the active model of ``kind`` and return the seconds spent warming it
+
+        The model is loaded first, then ``CURRENT`` and the in-process pointer are
+        swapped, so a version that fails to load never becomes active.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            model = self._load(kind, version)
+        seconds = time.perf_counter() - start
+
+        def write_pointer(tmp_path):
+            with open(tmp_path, 'w') as pointer:
+                pointer.write(version)
+
+        _atomic_write(self._path(kind, POINTER_FILE), write_pointer)
+        self._active[kind] = (version, model)
+        return seconds
+
+    def current(self, kind):
+        """``(version, model)`` of the active model of ``kind``"""
+        version = self.active_version(kind)
+        if version is None:
+            raise FileNotFoundError(f"No {MODEL_NAMES.get(kind, kind)} model is active in {self.directory}")
+        active = self._active.get(kind)
+        if active is None or active[0] != version:
+            with self._lock:
+                active = (version, self._load(kind, version))
+                self._active[kind] = active
+        return active
+
+    def get(self, kind):
+        """The active model of ``kind``"""
+        return self.current(kind)[1]
+
+    def warm(self):
+        """Load the active version of every kind that has one, e.g. at process start"""
+        for kind in self.loaders:
+            if self.active_version(kind) is not None:
+                self.current(kind)
+
+    def loaded(self):
+        """Versions loaded in this process, per kind"""
+        with self._lock:
+            loaded = {}
+            for kind, version in self._models:
+                loaded.setdefault(kind, []).append(version)
+        return {kind: sorted(versions, key=_version_key) for kind, versions in loaded.items()}
+
+# Module-level instance: imported once per process, so every Streamlit session shares it
+model_registry = ModelRegistry()
+
+# Interactive assessments: bounded LRU with a per-entry TTL, separate from the dataset
+# cache so a burst of what-ifs cannot evict the page datasets
+assessment_cache = DatasetCache(max_entries=4096, max_bytes=16 * 1024 * 1024, ttl=900)
+
+def _normalised(value):
+    # 150000, 150000.0 and np.int64(150000) are the same input
+    return round(float(value), 6) + 0.0
+
+def assessment_key(monthly_income, existing_debt, loan_amount, credit_history, thresholds=None):
+    """Hash of an application's normalised scoring inputs and banding thresholds"""
+    inputs = [_normalised(value) for value in (monthly_income, existing_debt, loan_amount, credit_history)]
+    # No thresholds and the default thresholds band alike, so they share entries
+    bands = sorted((name, _normalised(value)) for name, value in risk_thresholds(thresholds).items())
+    return hashlib.blake2b(json.dumps([inputs, bands]).encode(), digest_size=16).hexdigest()
+
+def assess_application(monthly_income, existing_debt, loan_amount, credit_history, thresholds=None,
+                       registry=None, cache=None):
+    """``RiskScorer.assess`` with the active risk model, memoised per inputs and model
+    version; the result also carries the ``model_version`` that scored it"""
+    registry = registry or model_registry
+    cache = cache or assessment_cache
+    version, scorer = registry.current('risk')
+
+    def compute():
+        assessment = scorer.assess(monthly_income, existing_debt, loan_amount, credit_history, thresholds)
+        return dict(assessment, model_version=version)
+
+    key = assessment_key(monthly_income, existing_debt, loan_amount, credit_history, thresholds)
+    return dict(cache.get(key, version, compute))
@@ -0,0 +1,226 @@
+"""Portfolio KPI aggregation, full and incremental"""
+
+import numpy as np
+import pandas as pd
+
+from .risk import RISK_BANDS
+
+NPL_DPD_THRESHOLD = 90
+LOAN_EVENT_TYPES = ['disbursement', 'repayment', 'dpd_change', 'write_off', 'restructure']
+
+def _label_codes(values, labels):
+    """Positions of ``values`` in the ``labels`` dict, adding labels not seen before"""
+    codes, uniques = pd.factorize(values)
+    positions = np.array([labels.setdefault(label, len(labels)) for label in uniques], dtype=np.intp)
+    return np.where(codes >= 0, positions[codes] if len(positions) else codes, -1)
+
+def _grow(array, shape):
+    """Zero-pad ``array`` up to ``shape`` so accumulators can take on new labels"""
+    return np.pad(array, [(0, new - old) for old, new in zip(array.shape, shape)])
+
+def _distribution(counts, labels):
+    """Label -> count dict ordered like ``value_counts`` (largest first)"""
+    pairs = sorted(zip(labels, counts.astype(int).tolist()), key=lambda pair: -pair[1])
+    return dict(pairs)
+
+def aggregate_portfolio(loans, by=None):
+    """Compute portfolio KPIs in a single pass, optionally per group
+
+    ``loans`` is a loan frame or an iterable of frames (such as ``iter_sample_loans``),
+    so books larger than memory can be summarised chunk by chunk. Each chunk is read once
+    with ``np.bincount`` into running per-group totals; no filtered copies are made.
+    Without ``by`` the result is the ``generate_portfolio_summary`` dict. With ``by``, a
+    column such as 'product_type' or a sector/region column joined onto the loans, it is
+    a frame of the same KPIs indexed by group.
+    """
+    if isinstance(loans, pd.DataFrame):
+        loans = [loans]
+
+    groups, products = {}, {}
+    size = 0 if by else 1
+    count, outstanding, balances, npl = (np.zeros(size) for _ in range(4))
+    risk_counts = np.zeros((size, len(RISK_BANDS)))
+    product_counts = np.zeros((size, 0))
+
+    for chunk in loans:
+        group = _label_codes(chunk[by], groups) if by else np.zeros(len(chunk), dtype=np.intp)
+        product = _label_codes(chunk['product_type'], products)
+        size = max(len(groups), 1 if not by else 0)
+        count, outstanding, balances, npl = (_grow(a, (size,)) for a in (count, outstanding, balances, npl))
+        risk_counts = _grow(risk_counts, (size, len(RISK_BANDS)))
+        product_counts = _grow(product_counts, (size, len(products)))
+
+        in_group = group >= 0
+        group = group[in_group]
+        balance = chunk['outstanding_balance'].to_numpy(dtype=float)[in_group]
+        has_balance = ~np.isnan(balance)
+        # -1 for missing or unknown bands, which are left out of the distribution
+        risk = pd.Index(RISK_BANDS).get_indexer(chunk['risk_band'])[in_group]
+        product = product[in_group]
+
+        count += np.bincount(group, minlength=size)
+        outstanding += np.bincount(group, weights=np.where(has_balance, balance, 0), minlength=size)
+        balances += np.bincount(group, weights=has_balance, minlength=size)
+        npl += np.bincount(group, weights=chunk['days_past_due'].to_numpy()[in_group] > NPL_DPD_THRESHOLD,
+                           minlength=size)
+        for counts, codes in ((risk_counts, risk), (product_counts, product)):
+            known = codes >= 0
+            width = counts.shape[1]
+            counts += np.bincount(group[known] * width + codes[known], minlength=size * width).reshape(size, width)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average = outstanding / balances
+        npl_ratio = np.where(count > 0, npl / count * 100, 0.0)
+
+    summary = pd.DataFrame({
+        'total_loans': count.astype(int),
+        'total_outstanding': outstanding,
+        'average_loan_size': average,
+        'npl_ratio': npl_ratio,
+        'npl_count': npl.astype(int),
+        'risk_distribution': [_distribution(row, RISK_BANDS) for row in risk_counts],
+        'product_distribution': [_distribution(row, list(products)) for row in product_counts]
+    }, index=pd.Index(list(groups), name=by) if by else None)
+
+    if by is None:
+        return {key: value.item() if hasattr(value, 'item') else value
+                for key, value in summary.iloc[0].items()}
+    return summary
+
+def generate_portfolio_summary(loans_df, by=None):
+    """Generate portfolio summary statistics
+
+    Thin wrapper over ``aggregate_portfolio``; pass ``by`` to get one row per group.
+    """
+    return aggregate_portfolio(loans_df, by=by)
+
+class PortfolioKPITracker:
+    """Portfolio KPIs kept current by applying loan events as O(1) deltas
+
+    Holds each loan's balance, DPD, risk band and product plus running totals, so
+    ``summary()`` matches ``generate_portfolio_summary`` over the same book without
+    rescanning it. Events are dicts with a ``type`` from ``LOAN_EVENT_TYPES`` and a
+    ``loan_id``:
+
+    - ``disbursement``: ``amount``, ``product_type`` and optional ``risk_band``
+    - ``repayment``: ``amount`` off the outstanding balance (floored at zero)
+    - ``dpd_change``: new ``days_past_due``
+    - ``write_off``: balance to zero
+    - ``restructure``: DPD back to zero, optional new ``outstanding_balance``/``risk_band``
+
+    ``reconcile`` compares against a full recompute and can reset the state from it.
+    As in ``aggregate_portfolio``, a missing balance counts towards ``total_loans`` but
+    not towards the outstanding total or the average loan size.
+    """
+
+    def __init__(self, loans_df=None):
+        self._reset(loans_df if loans_df is not None else pd.DataFrame(
+            columns=['loan_id', 'product_type', 'outstanding_balance', 'days_past_due', 'risk_band']))
+
+    def _reset(self, loans_df):
+        summary = aggregate_portfolio(loans_df)
+        self.total_loans = summary['total_loans']
+        self.total_outstanding = summary['total_outstanding']
+        balances = loans_df['outstanding_balance'].to_numpy(dtype=float)
+        self.balance_count = int(np.count_nonzero(~np.isnan(balances)))
+        self.npl_count = summary['npl_count']
+        self.risk_counts = dict.fromkeys(RISK_BANDS, 0) | summary['risk_distribution']
+        self.product_counts = dict(summary['product_distribution'])
+        self.events_applied = 0
+        self._loans = {
+            loan_id: [balance, dpd, band, product]
+            for loan_id, balance, dpd, band, product in zip(
+                loans_df['loan_id'].tolist(), balances.tolist(),
+                loans_df['days_past_due'].tolist(), loans_df['risk_band'].tolist(), loans_df['product_type'].tolist())
+        }
+
+    def apply(self, event):
+        """Apply one loan event to the running aggregates"""
+        kind = event['type']
+        if kind not in LOAN_EVENT_TYPES:
+            raise ValueError(f"Unknown loan event type: {kind}")
+
+        if kind == 'disbursement':
+            if event['loan_id'] in self._loans:
+                raise ValueError(f"Loan {event['loan_id']} is already on the book")
+            loan = [np.nan, 0, event.get('risk_band', 'Low'), event['product_type']]
+            self._loans[event['loan_id']] = loan
+            self.total_loans += 1
+            self._count_band(loan[2], 1)
+            self.product_counts[loan[3]] = self.product_counts.get(loan[3], 0) + 1
+            self._set_balance(loan, event['amount'])
+        else:
+            loan = self._loans[event['loan_id']]
+            if kind == 'repayment':
+                self._set_balance(loan, max(loan[0] - event['amount'], 0.0))
+            elif kind == 'dpd_change':
+                self._set_dpd(loan, event['days_past_due'])
+            elif kind == 'write_off':
+                self._set_balance(loan, 0.0)
+            elif kind == 'restructure':
+                self._set_dpd(loan, 0)
+                if 'outstanding_balance' in event:
+                    self._set_balance(loan, event['outstanding_balance'])
+                if 'risk_band' in event:
+                    self._count_band(loan[2], -1)
+                    loan[2] = event['risk_band']
+                    self._count_band(loan[2], 1)
+        self.events_applied += 1
+
+    def apply_events(self, events):
+        """Apply an iterable of loan events in order; returns the number applied"""
+        applied = 0
+        for event in events:
+            self.apply(event)
+            applied += 1
+        return applied
+
+    def _set_balance(self, loan, balance):
+        # NaN balances are left out of the total and of the average's denominator
+        known, was_known = not np.isnan(balance), not np.isnan(loan[0])
+        self.total_outstanding += (balance if known else 0.0) - (loan[0] if was_known else 0.0)
+        self.balance_count += known - was_known
+        loan[0] = balance
+
+    def _count_band(self, band, step):
+        # Missing or unknown bands are left out, as in aggregate_portfolio
+        if band in self.risk_counts:
+            self.risk_counts[band] += step
+
+    def _set_dpd(self, loan, dpd):
+        self.npl_count += (dpd > NPL_DPD_THRESHOLD) - (loan[1] > NPL_DPD_THRESHOLD)
+        loan[1] = dpd
+
+    def summary(self):
+        """Current KPIs in the ``generate_portfolio_summary`` shape"""
+        return {
+            "total_loans": self.total_loans,
+            "total_outstanding": self.total_outstanding,
+            "average_loan_size": self.total_outstanding / self.balance_count if self.balance_count else float('nan'),
+            "npl_ratio": self.npl_count / self.total_loans * 100 if self.total_loans else 0.0,
+            "npl_count": self.npl_count,
+            "risk_distribution": _distribution(np.array(list(self.risk_counts.values())), list(self.risk_counts)),
+            "product_distribution": _distribution(np.array(list(self.product_counts.values())), list(self.product_counts))
+        }
+
+    def reconcile(self, loans_df, reset=False, rel_tol=1e-9):
+        """Compare the running KPIs with a full recompute over ``loans_df``
+
+        Returns ``{kpi: (incremental, recomputed)}`` for every KPI that differs (an
+        empty dict when in sync). With ``reset=True`` the state is rebuilt from
+        ``loans_df`` afterwards.
+        """
+        current, expected = self.summary(), aggregate_portfolio(loans_df)
+        drift = {}
+        for key, value in expected.items():
+            if isinstance(value, dict):
+                matches = {k: v for k, v in current[key].items() if v} == {k: v for k, v in value.items() if v}
+            elif np.isnan(value):
+                matches = np.isnan(current[key])
+            else:
+                matches = np.isclose(current[key], value, rtol=rel_tol, atol=0)
+            if not matches:
+                drift[key] = (current[key], value)
+        if reset:
+            self._reset(loans_df)
+        return drift
@@ -0,0 +1,285 @@
+"""Maintained top-K index of the riskiest open loans
+
+Loans rank by risk band, then days past due, then loan ID, packed into one int64 key
+per loan so that ascending key order is riskiest first. Instead of sorting the book
+on every render, ``AtRiskIndex`` keeps a short sorted list of the best-ranked keys
+for each filter combination it has been asked for (the whole book, one region, one
+region and product, ...) and patches those lists as loan events arrive. A list only
+holds the keys below its ``bound``; when updates leave it shorter than a request it
+is refilled with one ``np.partition`` over that group.
+"""
+
+import bisect
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .portfolio import LOAN_EVENT_TYPES, _label_codes
+from .risk import RISK_BANDS
+from .schema import ID_PREFIXES, decode_ids, encode_ids
+
+CLOSED_STATUSES = ('Closed', 'Written Off')
+DEFAULT_FILTERS = ('region', 'product_type')
+DEFAULT_DETAILS = ('borrower_id', 'borrower', 'outstanding_balance')
+
+# Key layout: (priority span - 1 - priority) << 32 | loan_id, where priority is
+# (band code + 1) * DPD_SPAN + DPD; unknown bands rank below Low
+DPD_SPAN = 1 << 16
+ID_SPAN = 1 << 32
+PRIORITY_SPAN = (len(RISK_BANDS) + 1) * DPD_SPAN
+
+logger = logging.getLogger(__name__)
+
+BAND_LABELS = np.array([*RISK_BANDS, None], dtype=object)
+
+def _keys(band_codes, days_past_due, loan_id):
+    priority = (np.asarray(band_codes, dtype=np.int64) + 1) * DPD_SPAN + np.clip(
+        np.asarray(days_past_due, dtype=np.int64), 0, DPD_SPAN - 1)
+    return (PRIORITY_SPAN - 1 - priority) * ID_SPAN + np.asarray(loan_id, dtype=np.int64)
+
+def rank_keys(risk_band, days_past_due, loan_id):
+    """Vectorised int64 rank keys; the smallest key is the riskiest loan"""
+    return _keys(pd.Categorical(risk_band, categories=RISK_BANDS).codes, days_past_due, loan_id)
+
+def _key(band_code, days_past_due, loan_id):
+    priority = (int(band_code) + 1) * DPD_SPAN + min(max(int(days_past_due), 0), DPD_SPAN - 1)
+    return (PRIORITY_SPAN - 1 - priority) * ID_SPAN + int(loan_id)
+
+def _band_code(risk_band):
+    return RISK_BANDS.index(risk_band) if risk_band in RISK_BANDS else -1
+
+class AtRiskIndex:
+    """Top-K riskiest open loans, overall or filtered, kept current from loan events
+
+    ``loans`` needs ``loan_id``, ``risk_band`` and ``days_past_due``, plus the
+    ``filters`` columns that ``top`` may filter on and any ``details`` columns to carry
+    into its results; a ``status`` column excludes closed and written-off loans.
+    ``capacity`` is how many keys each filter combination keeps ready. Events use the
+    ``PortfolioKPITracker`` format. The index is thread-safe, so one instance can be
+    shared across sessions.
+    """
+
+    def __init__(self, loans, filters=DEFAULT_FILTERS, details=DEFAULT_DETAILS, capacity=100):
+        self.filters = tuple(filters)
+        self.capacity = capacity
+        self._details = tuple(column for column in details if column in loans.columns)
+        self._lock = threading.Lock()
+        self._load(loans)
+
+    @classmethod
+    def from_store(cls, store, **kwargs):
+        """Build the index over a ``core.store.LoanStore`` and remember its version"""
+        loans, version = store.risk_positions()
+        index = cls(loans, **kwargs)
+        index.version = version
+        return index
+
+    def _load(self, loans):
+        loan_id = loans['loan_id']
+        if not pd.api.types.is_integer_dtype(loan_id.dtype):
+            loan_id = encode_ids(loan_id, ID_PREFIXES['loan_id'])
+        loan_id = np.asarray(loan_id, dtype=np.int64)
+
+        self.version = None
+        self._size = len(loans)
+        self._positions = pd.Index(loan_id)
+        self._added = {}
+        self._loan_id = loan_id
+        self._band = pd.Categorical(loans['risk_band'], categories=RISK_BANDS).codes.astype(np.int8)
+        self._dpd = loans['days_past_due'].to_numpy(dtype=np.int64, copy=True)
+        self._open = (~loans['status'].isin(CLOSED_STATUSES)).to_numpy(copy=True) if 'status' in loans else np.ones(len(loans), bool)
+        self._keys = _keys(self._band, self._dpd, loan_id)
+        self._labels = {column: {} for column in self.filters}
+        self._codes = {column: _label_codes(loans[column], self._labels[column]) for column in self.filters}
+        self._values = {column: loans[column].to_numpy(copy=True) for column in self._details}
+        self._lists = {}
+        self._bounds = {}
+
+    def _position(self, loan_id):
+        if isinstance(loan_id, str):
+            loan_id = int(loan_id[len(ID_PREFIXES['loan_id']):])
+        position = self._added.get(loan_id)
+        if position is None:
+            position = self._positions.get_loc(loan_id)
+        return position
+
+    def _append(self, loan_id, band, values):
+        """Add a loan row, doubling the backing arrays when they are full"""
+        if self._size == len(self._keys):
+            extra = max(len(self._keys), 16)
+            self._loan_id, self._dpd, self._keys = (np.concatenate([a, np.zeros(extra, a.dtype)])
+                                                    for a in (self._loan_id, self._dpd, self._keys))
+            self._open = np.concatenate([self._open, np.zeros(extra, bool)])
+            self._band = np.concatenate([self._band, np.full(extra, -1, np.int8)])
+            for column in self.filters:
+                self._codes[column] = np.concatenate([self._codes[column], np.full(extra, -1, np.intp)])
+            for column, array in self._values.items():
+                self._values[column] = np.concatenate([array, np.zeros(extra, array.dtype)])
+        position = self._size
+        self._size += 1
+        self._added[loan_id] = position
+        self._loan_id[position] = loan_id
+        self._band[position] = _band_code(band)
+        for column in self.filters:
+            label = values.get(column)
+            self._codes[column][position] = -1 if label is None else self._labels[column].setdefault(label, len(self._labels[column]))
+        for column, array in self._values.items():
+            value = values.get(column)
+            if value is None and array.dtype.kind in 'iuf':
+                value = np.nan if array.dtype.kind == 'f' else 0
+            array[position] = value
+        return position
+
+    def _group(self, filters):
+        """Normalised group key for a filter dict, or None when a value is unknown"""
+        unknown = set(filters) - set(self.filters)
+        if unknown:
+            raise ValueError(f"Cannot filter the at-risk index by {', '.join(sorted(unknown))}")
+        group = []
+        for column in self.filters:
+            if filters.get(column) is not None:
+                code = self._labels[column].get(filters[column])
+                if code is None:
+                    return None
+                group.append((column, code))
+        return tuple(group)
+
+    def _build(self, group, capacity):
+        """Refill a group's list with its ``capacity`` riskiest keys"""
+        members = self._open[:self._size].copy()
+        for column, code in group:
+            members &= self._codes[column][:self._size] == code
+        keys = self._keys[:self._size][members]
+        if len(keys) <= capacity:
+            self._lists[group] = np.sort(keys).tolist()
+            self._bounds[group] = None
+        else:
+            keys = np.partition(keys, capacity)
+            self._lists[group] = np.sort(keys[:capacity]).tolist()
+            self._bounds[group] = int(keys[capacity])
+
+    def _rekey(self, position, key, is_open):
+        """Move one loan to a new key/open state in every group list it belongs to"""
+        old_key, was_open = int(self._keys[position]), bool(self._open[position])
+        self._keys[position], self._open[position] = key, is_open
+        for group, keys in self._lists.items():
+            if any(self._codes[column][position] != code for column, code in group):
+                continue
+            bound = self._bounds[group]
+            if was_open and (bound is None or old_key < bound):
+                del keys[bisect.bisect_left(keys, old_key)]
+            if is_open and (bound is None or key < bound):
+                bisect.insort(keys, key)
+                if len(keys) > 2 * self.capacity:
+                    self._bounds[group] = keys[self.capacity]
+                    del keys[self.capacity:]
+
+    def apply(self, event):
+        """Apply one loan event to the index
+
+        Events for loans the index does not hold are logged and skipped; returns
+        whether the event was applied.
+        """
+        with self._lock:
+            return self._apply(event)
+
+    def _apply(self, event):
+        # Callers hold the lock
+        kind = event['type']
+        if kind not in LOAN_EVENT_TYPES:
+            raise ValueError(f"Unknown loan event type: {kind}")
+        if kind == 'disbursement':
+            loan_id = event['loan_id']
+            if isinstance(loan_id, str):
+                loan_id = int(loan_id[len(ID_PREFIXES['loan_id']):])
+            if loan_id in self._added or loan_id in self._positions:
+                raise ValueError(f"Loan {event['loan_id']} is already in the index")
+            band = event.get('risk_band', 'Low')
+            position = self._append(loan_id, band, event | {'outstanding_balance': event['amount']})
+            self._rekey(position, _key(self._band[position], 0, loan_id), True)
+            return True
+
+        try:
+            position = self._position(event['loan_id'])
+        except KeyError:
+            logger.warning("Skipping %s event for unknown loan %s", kind, event['loan_id'])
+            return False
+        key_args = [self._band[position], self._dpd[position], self._loan_id[position]]
+        is_open = bool(self._open[position])
+        if kind == 'repayment':
+            if 'outstanding_balance' in self._values:
+                balances = self._values['outstanding_balance']
+                balances[position] = max(balances[position] - event['amount'], 0.0)
+            return True
+        elif kind == 'dpd_change':
+            key_args[1] = self._dpd[position] = event['days_past_due']
+        elif kind == 'write_off':
+            is_open = False
+            if 'outstanding_balance' in self._values:
+                self._values['outstanding_balance'][position] = 0.0
+        elif kind == 'restructure':
+            # Mirrors LoanStore.record_events: a restructured loan is open again
+            key_args[1] = self._dpd[position] = 0
+            is_open = True
+            if 'risk_band' in event:
+                key_args[0] = self._band[position] = _band_code(event['risk_band'])
+            if 'outstanding_balance' in event and 'outstanding_balance' in self._values:
+                self._values['outstanding_balance'][position] = event['outstanding_balance']
+        self._rekey(position, _key(*key_args), is_open)
+        return True
+
+    def apply_events(self, events):
+        """Apply an iterable of loan events in order; returns the number applied"""
+        with self._lock:
+            return sum(self._apply(event) for event in events)
+
+    def sync(self, store):
+        """Catch up with a ``LoanStore``: replay new events, or rebuild after a bulk load
+
+        Returns the number of events applied (0 after a rebuild). The whole catch-up
+        holds the lock, so concurrent syncs cannot replay the same events twice.
+        """
+        with self._lock:
+            generation, last_event = (self.version or '0.0').split('.')
+            current = store.version()
+            if current == self.version:
+                return 0
+            if current.split('.')[0] != generation:
+                loans, version = store.risk_positions()
+                self._load(loans)
+                self.version = version
+                return 0
+            events, version = store.events(after=int(last_event))
+            applied = sum(self._apply(event) for event in events)
+            self.version = version
+            return applied
+
+    def top(self, n=5, **filters):
+        """The ``n`` riskiest open loans matching ``filters`` (e.g. ``region='Coast'``)
+
+        Returns a frame of loan_id, the detail columns, days_past_due, risk_band and
+        the filter columns, riskiest first, with LOAN/BORR string IDs.
+        """
+        with self._lock:
+            group = self._group(filters)
+            if group is None:
+                keys = []
+            else:
+                if group not in self._lists or (len(self._lists[group]) < n and self._bounds[group] is not None):
+                    self._build(group, max(self.capacity, n))
+                keys = self._lists[group][:n]
+            positions = np.array([self._position(key % ID_SPAN) for key in keys], dtype=np.intp)
+            columns = {'loan_id': decode_ids(self._loan_id[positions], ID_PREFIXES['loan_id'])}
+            for column in self._details:
+                values = self._values[column][positions]
+                if column in ID_PREFIXES and values.dtype.kind in 'iu':
+                    values = decode_ids(values, ID_PREFIXES[column])
+                columns[column] = values
+            columns['days_past_due'] = self._dpd[positions]
+            columns['risk_band'] = BAND_LABELS[self._band[positions]]
+            for column in self.filters:
+                labels = np.array(list(self._labels[column]) + [None], dtype=object)
+                columns[column] = labels[self._codes[column][positions]]
+        return pd.DataFrame(columns)
@@ -0,0 +1,134 @@
+"""Risk banding and loan-application validation"""
+
+import numpy as np
+import pandas as pd
+
+from ._columns import _categorical
+
+RISK_BANDS = ['Low', 'Medium', 'High', 'Critical']
+RISK_THRESHOLDS = {'critical_thresh': 80, 'high_thresh': 60, 'medium_thresh': 40}
+VALIDATION_REASONS = ['Debt-to-income ratio too high', 'Loan amount exceeds annual income', 'Loan term too long']
+VALIDATION_SUGGESTIONS = ['Reduce loan amount or increase income', 'Reduce loan amount', 'Maximum term is 60 months']
+
+def risk_thresholds(settings=None):
+    """Risk score cut-offs keyed like the Admin page inputs, overridden by ``settings``
+
+    ``settings`` is any mapping holding ``critical_thresh``, ``high_thresh`` and
+    ``medium_thresh`` (for example the saved Admin configuration); missing keys keep
+    their defaults. Raises ValueError unless critical > high > medium.
+    """
+    thresholds = dict(RISK_THRESHOLDS)
+    if settings is not None:
+        thresholds.update({key: settings[key] for key in RISK_THRESHOLDS if key in settings})
+    if not thresholds['critical_thresh'] > thresholds['high_thresh'] > thresholds['medium_thresh']:
+        raise ValueError(f"Risk thresholds must satisfy critical > high > medium: {thresholds}")
+    return thresholds
+
+def calculate_risk_band(score, thresholds=None):
+    """Calculate risk band from numerical score (0-100)"""
+    thresholds = risk_thresholds(thresholds)
+    if score >= thresholds['critical_thresh']:
+        return "Critical"
+    elif score >= thresholds['high_thresh']:
+        return "High"
+    elif score >= thresholds['medium_thresh']:
+        return "Medium"
+    else:
+        return "Low"
+
+def classify_risk_bands(scores, thresholds=None):
+    """Band a whole array or Series of scores in one pass
+
+    Applies the same cut-offs as ``calculate_risk_band`` with ``np.searchsorted`` and
+    returns ``(bands, counts)``: an ordered categorical (a Series when ``scores`` is one,
+    keeping its index) and a dict of band counts in ``RISK_BANDS`` order. Missing scores
+    get no band and are left out of the counts.
+    """
+    thresholds = risk_thresholds(thresholds)
+    cutoffs = [thresholds['medium_thresh'], thresholds['high_thresh'], thresholds['critical_thresh']]
+    values = np.asarray(scores, dtype=float)
+
+    codes = np.searchsorted(cutoffs, values, side='right')
+    missing = np.isnan(values)
+    codes[missing] = -1
+    counts = np.bincount(codes[~missing], minlength=len(RISK_BANDS))
+
+    bands = _categorical(codes, RISK_BANDS, ordered=True)
+    if isinstance(scores, pd.Series):
+        bands = pd.Series(bands, index=scores.index, name='risk_band')
+    return bands, dict(zip(RISK_BANDS, counts.tolist()))
+
+def calculate_debt_to_income(monthly_debt, monthly_income):
+    """Calculate debt-to-income ratio"""
+    if monthly_income == 0:
+        return float('inf')
+    return (monthly_debt / monthly_income) * 100
+
+def validate_loan_parameters(loan_amount, income, existing_debt=0, term_months=12):
+    """Validate loan parameters and return approval recommendation"""
+    dti = calculate_debt_to_income(existing_debt + (loan_amount / term_months), income)
+    
+    if dti > 60:
+        return {
+            "approved": False,
+            "reason": "Debt-to-income ratio too high",
+            "dti_ratio": f"{dti:.1f}%",
+            "suggestion": "Reduce loan amount or increase income"
+        }
+    elif loan_amount > income * 12:
+        return {
+            "approved": False,
+            "reason": "Loan amount exceeds annual income",
+            "suggestion": "Reduce loan amount"
+        }
+    elif term_months > 60:
+        return {
+            "approved": False,
+            "reason": "Loan term too long",
+            "suggestion": "Maximum term is 60 months"
+        }
+    else:
+        return {
+            "approved": True,
+            "dti_ratio": f"{dti:.1f}%",
+            "message": "Loan parameters are acceptable"
+        }
+
+def validate_loan_applications(loan_amount, income, existing_debt=0, term_months=12):
+    """Validate a batch of loan applications given as columns
+
+    Applies the rules of ``validate_loan_parameters`` in the same order to whole arrays
+    and returns one row per application with ``approved``, ``dti_ratio`` (a float, inf
+    for zero income) and categorical ``reason`` and ``suggestion`` columns whose codes
+    index ``VALIDATION_REASONS`` and ``VALIDATION_SUGGESTIONS``; approved rows have
+    neither.
+    """
+    loan_amount, income, existing_debt, term_months = np.broadcast_arrays(
+        np.asarray(loan_amount, dtype=float), np.asarray(income, dtype=float),
+        np.asarray(existing_debt, dtype=float), np.asarray(term_months, dtype=float))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        monthly_debt = existing_debt + loan_amount / term_months
+        dti = np.where(income == 0, np.inf, monthly_debt / income * 100)
+
+    # Rule index 0-2 in priority order, 3 when every rule passes
+    rule = np.select([dti > 60, loan_amount > income * 12, term_months > 60], [0, 1, 2], default=3)
+    approved = rule == 3
+    codes = np.where(approved, -1, rule)
+
+    return pd.DataFrame({
+        'approved': approved,
+        'reason': _categorical(codes, VALIDATION_REASONS),
+        'dti_ratio': dti,
+        'suggestion': _categorical(codes, VALIDATION_SUGGESTIONS)
+    })
+
+def get_risk_color(risk_band):
+    """Get color code for risk bands"""
+    color_map = {
+        'Low': '#28a745',
+        'Medium': '#ffc107', 
+        'High': '#fd7e14',
+        'Critical': '#dc3545'
+    }
+    return color_map.get(risk_band, '#6c757d')
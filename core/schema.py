@@ -0,0 +1,120 @@
+"""Compact in-memory layout for the loan book
+
+The canonical compact schema stores IDs as int32 numbers, labels as categoricals,
+DPD and terms as int16, rates as float32 and dates as datetime64. Money columns stay
+float64 so balances keep their precision. Against the legacy layout (object-string
+IDs and labels, every number 64-bit) the target is a reduction of at least
+``COMPACT_TARGET_REDUCTION`` times; ``memory_footprint`` reports what a given frame
+actually achieves.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .risk import RISK_BANDS
+
+COMPACT_TARGET_REDUCTION = 4
+ID_PREFIXES = {'loan_id': 'LOAN', 'borrower_id': 'BORR'}
+
+COMPACT_LOAN_SCHEMA = {
+    'loan_id': 'int32',
+    'borrower_id': 'int32',
+    'product_type': 'category',
+    'loan_amount': 'float64',
+    'outstanding_balance': 'float64',
+    'interest_rate': 'float32',
+    'term_months': 'int16',
+    'days_past_due': 'int16',
+    'status': 'category',
+    'risk_band': pd.CategoricalDtype(RISK_BANDS, ordered=True),
+    'collateral_value': 'float64',
+    'origination_date': 'datetime64[ns]',
+    # Borrower attributes joined onto loans for slicing (LoanStore.loans(borrower_columns=...))
+    'segment': 'category',
+    'region': 'category'
+}
+
+COMPACT_BORROWER_SCHEMA = {
+    'borrower_id': 'int32',
+    'segment': 'category',
+    'employment_type': 'category',
+    'income_band': 'category',
+    'monthly_income': 'int32',
+    'region': 'category',
+    'credit_score': 'int16',
+    'registration_date': 'datetime64[ns]'
+}
+
+def encode_ids(values, prefix):
+    """Integer part of IDs such as LOAN000042 as int32
+
+    Categorical input is decoded once per category rather than once per row.
+    """
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        numbers = encode_ids(values.cat.categories.astype(str), prefix)
+        return numbers[values.cat.codes.to_numpy()]
+    return pd.to_numeric(values.astype(str).str.slice(len(prefix))).to_numpy(dtype=np.int32)
+
+def decode_ids(numbers, prefix, width=3):
+    """Inverse of ``encode_ids``: zero-padded string IDs as an object array"""
+    digits = np.asarray(numbers).astype(str)
+    if not digits.size:
+        # np.char.zfill cannot size its output for an empty array
+        return np.empty(digits.shape, dtype=object)
+    return np.char.add(prefix, np.char.zfill(digits, width)).astype(object)
+
+def _compact(frame, schema):
+    columns = {}
+    for column, values in frame.items():
+        dtype = schema.get(column)
+        if dtype is None:
+            columns[column] = values
+        elif column in ID_PREFIXES and not pd.api.types.is_integer_dtype(values.dtype):
+            columns[column] = encode_ids(values, ID_PREFIXES[column])
+        elif column == 'days_past_due':
+            # A missing DPD means not past due, as in core.ingest
+            columns[column] = values.fillna(0).clip(upper=np.iinfo(np.int16).max).astype(dtype)
+        elif isinstance(dtype, str) and pd.api.types.is_integer_dtype(dtype) and values.hasnans:
+            # Other missing counts (e.g. the term of a loan disbursed through an event) stay missing
+            columns[column] = values.astype(dtype.capitalize())
+        else:
+            columns[column] = values.astype(dtype)
+    return pd.DataFrame(columns, index=frame.index)
+
+def _expand(frame, width):
+    columns = dict(frame.items())
+    for column, prefix in ID_PREFIXES.items():
+        if column in columns and pd.api.types.is_integer_dtype(columns[column].dtype):
+            columns[column] = decode_ids(columns[column].to_numpy(), prefix, width)
+    return pd.DataFrame(columns, index=frame.index)
+
+def compact_loans(loans):
+    """Convert a loan frame to ``COMPACT_LOAN_SCHEMA``; other columns pass through"""
+    return _compact(loans, COMPACT_LOAN_SCHEMA)
+
+def compact_borrowers(borrowers):
+    """Convert a borrower frame to ``COMPACT_BORROWER_SCHEMA``; names and contacts pass through"""
+    return _compact(borrowers, COMPACT_BORROWER_SCHEMA)
+
+def expand_loans(loans, width=3):
+    """Turn the integer IDs of a compact loan frame back into LOAN/BORR strings"""
+    return _expand(loans, width)
+
+def expand_borrowers(borrowers, width=3):
+    """Turn the integer IDs of a compact borrower frame back into BORR strings"""
+    return _expand(borrowers, width)
+
+def memory_footprint(before, after):
+    """Per-column deep memory use of two layouts of the same frame, in bytes
+
+    Returns a frame with ``before``, ``after`` and ``reduction`` (before / after)
+    columns and a ``total`` row, e.g. ``memory_footprint(loans, compact_loans(loans))``.
+    """
+    report = pd.DataFrame({
+        'before': before.memory_usage(index=False, deep=True),
+        'after': after.memory_usage(index=False, deep=True)
+    })
+    report.loc['total'] = report.sum()
+    report['reduction'] = report['before'] / report['after']
+    return report
@@ -0,0 +1,267 @@
+"""Vectorised borrower risk scoring for the whole book
+
+The Risk Analysis score is the debt-to-income ratio (existing plus requested debt
+over annual income, in percent) plus half a point for every month of credit history
+short of ten years, clamped to 20-100. ``RiskScorer`` evaluates it on whole arrays,
+so the same code scores one what-if assessment on the page and every borrower in the
+store. ``borrower_features`` derives the inputs for the book in one pass: each
+borrower's open balances are summed with ``np.bincount`` and the credit history is
+the time since registration.
+
+Every saved score carries a hash of the inputs it was computed from, the scorer's
+parameters and the banding thresholds. ``score_store(..., changed_only=True)``
+recomputes the hashes for the book, a single vectorised pass, and rescores and
+saves only the borrowers whose hash differs, so an intraday run costs little more
+than reading the inputs.
+
+Batch runs over large books can use several cores: given ``workers`` above one and
+at least ``PARALLEL_MIN_ROWS`` rows (below that, starting the pool costs more than
+it saves), ``score_features`` copies the feature columns once into shared memory,
+and a process pool scores row ranges of them in place, writing scores, band codes
+and factor masks into shared output arrays at the same positions. Workers receive
+only segment names and row bounds, nothing is pickled per row, and the merged result
+is in input order by construction. Scoring stays in-process by default.
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from ._columns import _categorical
+from .factors import risk_factor_mask
+from .kpi import CLOSED_STATUSES
+from .risk import RISK_BANDS, classify_risk_bands, risk_thresholds
+
+SCORE_FEATURES = ('monthly_income', 'existing_debt', 'loan_amount', 'credit_history')
+DAYS_PER_MONTH = 365.25 / 12
+SCORE_CHUNK_ROWS = 250000
+PARALLEL_MIN_ROWS = 1000000
+
+class RiskScorer:
+    """The Risk Analysis scoring formula, applied to scalars or whole arrays"""
+
+    def __init__(self, history_weight=0.5, full_history=120, floor=20, cap=100):
+        self.history_weight = history_weight
+        self.full_history = full_history
+        self.floor = floor
+        self.cap = cap
+
+    def debt_to_income(self, monthly_income, existing_debt, loan_amount=0):
+        """Existing plus requested debt as a percentage of annual income"""
+        income = np.asarray(monthly_income, dtype=float) * 12
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = (np.asarray(existing_debt, dtype=float) + loan_amount) / income * 100
+        return np.where(income == 0, np.inf, ratio)
+
+    def score(self, monthly_income, existing_debt, loan_amount, credit_history):
+        """Risk scores (``floor``-``cap``); NaN where an input is missing"""
+        history = np.clip(np.asarray(credit_history, dtype=float), 0, self.full_history)
+        raw = (self.debt_to_income(monthly_income, existing_debt, loan_amount)
+               + (self.full_history - history) * self.history_weight)
+        return np.clip(raw, self.floor, self.cap)
+
+    def score_frame(self, features, thresholds=None):
+        """``risk_score`` and ``risk_band`` for a frame of ``SCORE_FEATURES``
+        (``loan_amount`` may be left out), keeping its index"""
+        loan_amount = features['loan_amount'].to_numpy(dtype=float) if 'loan_amount' in features else 0.0
+        scores = pd.Series(self.score(features['monthly_income'].to_numpy(dtype=float),
+                                      features['existing_debt'].to_numpy(dtype=float), loan_amount,
+                                      features['credit_history'].to_numpy(dtype=float)),
+                           index=features.index, name='risk_score')
+        bands, _ = classify_risk_bands(scores, thresholds)
+        return pd.DataFrame({'risk_score': scores, 'risk_band': bands})
+
+    def assess(self, monthly_income, existing_debt, loan_amount, credit_history, thresholds=None):
+        """Score, band and debt-to-income ratio of a single application"""
+        score = float(self.score(monthly_income, existing_debt, loan_amount, credit_history))
+        bands, _ = classify_risk_bands([score], thresholds)
+        return {
+            'risk_score': score,
+            'risk_band': bands[0],
+            'debt_to_income': float(self.debt_to_income(monthly_income, existing_debt, loan_amount))
+        }
+
+def credit_history_months(registration_date, as_of=None):
+    """Whole months from registration to ``as_of`` (today by default)"""
+    anchor = np.datetime64(pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.today(), 'D')
+    registered = pd.to_datetime(registration_date).to_numpy(dtype='datetime64[D]')
+    days = (anchor - registered).astype(float)
+    return np.floor(np.where(np.isnat(registered), np.nan, days) / DAYS_PER_MONTH)
+
+def borrower_features(borrowers, loans, as_of=None):
+    """Scoring inputs per borrower, indexed by the (integer) ``borrower_id``
+
+    ``borrowers`` needs ``borrower_id``, ``monthly_income`` and ``registration_date``
+    (``employment_type`` is carried along for the risk factors when present);
+    ``loans`` needs ``borrower_id``, ``outstanding_balance`` and ``status``. Existing
+    debt is the balance of the borrower's loans that are not closed or written off.
+    No loan is being requested, so ``loan_amount`` is 0.
+    """
+    ids = borrowers['borrower_id'].to_numpy(dtype=np.int64)
+    loan_owner = loans['borrower_id'].to_numpy(dtype=np.int64)
+    balance = np.nan_to_num(loans['outstanding_balance'].to_numpy(dtype=float))
+    open_balance = np.where(loans['status'].isin(CLOSED_STATUSES).to_numpy(), 0.0, balance)
+
+    # Debt per borrower ID, then looked up for each borrower row
+    size = int(max(ids.max(initial=0), loan_owner.max(initial=0))) + 1
+    debt = np.bincount(loan_owner, weights=open_balance, minlength=size)[ids]
+    features = pd.DataFrame({
+        'monthly_income': borrowers['monthly_income'].to_numpy(dtype=float),
+        'existing_debt': debt,
+        'loan_amount': 0.0,
+        'credit_history': credit_history_months(borrowers['registration_date'], as_of)
+    }, index=pd.Index(ids, name='borrower_id'))
+    if 'employment_type' in borrowers:
+        features['employment_type'] = borrowers['employment_type'].array
+    return features
+
+def _attach(blocks):
+    """Shared memory segments and arrays over them from ``{key: (name, dtype, length)}``"""
+    segments = {key: shared_memory.SharedMemory(name=name) for key, (name, _, _) in blocks.items()}
+    arrays = {key: np.ndarray(length, dtype=dtype, buffer=segments[key].buf)
+              for key, (_, dtype, length) in blocks.items()}
+    return segments, arrays
+
+def _close(segments):
+    """Close shared memory segments without masking an exception in flight"""
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            # A view is still exported; the mapping is released with it instead
+            pass
+
+def _score_chunk(blocks, start, stop, scorer, thresholds, categories):
+    """Score rows ``start:stop`` of the shared feature arrays into the shared outputs"""
+    segments, arrays = _attach(blocks)
+    features = scores = None
+    try:
+        features = pd.DataFrame({column: arrays[column][start:stop] for column in SCORE_FEATURES}, copy=False)
+        if categories is not None:
+            features['employment_type'] = _categorical(arrays['employment_type'][start:stop], categories)
+        scores = score_features(features, scorer, thresholds, workers=1)
+        arrays['risk_score'][start:stop] = scores['risk_score'].to_numpy()
+        arrays['risk_band'][start:stop] = scores['risk_band'].cat.codes.to_numpy()
+        arrays['risk_factors'][start:stop] = scores['risk_factors'].to_numpy()
+    finally:
+        # The views must go before the segments can be closed
+        features = scores = None
+        arrays.clear()
+        _close(segments.values())
+
+def _score_parallel(features, scorer, thresholds, workers, chunk_rows):
+    count = len(features)
+    inputs = {column: (features[column].to_numpy(dtype=float) if column in features else np.zeros(count))
+              for column in SCORE_FEATURES}
+    categories = None
+    if 'employment_type' in features:
+        employment = pd.Categorical(features['employment_type'])
+        inputs['employment_type'], categories = employment.codes, employment.categories
+    outputs = {'risk_score': np.float64, 'risk_band': np.int8, 'risk_factors': np.uint8}
+
+    segments = {}
+    try:
+        for key, values in inputs.items():
+            segments[key] = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(count, dtype=values.dtype, buffer=segments[key].buf)[:] = values
+        for key, dtype in outputs.items():
+            segments[key] = shared_memory.SharedMemory(create=True, size=max(count * np.dtype(dtype).itemsize, 1))
+        dtypes = {key: values.dtype.str for key, values in inputs.items()}
+        dtypes.update({key: np.dtype(dtype).str for key, dtype in outputs.items()})
+        blocks = {key: (segment.name, dtypes[key], count) for key, segment in segments.items()}
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = [pool.submit(_score_chunk, blocks, start, min(start + chunk_rows, count), scorer, thresholds,
+                                  categories) for start in range(0, count, chunk_rows)]
+            for chunk in chunks:
+                chunk.result()
+
+        results = {key: np.ndarray(count, dtype=dtypes[key], buffer=segments[key].buf).copy() for key in outputs}
+    finally:
+        _close(segments.values())
+        for segment in segments.values():
+            segment.unlink()
+
+    index = features.index
+    return pd.DataFrame({
+        'risk_score': pd.Series(results['risk_score'], index=index),
+        'risk_band': pd.Series(_categorical(results['risk_band'], RISK_BANDS, ordered=True), index=index),
+        'risk_factors': pd.Series(results['risk_factors'], index=index)
+    })
+
+def score_features(features, scorer=None, thresholds=None, workers=1, chunk_rows=SCORE_CHUNK_ROWS,
+                   min_rows=PARALLEL_MIN_ROWS):
+    """``risk_score``, ``risk_band`` and the ``risk_factors`` bitmask (see
+    ``core.factors``) for a frame of ``borrower_features``, keeping its index
+
+    Frames are scored in this process by default. Batch callers opt in to a pool with
+    ``workers`` above one (None for one process per core): frames of at least
+    ``min_rows`` rows are then scored by that many processes over shared memory,
+    ``chunk_rows`` at a time.
+    """
+    scorer = scorer or RiskScorer()
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(features) >= max(min_rows, 1):
+        return _score_parallel(features, scorer, thresholds, workers, chunk_rows)
+    scores = scorer.score_frame(features, thresholds)
+    scores['risk_factors'] = risk_factor_mask(
+        scorer.debt_to_income(features['monthly_income'], features['existing_debt'], features['loan_amount']),
+        features['credit_history'], features.get('employment_type'), features['monthly_income'],
+        features['loan_amount'])
+    return scores
+
+def score_book(borrowers, loans, scorer=None, thresholds=None, as_of=None, workers=1):
+    """``score_features`` for every borrower, indexed by ``borrower_id``"""
+    return score_features(borrower_features(borrowers, loans, as_of), scorer, thresholds, workers)
+
+def feature_hashes(features, scorer=None, thresholds=None):
+    """64-bit hash per borrower of its ``borrower_features`` row, salted with the
+    scorer's parameters and the banding thresholds, so a new model or new thresholds
+    change every hash. Signed, to fit an SQLite INTEGER."""
+    scorer = scorer or RiskScorer()
+    salt = repr((sorted(vars(scorer).items()), sorted(risk_thresholds(thresholds).items())))
+    salt = np.uint64(int.from_bytes(hashlib.blake2b(salt.encode(), digest_size=8).digest(), 'little'))
+    rows = pd.util.hash_pandas_object(features, index=False).to_numpy()
+    return (rows ^ salt).view(np.int64)
+
+def score_store(store, scorer=None, thresholds=None, as_of=None, changed_only=False, workers=1):
+    """Score the borrowers in a ``LoanStore`` and save the scores with a timestamp
+
+    Every borrower is scored by default. With ``changed_only``, only borrowers whose
+    ``feature_hashes`` differ from the saved ones (new borrowers, changed balances,
+    income or employment, a month more of history, another model or thresholds) are
+    rescored, and scores of borrowers no longer in the store are removed. Returns a
+    dict with the number ``scored`` and ``unchanged``, ``scored_at``, the band
+    ``counts`` of the borrowers scored and ``seconds`` taken. ``workers`` is passed to
+    ``score_features``.
+    """
+    start = time.perf_counter()
+    borrowers, loans = store.scoring_inputs()
+    features = borrower_features(borrowers, loans, as_of)
+    hashes = feature_hashes(features, scorer, thresholds)
+    unchanged = 0
+    if changed_only:
+        saved = store.score_hashes()
+        known = features.index.isin(saved.index)
+        dirty = ~known | (saved.reindex(features.index, fill_value=0).to_numpy() != hashes)
+        store.delete_scores(saved.index.difference(features.index))
+        features, hashes = features[dirty], hashes[dirty]
+        unchanged = int((~dirty).sum())
+    scores = score_features(features, scorer, thresholds, workers).assign(feature_hash=hashes)
+    scored_at = datetime.now().isoformat(timespec='seconds')
+    if len(scores):
+        store.save_scores(scores, scored_at)
+    counts = scores['risk_band'].value_counts().reindex(RISK_BANDS, fill_value=0)
+    return {
+        'scored': len(scores),
+        'unchanged': unchanged,
+        'scored_at': scored_at,
+        'counts': {band: int(count) for band, count in counts.items()},
+        'seconds': time.perf_counter() - start
+    }
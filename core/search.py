@@ -0,0 +1,240 @@
+"""Incremental prefix and typo-tolerant search over borrower and loan keys
+
+``SearchIndex`` keeps every searchable key (an ID, a name, a phone number) as
+a normalised byte string in one sorted NumPy array, next to the numeric ID of the
+document it belongs to. That array is a flattened trie: the keys starting with a
+prefix are one contiguous slice, found with two binary searches. Typos are covered
+by looking up every single-edit variant of a query term (deletion, transposition,
+substitution, insertion) in one vectorised ``searchsorted`` call. Documents added
+later go to a small pending buffer, searched the same way through its own sorted
+copy, and are merged into the main arrays once it outgrows ``merge_threshold``.
+``sync`` follows a ``LoanStore`` by row ID, and rebuilds from scratch when a bulk
+load starts a new store generation.
+"""
+
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .schema import ID_PREFIXES, decode_ids, encode_ids
+
+ALPHABET = b'abcdefghijklmnopqrstuvwxyz0123456789'
+# Sorts after every normalised character, so prefix + PREFIX_END bounds a prefix range
+PREFIX_END = b'{'
+PHONE_COUNTRY_CODE = '254'
+MIN_FUZZY_LENGTH = 3
+# Which columns feed the index for each store table (see LoanStore.search_rows)
+SEARCH_FIELDS = {
+    'borrowers': ('borrower_id', 'first_name', 'last_name', 'phone'),
+    'loans': ('loan_id', 'first_name', 'last_name')
+}
+
+def normalise(text):
+    """Search form of a key or query term: lowercase ASCII letters and digits only"""
+    return re.sub(rb'[^a-z0-9]', b'', str(text).lower().encode('ascii', 'ignore'))
+
+def _is_id(term):
+    """Whether a normalised term is (the start of) an ID such as borr007; IDs are
+    matched exactly as typed, without typo variants"""
+    return any(term.startswith(prefix.lower().encode()) and term[len(prefix):].isdigit()
+               for prefix in ID_PREFIXES.values())
+
+def _edits(term):
+    """Every string one edit away from ``term``"""
+    splits = [(term[:i], term[i:]) for i in range(len(term) + 1)]
+    letters = [bytes([c]) for c in ALPHABET]
+    variants = {a + b[1:] for a, b in splits if b}
+    variants.update(a + b[1:2] + b[0:1] + b[2:] for a, b in splits if len(b) > 1)
+    variants.update(a + c + b[1:] for a, b in splits if b for c in letters)
+    variants.update(a + c + b for a, b in splits for c in letters)
+    variants.discard(term)
+    return sorted(variants)
+
+def _normalised(values):
+    return pd.Series(values).fillna('').astype(str).str.lower().str.replace(r'[^a-z0-9]', '', regex=True)
+
+def _bytes(values):
+    return np.asarray(values, dtype=object).astype('S')
+
+def _id_numbers(column, values):
+    if not pd.api.types.is_integer_dtype(np.asarray(values).dtype):
+        values = encode_ids(values, ID_PREFIXES[column])
+    return np.asarray(values, dtype=np.int64)
+
+def field_keys(column, values):
+    """Search keys for one column as byte-string arrays: IDs in their zero-padded
+    display form (borr007), normalised names, phone numbers in both international and
+    national (leading 0) form"""
+    if column in ID_PREFIXES:
+        return [_bytes(_normalised(decode_ids(_id_numbers(column, values), ID_PREFIXES[column])))]
+    keys = _normalised(values)
+    if column == 'phone':
+        international = keys.str.startswith(PHONE_COUNTRY_CODE)
+        national = ('0' + keys.str.slice(len(PHONE_COUNTRY_CODE))).where(international, keys)
+        return [_bytes(keys), _bytes(national)]
+    return [_bytes(keys)]
+
+def _range(keys, term):
+    """Slice of the sorted ``keys`` starting with ``term``"""
+    if len(term) >= keys.dtype.itemsize:
+        return 0, 0
+    return int(np.searchsorted(keys, term, 'left')), int(np.searchsorted(keys, term + PREFIX_END, 'left'))
+
+def _fuzzy_ranges(keys, variants):
+    """Non-empty slices of the sorted ``keys`` starting with one of ``variants``"""
+    variants = [variant for variant in variants if len(variant) < keys.dtype.itemsize]
+    if not variants or not len(keys):
+        return []
+    variants = np.array(variants, dtype='S')
+    lows = np.searchsorted(keys, variants, 'left')
+    highs = np.searchsorted(keys, np.char.add(variants, PREFIX_END), 'left')
+    return [(lo, hi) for lo, hi in zip(lows.tolist(), highs.tolist()) if hi > lo]
+
+class SearchIndex:
+    """Prefix and fuzzy search from normalised keys to integer document IDs"""
+
+    def __init__(self, merge_threshold=20000):
+        self.merge_threshold = merge_threshold
+        # Re-entrant, so sync can hold it across its reads and adds
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.version = None
+        self.last_id = 0
+        self._keys = np.array([], dtype='S1')
+        self._docs = np.array([], dtype=np.int64)
+        self._by_doc = np.array([], dtype=np.intp)
+        self._doc_order = np.array([], dtype=np.int64)
+        self._pending = {}
+        self._pending_sorted = None
+
+    def __len__(self):
+        return len(self._keys) + sum(len(keys) for keys in self._pending.values())
+
+    def add(self, docs, keys):
+        """Index ``keys`` (strings, normalised here) for the matching ``docs``"""
+        self._add(np.asarray(docs, dtype=np.int64), np.array([normalise(key) for key in keys], dtype='S'))
+
+    def _add(self, docs, keys):
+        with self._lock:
+            for doc, key in zip(docs.tolist(), keys.tolist()):
+                if key:
+                    self._pending.setdefault(doc, []).append(key)
+            self._pending_sorted = None
+            if len(docs):
+                self.last_id = max(self.last_id, int(docs.max()))
+            if len(self._pending) >= self.merge_threshold:
+                self._merge()
+
+    def add_rows(self, frame, id_column):
+        """Index every column of ``frame`` by ``id_column`` (see ``field_keys``)
+
+        Frames of ``merge_threshold`` rows or more are merged straight into the
+        sorted arrays instead of going through the pending buffer.
+        """
+        docs = _id_numbers(id_column, frame[id_column])
+        keys = np.concatenate([values for column in frame.columns
+                               for values in field_keys(column, frame[column])])
+        owners = np.tile(docs, len(keys) // max(len(docs), 1))
+        if len(frame) < self.merge_threshold:
+            self._add(owners, keys)
+            return
+        with self._lock:
+            self._merge(keys, owners)
+            self.last_id = max(self.last_id, int(docs.max()))
+
+    def _merge(self, keys=None, docs=None):
+        """Fold the pending keys (and any given ones) into the sorted arrays"""
+        pending = [(key, doc) for doc, doc_keys in self._pending.items() for key in doc_keys]
+        new_keys = np.array([key for key, _ in pending] or [b''], dtype='S')
+        new_docs = np.array([doc for _, doc in pending] or [0], dtype=np.int64)
+        if keys is not None:
+            new_keys = np.concatenate([new_keys, keys.astype('S')])
+            new_docs = np.concatenate([new_docs, docs])
+        present = np.char.str_len(new_keys) > 0
+        new_keys, new_docs = new_keys[present], new_docs[present]
+
+        # One spare byte so a full-length key plus PREFIX_END still fits the dtype
+        width = max(self._keys.dtype.itemsize, new_keys.dtype.itemsize + 1)
+        current, new_keys = self._keys.astype(f'S{width}'), new_keys.astype(f'S{width}')
+        order = np.argsort(new_keys, kind='stable')
+        new_keys, new_docs = new_keys[order], new_docs[order]
+        positions = np.searchsorted(current, new_keys)
+        self._keys = np.insert(current, positions, new_keys)
+        self._docs = np.insert(self._docs, positions, new_docs)
+        self._by_doc = np.argsort(self._docs, kind='stable')
+        self._doc_order = self._docs[self._by_doc]
+        self._pending = {}
+        self._pending_sorted = None
+
+    def _pending_tier(self):
+        """The pending keys as a small sorted (keys, docs) pair, rebuilt after adds"""
+        if self._pending_sorted is None:
+            pairs = sorted((key, doc) for doc, doc_keys in self._pending.items() for key in doc_keys)
+            width = max((len(key) for key, _ in pairs), default=0) + 1
+            self._pending_sorted = (np.array([key for key, _ in pairs], dtype=f'S{width}'),
+                                    np.array([doc for _, doc in pairs], dtype=np.int64))
+        return self._pending_sorted
+
+    def _has_prefix(self, doc, term):
+        """Whether any key of ``doc`` starts with ``term``"""
+        if any(key.startswith(term) for key in self._pending.get(doc, ())):
+            return True
+        lo, hi = np.searchsorted(self._doc_order, doc, 'left'), np.searchsorted(self._doc_order, doc, 'right')
+        return any(key.startswith(term) for key in self._keys[self._by_doc[lo:hi]].tolist())
+
+    def search(self, query, limit=20, scan=2000):
+        """Up to ``limit`` document IDs matching ``query``, best first
+
+        Every whitespace-separated term must prefix-match some key of a document.
+        Candidates come from the term with the fewest matches: exact keys first, then
+        other keys with that prefix in key order, then single-edit (typo) matches.
+        At most ``scan`` keys per lookup are examined.
+        """
+        terms = [term for term in (normalise(part) for part in str(query).split()) if term]
+        if not terms:
+            return np.array([], dtype=np.int64)
+        with self._lock:
+            tiers = [(self._keys, self._docs), self._pending_tier()]
+            ranges = {term: [_range(keys, term) for keys, _ in tiers] for term in terms}
+            primary = min(terms, key=lambda term: sum(hi - lo for lo, hi in ranges[term]))
+            others = [term for term in terms if term != primary]
+            found = {}
+
+            def consider(docs):
+                for doc in docs:
+                    if len(found) >= limit:
+                        return
+                    if doc not in found and all(self._has_prefix(doc, term) for term in others):
+                        found[doc] = None
+
+            for (_, docs), (lo, hi) in zip(tiers, ranges[primary]):
+                consider(docs[lo:min(hi, lo + scan)].tolist())
+            if len(found) < limit and len(primary) >= MIN_FUZZY_LENGTH and not _is_id(primary):
+                variants = _edits(primary)
+                for keys, docs in tiers:
+                    for lo, hi in _fuzzy_ranges(keys, variants):
+                        consider(docs[lo:min(hi, lo + limit)].tolist())
+                        if len(found) >= limit:
+                            break
+            return np.fromiter(found, dtype=np.int64, count=len(found))
+
+    def sync(self, store, table):
+        """Index rows of ``table`` ('borrowers' or 'loans') added to ``store`` since the
+        last sync; returns the number of rows added
+
+        A bulk load replaces or rewrites rows in place, so when the store's generation
+        has moved on since the last sync the index is cleared and rebuilt.
+        """
+        with self._lock:
+            version = store.version()
+            if self.version is not None and version.split('.')[0] != self.version.split('.')[0]:
+                self._reset()
+            rows = store.search_rows(table, after=self.last_id)
+            if len(rows):
+                self.add_rows(rows, SEARCH_FIELDS[table][0])
+            self.version = version
+            return len(rows)
@@ -0,0 +1,125 @@
+"""Memory-mapped portfolio snapshots shared across sessions and processes
+
+A snapshot is an uncompressed Arrow IPC file in a snapshot directory, named by its
+version, next to a ``CURRENT`` file holding the name of the live one. Readers
+memory-map the file and wrap it in Arrow-backed pandas columns, so every session and
+worker shares the same OS page cache instead of holding its own copy. Publishing
+writes the new file first and then swaps ``CURRENT`` with ``os.replace``, which is
+atomic; readers see either the old snapshot or the new one, never a partial file.
+"""
+
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+import pandas as pd
+
+DEFAULT_SNAPSHOT_DIR = os.environ.get('SMARTCREDIT_SNAPSHOTS', os.path.join('data', 'snapshots'))
+POINTER_FILE = 'CURRENT'
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+    except ImportError as exc:
+        raise ImportError("Portfolio snapshots require pyarrow (pip install pyarrow)") from exc
+    return pa
+
+def _atomic_write(path, write):
+    """Call ``write(tmp_path)`` then move the result over ``path`` in one step"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def publish_snapshot(frame, directory, version=None, keep=2):
+    """Write ``frame`` as the new current snapshot and return its version
+
+    ``version`` defaults to a UTC timestamp. Only the ``keep`` latest snapshot files
+    (in version order) are kept; processes still mapping an older one keep reading it
+    until they switch.
+    """
+    pa = _pyarrow()
+    os.makedirs(directory, exist_ok=True)
+    version = version or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+    name = f'loans-{version}.arrow'
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+
+    def write_table(tmp_path):
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    def write_pointer(tmp_path):
+        with open(tmp_path, 'w') as pointer:
+            pointer.write(name)
+
+    _atomic_write(os.path.join(directory, name), write_table)
+    _atomic_write(os.path.join(directory, POINTER_FILE), write_pointer)
+
+    for stale in snapshot_versions(directory)[:-keep]:
+        if stale != version:
+            os.unlink(os.path.join(directory, f'loans-{stale}.arrow'))
+    return version
+
+def snapshot_versions(directory):
+    """Versions of the snapshot files present in ``directory``, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(f[len('loans-'):-len('.arrow')] for f in os.listdir(directory)
+                  if f.startswith('loans-') and f.endswith('.arrow'))
+
+def current_version(directory):
+    """Version named by the snapshot directory's ``CURRENT`` file, or None"""
+    try:
+        with open(os.path.join(directory, POINTER_FILE)) as pointer:
+            return pointer.read().strip()[len('loans-'):-len('.arrow')]
+    except FileNotFoundError:
+        return None
+
+def open_snapshot(directory, version=None):
+    """Memory-map a snapshot (the current one by default) as a zero-copy DataFrame
+
+    Columns use ``pd.ArrowDtype`` over the mapped buffers, so opening costs almost no
+    resident memory regardless of the snapshot's size.
+    """
+    pa = _pyarrow()
+    version = version or current_version(directory)
+    if version is None:
+        raise FileNotFoundError(f"No snapshot has been published in {directory}")
+    source = pa.memory_map(os.path.join(directory, f'loans-{version}.arrow'), 'r')
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+class SnapshotHandle:
+    """One shared, lazily refreshed view of the current snapshot
+
+    ``frame()`` re-reads the small ``CURRENT`` file on each call and only maps a new
+    snapshot when the version has changed, so a single handle (for example one held
+    in ``st.cache_resource``) serves every session and follows publishes atomically.
+    It returns the version together with its frame, swapped as one pair, so results
+    computed from the frame can be cached under the version they actually came from.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._current = (None, None)
+        self._lock = threading.Lock()
+
+    def frame(self):
+        """``(version, frame)`` of the current snapshot"""
+        version = current_version(self.directory)
+        if version is None:
+            raise FileNotFoundError(f"No snapshot has been published in {self.directory}")
+        current = self._current
+        if current[0] != version:
+            with self._lock:
+                current = self._current
+                if current[0] != version:
+                    current = (version, open_snapshot(self.directory, version))
+                    self._current = current
+        return current
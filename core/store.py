@@ -0,0 +1,481 @@
+"""Persistent, indexed loan store on an embedded SQLite file
+
+Borrowers, loans and loan events live in one SQLite database with integer IDs (see
+``core.schema``) and indexes on the columns the pages filter by, so lookups such as
+critical loans over 30 DPD are index range scans rather than DataFrame scans. Each
+thread gets its own connection, so one ``LoanStore`` can be shared across Streamlit
+sessions.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .portfolio import NPL_DPD_THRESHOLD, LOAN_EVENT_TYPES
+from .risk import RISK_BANDS
+from .schema import ID_PREFIXES, encode_ids, expand_loans, expand_borrowers
+
+DEFAULT_STORE_PATH = os.environ.get('SMARTCREDIT_DB', os.path.join('data', 'smartcredit.db'))
+
+BORROWER_COLUMNS = ['borrower_id', 'first_name', 'last_name', 'email', 'phone', 'segment', 'employment_type',
+                    'income_band', 'monthly_income', 'region', 'credit_score', 'registration_date']
+LOAN_COLUMNS = ['loan_id', 'borrower_id', 'product_type', 'loan_amount', 'outstanding_balance', 'interest_rate',
+                'term_months', 'days_past_due', 'status', 'risk_band', 'collateral_value', 'origination_date']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS borrowers (
+    borrower_id INTEGER PRIMARY KEY,
+    first_name TEXT, last_name TEXT, email TEXT, phone TEXT,
+    segment TEXT, employment_type TEXT, income_band TEXT, monthly_income REAL,
+    region TEXT, credit_score INTEGER, registration_date TEXT
+);
+CREATE TABLE IF NOT EXISTS loans (
+    loan_id INTEGER PRIMARY KEY,
+    borrower_id INTEGER, product_type TEXT, loan_amount REAL, outstanding_balance REAL,
+    interest_rate REAL, term_months INTEGER, days_past_due INTEGER NOT NULL DEFAULT 0,
+    status TEXT, risk_band TEXT, collateral_value REAL, origination_date TEXT
+);
+CREATE TABLE IF NOT EXISTS loan_events (
+    event_id INTEGER PRIMARY KEY,
+    loan_id INTEGER NOT NULL, event_type TEXT NOT NULL, recorded_at TEXT NOT NULL,
+    amount REAL, days_past_due INTEGER, outstanding_balance REAL, risk_band TEXT, product_type TEXT
+);
+CREATE TABLE IF NOT EXISTS borrower_scores (
+    borrower_id INTEGER PRIMARY KEY,
+    risk_score REAL, risk_band TEXT, risk_factors INTEGER, feature_hash INTEGER, scored_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Columns added after a table was first released, added in place to existing stores
+MIGRATIONS = {
+    'borrower_scores': {'risk_factors': 'INTEGER', 'feature_hash': 'INTEGER'}
+}
+
+# loan_id and borrower_id are INTEGER PRIMARY KEYs (the rowid) and need no extra index
+INDEXES = {
+    'idx_loans_borrower': 'loans (borrower_id)',
+    'idx_loans_risk_dpd': 'loans (risk_band, days_past_due)',
+    'idx_loans_dpd': 'loans (days_past_due)',
+    'idx_loans_status': 'loans (status)',
+    'idx_loans_origination': 'loans (origination_date, days_past_due)',
+    'idx_loans_balance': 'loans (outstanding_balance)',
+    'idx_events_loan': 'loan_events (loan_id)'
+}
+
+# Sort keys offered by loan_page, each the leading column of an index (or the rowid)
+LOAN_SORT_COLUMNS = ('days_past_due', 'outstanding_balance', 'origination_date', 'loan_id')
+
+def _rows(frame, columns):
+    """Plain Python rows for executemany, with dates as ISO strings and IDs as ints"""
+    data = {}
+    for column in columns:
+        values = frame[column]
+        if column in ID_PREFIXES and not pd.api.types.is_integer_dtype(values.dtype):
+            data[column] = encode_ids(values, ID_PREFIXES[column]).tolist()
+        elif pd.api.types.is_datetime64_any_dtype(values.dtype):
+            data[column] = values.dt.strftime('%Y-%m-%d').tolist()
+        else:
+            data[column] = values.astype(object).where(values.notna(), None).tolist()
+    return list(zip(*(data[column] for column in columns)))
+
+def _id_number(value, column):
+    """Stored integer for a LOAN/BORR string ID or a number (NumPy included) already
+    in that form"""
+    if value is None:
+        return value
+    if not isinstance(value, str):
+        return int(value)
+    return int(value[len(ID_PREFIXES[column]):])
+
+class LoanStore:
+    """Borrowers, loans and loan events in an indexed SQLite file"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+            self._create_indexes(conn)
+
+    def connection(self):
+        """This thread's connection to the store"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self, conn):
+        for table, columns in MIGRATIONS.items():
+            present = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+            for column, kind in columns.items():
+                if column not in present:
+                    conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {kind}')
+
+    def _create_indexes(self, conn):
+        for name, target in INDEXES.items():
+            conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {target}')
+
+    def load_book(self, borrowers=None, loans=None, replace=True):
+        """Bulk load borrower and loan frames, replacing existing rows by default
+
+        Indexes are dropped for the load and rebuilt once afterwards, which is much
+        faster than maintaining them row by row.
+        """
+        with self.connection() as conn:
+            # DDL does not open a transaction implicitly; without one a failed load
+            # would leave the indexes dropped
+            conn.execute('BEGIN')
+            for name in INDEXES:
+                conn.execute(f'DROP INDEX IF EXISTS {name}')
+            for table, frame, columns in (('borrowers', borrowers, BORROWER_COLUMNS), ('loans', loans, LOAN_COLUMNS)):
+                if frame is None:
+                    continue
+                if replace:
+                    conn.execute(f'DELETE FROM {table}')
+                columns = [column for column in columns if column in frame.columns]
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    _rows(frame, columns))
+            if replace and loans is not None:
+                conn.execute('DELETE FROM loan_events')
+            self._create_indexes(conn)
+            conn.execute("INSERT INTO store_meta VALUES ('generation', 1) "
+                         'ON CONFLICT (key) DO UPDATE SET value = value + 1')
+            conn.execute('ANALYZE')
+
+    def upsert_loans(self, loans, rebuild_indexes=False):
+        """Insert new loans and update existing ones (matched on ``loan_id``)
+
+        ``loans`` is a frame or an iterable of frames, written in one transaction. Only
+        each frame's store columns are written, and a missing value in an existing
+        loan's row keeps the stored one. ``rebuild_indexes`` drops the indexes for the
+        load and rebuilds them once at the end, as ``load_book`` does, which pays off
+        when the tape is a sizeable part of the book. Returns the number of rows written.
+        """
+        if isinstance(loans, pd.DataFrame):
+            loans = [loans]
+        count = 0
+        with self.connection() as conn:
+            conn.execute('BEGIN')
+            if rebuild_indexes:
+                for name in INDEXES:
+                    conn.execute(f'DROP INDEX IF EXISTS {name}')
+            for chunk in loans:
+                columns = [column for column in LOAN_COLUMNS if column in chunk.columns]
+                updates = ', '.join(f'{column} = COALESCE(excluded.{column}, {column})'
+                                    for column in columns if column != 'loan_id')
+                conn.executemany(
+                    f"INSERT INTO loans ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                    f"ON CONFLICT (loan_id) DO UPDATE SET {updates}",
+                    _rows(chunk, columns))
+                count += len(chunk)
+            if rebuild_indexes:
+                self._create_indexes(conn)
+            conn.execute("INSERT INTO store_meta VALUES ('generation', 1) "
+                         'ON CONFLICT (key) DO UPDATE SET value = value + 1')
+        return count
+
+    def record_events(self, events):
+        """Persist loan events and apply them to the loan rows; returns the number recorded
+
+        Events use the ``PortfolioKPITracker`` format (``type``, ``loan_id`` and the
+        fields for that type); ``loan_id`` may be a LOAN string or its number.
+        """
+        recorded_at = datetime.now().isoformat(timespec='seconds')
+        count = 0
+        with self.connection() as conn:
+            for event in events:
+                kind = event['type']
+                if kind not in LOAN_EVENT_TYPES:
+                    raise ValueError(f"Unknown loan event type: {kind}")
+                loan_id = _id_number(event['loan_id'], 'loan_id')
+                conn.execute(
+                    'INSERT INTO loan_events (loan_id, event_type, recorded_at, amount, days_past_due, '
+                    'outstanding_balance, risk_band, product_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (loan_id, kind, recorded_at, event.get('amount'), event.get('days_past_due'),
+                     event.get('outstanding_balance'), event.get('risk_band'), event.get('product_type')))
+                if kind == 'disbursement':
+                    conn.execute(
+                        'INSERT INTO loans (loan_id, borrower_id, product_type, loan_amount, outstanding_balance, '
+                        "days_past_due, status, risk_band, origination_date) VALUES (?, ?, ?, ?, ?, 0, 'Active', ?, ?)",
+                        (loan_id, _id_number(event.get('borrower_id'), 'borrower_id'), event['product_type'],
+                         event['amount'], event['amount'], event.get('risk_band', 'Low'), recorded_at[:10]))
+                elif kind == 'repayment':
+                    conn.execute('UPDATE loans SET outstanding_balance = MAX(outstanding_balance - ?, 0) '
+                                 'WHERE loan_id = ?', (event['amount'], loan_id))
+                elif kind == 'dpd_change':
+                    conn.execute('UPDATE loans SET days_past_due = ? WHERE loan_id = ?',
+                                 (event['days_past_due'], loan_id))
+                elif kind == 'write_off':
+                    conn.execute("UPDATE loans SET outstanding_balance = 0, status = 'Written Off' "
+                                 'WHERE loan_id = ?', (loan_id,))
+                elif kind == 'restructure':
+                    conn.execute("UPDATE loans SET days_past_due = 0, status = 'Restructured', "
+                                 'outstanding_balance = COALESCE(?, outstanding_balance), '
+                                 'risk_band = COALESCE(?, risk_band) WHERE loan_id = ?',
+                                 (event.get('outstanding_balance'), event.get('risk_band'), loan_id))
+                count += 1
+        return count
+
+    def version(self):
+        """Data version that changes with every bulk load and every recorded event
+
+        Used as the ``core.cache`` key so cached page datasets refresh when the book does.
+        """
+        generation, last_event = self.connection().execute(
+            "SELECT (SELECT value FROM store_meta WHERE key = 'generation'), "
+            '(SELECT MAX(event_id) FROM loan_events)').fetchone()
+        return f'{generation or 0}.{last_event or 0}'
+
+    def query(self, sql, params=()):
+        """Run a read query and return the result as a DataFrame"""
+        return pd.read_sql_query(sql, self.connection(), params=params)
+
+    def count(self, table='loans'):
+        return self.connection().execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    def _where(self, risk_band=None, min_dpd=None, status=None, product_type=None, borrower_id=None, loan_id=None):
+        """WHERE clause and parameters for the loan filters shared by the loan queries"""
+        clauses, params = [], []
+        if loan_id is not None:
+            numbers = [_id_number(value, 'loan_id') for value in ([loan_id] if np.ndim(loan_id) == 0 else loan_id)]
+            clauses.append(f"loan_id IN ({', '.join('?' * len(numbers))})")
+            params.extend(numbers)
+        for column, value in (('risk_band', risk_band), ('status', status), ('product_type', product_type)):
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) else list(value)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        if min_dpd is not None:
+            clauses.append('days_past_due > ?')
+            params.append(min_dpd)
+        if borrower_id is not None:
+            clauses.append('borrower_id = ?')
+            params.append(_id_number(borrower_id, 'borrower_id'))
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def loans(self, risk_band=None, min_dpd=None, status=None, borrower_id=None, limit=None,
+              order_by='days_past_due DESC', borrower_columns=(), product_type=None, offset=None, loan_id=None):
+        """Loans matching every given filter, with LOAN/BORR string IDs
+
+        ``risk_band``, ``status``, ``product_type`` and ``loan_id`` accept one value or a list.
+        Filters map onto the store's indexes, e.g. ``loans(risk_band='Critical',
+        min_dpd=30)`` scans only the matching range of the (risk_band, days_past_due)
+        index. ``borrower_columns`` such as ('segment', 'region') are joined on from
+        each loan's borrower.
+        """
+        where, params = self._where(risk_band, min_dpd, status, product_type, borrower_id, loan_id)
+        sql = 'SELECT loans.*' + ''.join(f', borrowers.{column}' for column in borrower_columns) + ' FROM loans'
+        if borrower_columns:
+            sql += ' LEFT JOIN borrowers USING (borrower_id)'
+        sql += where
+        if order_by:
+            sql += f' ORDER BY {order_by}'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+            if offset:
+                sql += f' OFFSET {int(offset)}'
+        return expand_loans(self.query(sql, params))
+
+    def count_loans(self, **filters):
+        """Number of loans matching the ``loans`` filters, counted on an index"""
+        where, params = self._where(**filters)
+        return self.connection().execute(f'SELECT COUNT(*) FROM loans{where}', params).fetchone()[0]
+
+    def loan_page(self, offset=0, limit=50, sort_by='days_past_due', descending=True,
+                  borrower_columns=(), **filters):
+        """One page of the filtered loan book, sorted in the query
+
+        ``sort_by`` is one of ``LOAN_SORT_COLUMNS``, each backed by an index, with
+        ``loan_id`` breaking ties so pages never overlap.
+        """
+        if sort_by not in LOAN_SORT_COLUMNS:
+            raise ValueError(f"Cannot sort loans by {sort_by}; choose from {', '.join(LOAN_SORT_COLUMNS)}")
+        direction = 'DESC' if descending else 'ASC'
+        order_by = f'loans.{sort_by} {direction}' + (f', loans.loan_id {direction}' if sort_by != 'loan_id' else '')
+        return self.loans(limit=limit, offset=offset, order_by=order_by, borrower_columns=borrower_columns, **filters)
+
+    def borrowers(self, borrower_ids):
+        """Borrower rows for the given IDs (strings or numbers)"""
+        numbers = [_id_number(borrower_id, 'borrower_id') for borrower_id in borrower_ids]
+        sql = f"SELECT * FROM borrowers WHERE borrower_id IN ({', '.join('?' * len(numbers))})"
+        return expand_borrowers(self.query(sql, numbers))
+
+    def borrower_ids(self):
+        """Numbers of every borrower in the store, e.g. to check loans against"""
+        return self.query('SELECT borrower_id FROM borrowers')['borrower_id'].to_numpy()
+
+    def search_rows(self, table, after=0):
+        """ID and name/phone columns of borrowers or loans with an ID above ``after``,
+        in ID order, for ``core.search.SearchIndex``"""
+        if table == 'borrowers':
+            sql = 'SELECT borrower_id, first_name, last_name, phone FROM borrowers WHERE borrower_id > ? ORDER BY borrower_id'
+        elif table == 'loans':
+            sql = ('SELECT loans.loan_id, borrowers.first_name, borrowers.last_name FROM loans '
+                   'LEFT JOIN borrowers USING (borrower_id) WHERE loans.loan_id > ? ORDER BY loans.loan_id')
+        else:
+            raise ValueError(f"No search rows for table {table}")
+        return self.query(sql, (after,))
+
+    def scoring_inputs(self):
+        """Borrower and loan columns ``core.scoring`` needs, read in one transaction"""
+        conn = self.connection()
+        conn.execute('BEGIN')
+        try:
+            borrowers = self.query('SELECT borrower_id, monthly_income, registration_date, employment_type '
+                                   'FROM borrowers')
+            loans = self.query('SELECT borrower_id, outstanding_balance, status FROM loans '
+                               'WHERE borrower_id IS NOT NULL')
+        finally:
+            conn.rollback()
+        return borrowers, loans
+
+    def save_scores(self, scores, scored_at):
+        """Store ``risk_score``, ``risk_band``, ``risk_factors`` and ``feature_hash`` (when
+        present) per borrower from a frame indexed by ``borrower_id``, stamped with ``scored_at``"""
+        frame = scores.reset_index().assign(scored_at=scored_at)
+        columns = [column for column in ('borrower_id', 'risk_score', 'risk_band', 'risk_factors', 'feature_hash',
+                                         'scored_at') if column in frame.columns]
+        with self.connection() as conn:
+            conn.executemany(f"INSERT OR REPLACE INTO borrower_scores ({', '.join(columns)}) "
+                             f"VALUES ({', '.join('?' * len(columns))})", _rows(frame, columns))
+        return len(frame)
+
+    def score_hashes(self):
+        """``feature_hash`` of every saved score that has one, indexed by the integer ``borrower_id``"""
+        hashes = self.query('SELECT borrower_id, feature_hash FROM borrower_scores WHERE feature_hash IS NOT NULL')
+        return hashes.set_index('borrower_id')['feature_hash'].astype('int64')
+
+    def delete_scores(self, borrower_ids):
+        """Remove the saved scores of the given integer borrower IDs; returns the number removed"""
+        with self.connection() as conn:
+            return conn.executemany('DELETE FROM borrower_scores WHERE borrower_id = ?',
+                                    [(int(borrower_id),) for borrower_id in borrower_ids]).rowcount
+
+    def scores(self, borrower_ids=None, factors=None, limit=None):
+        """Saved scores, for every borrower or the given IDs (strings or numbers)
+
+        ``factors`` is a ``core.factors`` bitmask: only borrowers flagged with all of
+        those factors are returned, highest score first.
+        """
+        clauses, params = [], []
+        if borrower_ids is not None:
+            numbers = [_id_number(borrower_id, 'borrower_id') for borrower_id in borrower_ids]
+            clauses.append(f"borrower_id IN ({', '.join('?' * len(numbers))})")
+            params.extend(numbers)
+        if factors:
+            clauses.append('risk_factors & ? = ?')
+            params.extend([factors, factors])
+        sql = 'SELECT * FROM borrower_scores'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        if factors:
+            sql += ' ORDER BY risk_score DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return expand_borrowers(self.query(sql, params))
+
+    def count_scores(self, factors=None):
+        """Number of scored borrowers, optionally only those flagged with every bit of ``factors``"""
+        if not factors:
+            return self.count('borrower_scores')
+        return self.connection().execute('SELECT COUNT(*) FROM borrower_scores WHERE risk_factors & ? = ?',
+                                         (factors, factors)).fetchone()[0]
+
+    def score_distribution(self):
+        """Scored borrowers and their average score per risk band, in ``RISK_BANDS`` order"""
+        counts = self.query('SELECT risk_band, COUNT(*) AS count, AVG(risk_score) AS average_score '
+                            'FROM borrower_scores GROUP BY risk_band')
+        return (counts.set_index('risk_band').reindex(RISK_BANDS, fill_value=0)
+                .rename_axis('risk_band').reset_index())
+
+    def last_scored(self):
+        """Timestamp of the latest saved score, or None"""
+        return self.connection().execute('SELECT MAX(scored_at) FROM borrower_scores').fetchone()[0]
+
+    def risk_distribution(self):
+        """Loan counts per risk band, in ``RISK_BANDS`` order"""
+        counts = self.query('SELECT risk_band, COUNT(*) AS count FROM loans GROUP BY risk_band')
+        return (counts.set_index('risk_band').reindex(RISK_BANDS, fill_value=0)
+                .rename_axis('risk_band').reset_index())
+
+    def at_risk_loans(self, limit=5):
+        """The riskiest open loans (by band, then DPD) with the borrower's name
+
+        Walks the (risk_band, days_past_due) index from Critical down and stops once
+        ``limit`` loans are found, so no sort over the book is needed.
+        """
+        found = []
+        for band in reversed(RISK_BANDS):
+            # The first band is always queried, so a zero limit still gives the columns
+            remaining = max(limit - sum(len(frame) for frame in found), 0)
+            if found and not remaining:
+                break
+            found.append(self.query(
+                "SELECT l.loan_id, l.borrower_id, b.first_name || ' ' || b.last_name AS borrower, "
+                'l.outstanding_balance, l.days_past_due, l.risk_band FROM loans l '
+                'LEFT JOIN borrowers b ON b.borrower_id = l.borrower_id '
+                "WHERE l.risk_band = ? AND l.status NOT IN ('Closed', 'Written Off') "
+                'ORDER BY l.days_past_due DESC LIMIT ?', (band, remaining)))
+        return expand_loans(pd.concat(found, ignore_index=True))
+
+    def risk_positions(self):
+        """Ranking inputs for every loan with the borrower's name and region, and the
+        store version they reflect (read in one transaction), for ``core.ranking``"""
+        conn = self.connection()
+        conn.execute('BEGIN')
+        try:
+            version = self.version()
+            positions = self.query(
+                "SELECT l.loan_id, l.borrower_id, b.first_name || ' ' || b.last_name AS borrower, b.region, "
+                'l.product_type, l.outstanding_balance, l.days_past_due, l.risk_band, l.status FROM loans l '
+                'LEFT JOIN borrowers b ON b.borrower_id = l.borrower_id')
+        finally:
+            conn.rollback()
+        return positions, version
+
+    def events(self, after=0):
+        """Loan events recorded after event ID ``after``, oldest first, and the store version
+
+        Events are dicts in the ``PortfolioKPITracker`` format with the loan's borrower
+        ID, name and region attached; fields the event did not set are left out.
+        """
+        conn = self.connection()
+        conn.execute('BEGIN')
+        try:
+            version = self.version()
+            rows = self.query(
+                'SELECT e.event_type AS type, e.loan_id, e.amount, e.days_past_due, e.outstanding_balance, '
+                "e.risk_band, e.product_type, l.borrower_id, b.first_name || ' ' || b.last_name AS borrower, "
+                'b.region FROM loan_events e LEFT JOIN loans l ON l.loan_id = e.loan_id '
+                'LEFT JOIN borrowers b ON b.borrower_id = l.borrower_id WHERE e.event_id > ? ORDER BY e.event_id',
+                (after,))
+        finally:
+            conn.rollback()
+        events = [{key: value for key, value in row.items() if value is not None and value == value}
+                  for row in rows.astype(object).to_dict('records')]
+        return events, version
+
+    def npl_by_origination_month(self, months=12):
+        """NPL ratio (DPD over ``NPL_DPD_THRESHOLD``) of each of the latest origination months"""
+        trend = self.query(
+            "SELECT substr(origination_date, 1, 7) AS month, "
+            f'100.0 * SUM(days_past_due > {NPL_DPD_THRESHOLD}) / COUNT(*) AS npl_ratio '
+            'FROM loans GROUP BY month ORDER BY month DESC LIMIT ?', (months,))
+        return trend.iloc[::-1].reset_index(drop=True)
@@ -3,6 +3,24 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import random
+from core.cache import dataset_cache
+from core.ingest import REQUIRED_COLUMNS, TAPE_MAPPING, ingest_tape
+from core.factors import RISK_FACTORS, decode_factors, describe_factors, factor_bits, risk_factor_mask
+from core.kpi import kpi_delta, previous_version
+from core.models import MODEL_NAMES, assess_application, assessment_cache
+from core.portfolio import aggregate_portfolio
+from core.ranking import AtRiskIndex
+from core.risk import RISK_BANDS, risk_thresholds
+from core.schema import decode_ids
+from core.scoring import score_store
+from core.search import SearchIndex
+from core.snapshot import DEFAULT_SNAPSHOT_DIR
+from core.store import LOAN_SORT_COLUMNS
+from utils.helpers import PRODUCTS, REGIONS, STATUSES, format_currency
+from utils.resources import (HEATMAP_ROWS, get_average_risk_score, get_kpi_deltas, get_loan_store, get_model_registry,
+                             get_portfolio_cube, get_portfolio_snapshot, get_risk_heatmap, get_score_distribution,
+                             publish_portfolio_snapshot)
+from utils.tables import paginated_table
 
 # Page configuration
 st.set_page_config(
@@ -115,30 +133,91 @@ st.markdown("""
 if 'current_page' not in st.session_state:
     st.session_state.current_page = "Dashboard"
 
-# Sample data functions
+# Sample data functions, backed by the persistent loan store and portfolio snapshot
+# (utils.resources)
+def get_portfolio_summary():
+    version, frame = get_portfolio_snapshot().frame()
+    return dataset_cache.get('portfolio_summary', version, lambda: aggregate_portfolio(frame))
+
+def count_loans(**filters):
+    store = get_loan_store()
+    name = ('loan_count', repr(sorted(filters.items())))
+    return dataset_cache.get(name, store.version(), lambda: store.count_loans(**filters))
+
+def get_loan_page(offset, limit, sort_by, descending, **filters):
+    loans = get_loan_store().loan_page(offset, limit, sort_by, descending, borrower_columns=('region',), **filters)
+    return loans[['loan_id', 'borrower_id', 'region', 'product_type', 'outstanding_balance',
+                  'days_past_due', 'risk_band', 'status', 'origination_date']]
+
 def get_sample_npl_data():
-    return pd.DataFrame({
-        'month': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
-        'npl_ratio': [8.5, 8.2, 7.9, 7.7, 7.8, 8.1, 8.4, 8.6, 8.3, 8.0, 7.8, 7.6]
-    })
+    store = get_loan_store()
+    return dataset_cache.get('npl_trend', store.version(), lambda: store.npl_by_origination_month(12))
 
 def get_sample_risk_distribution():
-    return pd.DataFrame({
-        'risk_band': ['Low', 'Medium', 'High', 'Critical'],
-        'count': [845, 287, 89, 26]
-    })
+    store = get_loan_store()
+    return dataset_cache.get('risk_distribution', store.version(), store.risk_distribution)
+
+@st.cache_resource
+def get_at_risk_index():
+    # Maintained top-K of the riskiest loans; sync() replays new loan events into it
+    return AtRiskIndex.from_store(get_loan_store())
 
-def get_sample_at_risk_loans():
+def get_sample_at_risk_loans(region=None, product_type=None):
+    index = get_at_risk_index()
+    index.sync(get_loan_store())
+    loans = index.top(5, region=region, product_type=product_type)
+    critical = loans['risk_band'] == 'Critical'
+    high = loans['risk_band'] == 'High'
     return pd.DataFrame({
-        'Loan ID': ['LN001', 'LN002', 'LN003', 'LN004', 'LN005'],
-        'Borrower': ['John Doe', 'Jane Smith', 'Mike Johnson', 'Sarah Wilson', 'David Brown'],
-        'Risk Score': [92, 87, 84, 79, 76],
-        'Outstanding (KES)': [450000, 280000, 150000, 320000, 185000],
-        'Days Past Due': [45, 32, 28, 15, 12],
-        'Risk Band': ['Critical', 'High', 'High', 'Medium', 'Medium'],
-        'Action Required': ['Immediate Restructure', 'Contact & Restructure', 'Monitor Closely', 'Watch List', 'Watch List']
+        'Loan ID': loans['loan_id'],
+        'Borrower': loans['borrower'],
+        'Outstanding (KES)': loans['outstanding_balance'].round(0),
+        'Days Past Due': loans['days_past_due'],
+        'Risk Band': loans['risk_band'],
+        'Action Required': np.select(
+            [critical, high & (loans['days_past_due'] > 30), high],
+            ['Immediate Restructure', 'Contact & Restructure', 'Monitor Closely'],
+            default='Watch List'
+        )
     })
 
+@st.cache_resource
+def get_search_index(table):
+    # Built once per process; sync() indexes borrowers/loans added to the store since
+    index = SearchIndex()
+    index.sync(get_loan_store(), table)
+    return index
+
+def get_risk_scorer():
+    return get_model_registry().get('risk')
+
+def search_borrowers(query):
+    store = get_loan_store()
+    index = get_search_index('borrowers')
+    index.sync(store, 'borrowers')
+    ids = index.search(query)
+    if not len(ids):
+        return []
+    ids = decode_ids(ids, 'BORR')
+    # Rows deleted since the index last synced are dropped, not raised on
+    borrowers = store.borrowers(ids).set_index('borrower_id')
+    borrowers = borrowers.reindex(pd.Index(ids).intersection(borrowers.index, sort=False))
+    return [f"{borrower_id} - {row.first_name} {row.last_name}" for borrower_id, row in borrowers.iterrows()]
+
+def search_loans(query):
+    store = get_loan_store()
+    index = get_search_index('loans')
+    index.sync(store, 'loans')
+    ids = index.search(query)
+    if not len(ids):
+        return []
+    ids = decode_ids(ids, 'LOAN')
+    loans = store.loans(loan_id=ids, order_by=None, borrower_columns=('first_name', 'last_name'))
+    loans = loans.set_index('loan_id')
+    loans = loans.reindex(pd.Index(ids).intersection(loans.index, sort=False))
+    return [f"{loan_id} - {row.first_name} {row.last_name} ({row.days_past_due} DPD)"
+            for loan_id, row in loans.iterrows()]
+
 # ========== PAGE FUNCTIONS ==========
 
 def dashboard_page():
@@ -147,47 +226,50 @@ def dashboard_page():
     # Quick stats row
     st.markdown('<div class="section-header">📈 Portfolio Overview</div>', unsafe_allow_html=True)
     
+    kpis = get_kpi_deltas()
+    value = kpis['value']
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.metric(
             label="NPL Ratio",
-            value="8.2%",
-            delta="-1.2%",
+            value=f"{value['npl_ratio']:.1f}%",
+            delta=kpi_delta(kpis, 'npl_ratio', '%'),
             delta_color="inverse"
         )
-        st.caption("📊 102 non-performing loans")
+        st.caption(f"📊 {value['npl_count']:,.0f} non-performing loans")
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.metric(
             label="Total Portfolio",
-            value="KES 245.7M",
-            delta="+2.1%"
+            value=format_currency(value['total_outstanding']),
+            delta=kpi_delta(kpis, 'total_outstanding')
         )
-        st.caption("🏦 1,247 active loans")
+        st.caption(f"🏦 {value['open_loans']:,.0f} active loans")
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col3:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.metric(
-            label="Avg. Risk Score",
-            value="62.3",
-            delta="-4.1"
+            label="Avg. Credit Score",
+            value=f"{value['average_credit_score']:.1f}",
+            delta=kpi_delta(kpis, 'average_credit_score')
         )
-        st.caption("📈 Improving trend")
+        trend = kpis.at['average_credit_score', 'change']
+        st.caption("📈 Improving trend" if trend > 0 else "📉 Declining trend" if trend < 0 else "➖ Stable")
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col4:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.metric(
             label="Recovery Rate",
-            value="78.5%",
-            delta="+5.2%"
+            value=f"{value['recovery_rate']:.1f}%",
+            delta=kpi_delta(kpis, 'recovery_rate', '%')
         )
-        st.caption("🎯 Above target (75%)")
+        st.caption("🎯 Above target (75%)" if value['recovery_rate'] >= 75 else "🎯 Below target (75%)")
         st.markdown('</div>', unsafe_allow_html=True)
     
     # Charts Section
@@ -208,7 +290,16 @@ def dashboard_page():
     # At-Risk Loans Table
     st.markdown('<div class="section-header">🚨 High Priority Actions</div>', unsafe_allow_html=True)
     
-    at_risk_loans = get_sample_at_risk_loans()
+    filter_col1, filter_col2 = st.columns(2)
+    with filter_col1:
+        region = st.selectbox("Region", ["All Regions", *REGIONS])
+    with filter_col2:
+        product = st.selectbox("Product", ["All Products", *PRODUCTS])
+    
+    at_risk_loans = get_sample_at_risk_loans(
+        region=None if region == "All Regions" else region,
+        product_type=None if product == "All Products" else product
+    )
     st.dataframe(at_risk_loans, use_container_width=True)
     
     # Recent Activity
@@ -234,10 +325,10 @@ def risk_analysis_page():
     with col1:
         st.subheader("Individual Risk Assessment")
         
-        borrower_id = st.selectbox(
-            "Select Borrower",
-            ["BORR001 - John Doe", "BORR002 - Jane Smith", "BORR003 - Mike Johnson"]
-        )
+        query = st.text_input("Search Borrowers", placeholder="Name, phone number or borrower ID")
+        matches = search_borrowers(query) if query else []
+        borrower_id = st.selectbox("Select Borrower", matches, placeholder="No matching borrowers"
+                                   if query else "Search to find a borrower")
         
         monthly_income = st.number_input("Monthly Income (KES)", value=150000, step=10000)
         existing_debt = st.number_input("Existing Debt (KES)", value=450000, step=10000)
@@ -245,27 +336,29 @@ def risk_analysis_page():
         employment_type = st.selectbox("Employment Type", ["Salaried", "Business Owner", "Self-Employed"])
         credit_history = st.slider("Credit History (Months)", 0, 120, 36)
         
+        if borrower_id:
+            saved = get_loan_store().scores([borrower_id.split(' - ')[0]])
+            if len(saved):
+                st.caption(f"Book score: {saved['risk_score'].iloc[0]:.1f} ({saved['risk_band'].iloc[0]}), "
+                           f"scored {saved['scored_at'].iloc[0]}")
+        
         if st.button("Assess Risk", type="primary"):
             st.success("Risk assessment completed!")
             
-            # Calculate risk score
-            debt_to_income = (existing_debt + loan_amount) / (monthly_income * 12) * 100
-            risk_score = min(100, max(20, debt_to_income + (120 - credit_history) * 0.5))
+            # Score with the active risk model; repeat inputs come from the assessment cache
+            assessment = assess_application(monthly_income, existing_debt, loan_amount, credit_history,
+                                            st.session_state.get('risk_thresholds'), get_model_registry())
+            debt_to_income = assessment['debt_to_income']
             
-            st.metric("Risk Score", f"{risk_score:.1f}/100")
+            st.metric("Risk Score", f"{assessment['risk_score']:.1f}/100")
+            st.write(f"**Risk Band:** {assessment['risk_band']}")
             
             # Risk factors
             st.subheader("Key Risk Factors")
-            risk_factors = []
+            factor_mask = risk_factor_mask(debt_to_income, credit_history, employment_type, monthly_income,
+                                           loan_amount)
             
-            if debt_to_income > 50:
-                risk_factors.append(f"High debt-to-income ratio ({debt_to_income:.1f}%)")
-            if credit_history < 24:
-                risk_factors.append("Limited credit history")
-            if employment_type == "Self-Employed":
-                risk_factors.append("Variable income source")
-                
-            for factor in risk_factors:
+            for factor in describe_factors(factor_mask, debt_to_income):
                 st.write(f"• {factor}")
     
     with col2:
@@ -275,14 +368,56 @@ def risk_analysis_page():
         risk_data = get_sample_risk_distribution()
         st.bar_chart(risk_data.set_index('risk_band')['count'], height=300)
         
+        # Loans by sector and risk band, coloured by each band's share of the row
+        st.subheader("Portfolio Risk Heatmap")
+        granularity = st.radio("Heatmap rows", list(HEATMAP_ROWS), horizontal=True)
+        heatmap, styles = get_risk_heatmap(HEATMAP_ROWS[granularity])
+        st.dataframe(heatmap.style.apply(lambda _: styles, axis=None), use_container_width=True)
+        
         # Risk metrics
+        scores = get_score_distribution()
+        scored = scores['count'].sum()
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Overall Risk Score", "64.2", "+2.1")
+            overall = get_average_risk_score()
+            st.metric("Overall Risk Score", "Not scored" if overall is None else f"{overall:.1f}")
         with col2:
-            st.metric("High Risk Loans", "89", "+8", delta_color="inverse")
+            high_risk = get_portfolio_cube().totals(risk_band=['High', 'Critical'])['loans']
+            st.metric("High Risk Loans", f"{high_risk:,}", kpi_delta(get_kpi_deltas(), 'high_risk_loans', digits=0),
+                      delta_color="inverse")
         with col3:
             st.metric("Risk Concentration", "28%", "-3%")
+        
+        # Borrower risk scores, written back to the store by the scoring engine
+        st.subheader("Borrower Risk Scores")
+        last_scored = get_loan_store().last_scored()
+        st.caption(f"Last scored {last_scored}" if last_scored else "The book has not been scored yet")
+        if scored:
+            st.bar_chart(scores.set_index('risk_band')['count'], height=250)
+        # Scored in the app process; worker pools are for batch runs (see benchmarks.parallel_scoring)
+        score_col1, score_col2 = st.columns(2)
+        if score_col1.button("Score Entire Book"):
+            with st.spinner("Scoring every borrower..."):
+                result = score_store(get_loan_store(), get_risk_scorer(), st.session_state.get('risk_thresholds'),
+                                     workers=1)
+            st.success(f"Scored {result['scored']:,} borrowers in {result['seconds']:.2f}s")
+        if score_col2.button("Rescore Changed Borrowers"):
+            # Only borrowers whose inputs, model or thresholds changed since their last score
+            with st.spinner("Rescoring changed borrowers..."):
+                result = score_store(get_loan_store(), get_risk_scorer(), st.session_state.get('risk_thresholds'),
+                                     changed_only=True, workers=1)
+            st.success(f"Rescored {result['scored']:,} changed borrowers ({result['unchanged']:,} unchanged) "
+                       f"in {result['seconds']:.2f}s")
+        
+        # Flagged borrowers, found with a bitwise test on the stored factor masks
+        factors = st.multiselect("Borrowers flagged with", list(RISK_FACTORS), format_func=RISK_FACTORS.get)
+        if factors:
+            bits = factor_bits(factors)
+            flagged = get_loan_store().scores(factors=bits, limit=50)
+            st.caption(f"{get_loan_store().count_scores(bits):,} borrowers flagged, highest scores first")
+            st.dataframe(flagged.assign(risk_factors=decode_factors(flagged['risk_factors']))
+                         [['borrower_id', 'risk_score', 'risk_band', 'risk_factors']],
+                         use_container_width=True, hide_index=True)
 
 def restructuring_page():
     st.title("🔄 Loan Restructuring")
@@ -293,10 +428,10 @@ def restructuring_page():
     with col1:
         st.subheader("Restructuring Proposal Generator")
         
-        loan_id = st.selectbox(
-            "Select Loan for Restructuring",
-            ["LN001 - John Doe (45 DPD)", "LN002 - Jane Smith (32 DPD)", "LN045 - Mike Johnson (28 DPD)"]
-        )
+        query = st.text_input("Search Loans", placeholder="Borrower name or loan ID")
+        matches = search_loans(query) if query else []
+        loan_id = st.selectbox("Select Loan for Restructuring", matches, placeholder="No matching loans"
+                               if query else "Search to find a loan")
         
         current_payment = st.number_input("Current Monthly Payment (KES)", value=45000, step=1000)
         borrower_income = st.number_input("Borrower Monthly Income (KES)", value=120000, step=5000)
@@ -354,20 +489,28 @@ def portfolio_page():
     st.title("📊 Portfolio Overview")
     st.markdown("Comprehensive analysis of your loan portfolio performance")
     
+    summary = get_portfolio_summary()
+    cube = get_portfolio_cube()
+    kpis = get_kpi_deltas()
+    
     # Portfolio metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Outstanding", "KES 245.7M", "2.1%")
+        st.metric("Total Outstanding", format_currency(summary['total_outstanding']),
+                  kpi_delta(kpis, 'total_outstanding'))
     
     with col2:
-        st.metric("NPL Ratio", "8.2%", "-1.2%", delta_color="inverse")
+        st.metric("NPL Ratio", f"{summary['npl_ratio']:.1f}%", kpi_delta(kpis, 'npl_ratio', '%'),
+                  delta_color="inverse")
     
     with col3:
-        st.metric("Avg. Days Past Due", "14.2", "+0.8", delta_color="inverse")
+        st.metric("Avg. Days Past Due", f"{cube.totals()['average_dpd']:.1f}", kpi_delta(kpis, 'average_dpd'),
+                  delta_color="inverse")
     
     with col4:
-        st.metric("Recovery Rate", "78.5%", "+5.2%")
+        st.metric("Recovery Rate", f"{kpis.at['recovery_rate', 'value']:.1f}%",
+                  kpi_delta(kpis, 'recovery_rate', '%'))
     
     # Portfolio composition
     st.subheader("Portfolio Composition")
@@ -376,19 +519,38 @@ def portfolio_page():
     
     with col1:
         st.write("**By Sector**")
-        sector_data = pd.DataFrame({
-            'Sector': ['Agriculture', 'Manufacturing', 'Services', 'Retail', 'Tourism', 'Other'],
-            'Value (KES M)': [45.0, 68.0, 55.7, 34.2, 23.8, 19.0]
-        })
-        st.bar_chart(sector_data.set_index('Sector')['Value (KES M)'])
+        sector_data = cube.rollup('segment')
+        st.bar_chart((sector_data['outstanding'] / 1e6).rename('Value (KES M)').rename_axis('Sector'))
     
     with col2:
         st.write("**By Product Type**")
-        product_data = pd.DataFrame({
-            'Product': ['Personal Loans', 'Business Loans', 'Mortgages', 'Auto Loans', 'SME Credit'],
-            'NPL Ratio': [6.2, 9.8, 3.4, 5.1, 11.2]
-        })
-        st.bar_chart(product_data.set_index('Product')['NPL Ratio'])
+        product_data = cube.rollup('product_type')
+        st.bar_chart(product_data['npl_ratio'].rename('NPL Ratio').rename_axis('Product'))
+    
+    # Drill-down: region -> sector -> product, each level a roll-up of the cube
+    st.subheader("Portfolio Drill-Down")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        region = st.selectbox("Region", ["All Regions", *cube.labels('region')])
+    with col2:
+        sector = st.selectbox("Sector", ["All Sectors", *cube.labels('segment')],
+                              disabled=region == "All Regions")
+    
+    if region == "All Regions":
+        level, filters = 'region', {}
+    elif sector == "All Sectors":
+        level, filters = 'segment', {'region': region}
+    else:
+        level, filters = 'product_type', {'region': region, 'segment': sector}
+    drill = cube.rollup(level, **filters)
+    st.dataframe(pd.DataFrame({
+        'Loans': drill['loans'],
+        'Outstanding (KES M)': (drill['outstanding'] / 1e6).round(2),
+        'NPL Ratio (%)': drill['npl_ratio'].round(1),
+        'Avg. DPD': drill['average_dpd'].round(1),
+        'Avg. Credit Score': drill['average_score'].round(0)
+    }), use_container_width=True)
     
     # Performance metrics
     st.subheader("Performance Metrics")
@@ -397,17 +559,51 @@ def portfolio_page():
     npl_data = get_sample_npl_data()
     st.line_chart(npl_data, x='month', y='npl_ratio', height=300)
     
+    # Loan book, paged and sorted in the store so only the visible rows are loaded
+    st.subheader("Loan Book")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        risk_bands = st.multiselect("Risk Band", RISK_BANDS)
+    with col2:
+        statuses = st.multiselect("Status", STATUSES)
+    with col3:
+        products = st.multiselect("Product", PRODUCTS)
+    with col4:
+        min_dpd = st.number_input("DPD above", min_value=0, value=0, step=30)
+    
+    paginated_table(
+        "loan_book", count_loans, get_loan_page, LOAN_SORT_COLUMNS,
+        filters={
+            'risk_band': risk_bands or None,
+            'status': statuses or None,
+            'product_type': products or None,
+            'min_dpd': min_dpd or None
+        },
+        column_labels={
+            'loan_id': 'Loan ID', 'borrower_id': 'Borrower ID', 'region': 'Region', 'product_type': 'Product',
+            'outstanding_balance': 'Outstanding (KES)', 'days_past_due': 'Days Past Due',
+            'risk_band': 'Risk Band', 'status': 'Status', 'origination_date': 'Originated'
+        }
+    )
+    
     # Portfolio statistics
     st.subheader("Portfolio Statistics")
     
     portfolio_stats = pd.DataFrame({
         'Metric': ['Total Loans', 'Average Loan Size', 'Interest Rate', 'Portfolio Duration'],
-        'Value': ['1,247', 'KES 197,000', '14.8%', '2.8 years'],
+        'Value': [f"{summary['total_loans']:,}", format_currency(summary['average_loan_size']), '14.8%', '2.8 years'],
         'Change': ['+18', '-3.2%', '+0.2%', '+0.1 years']
     })
     
     st.dataframe(portfolio_stats, use_container_width=True, hide_index=True)
 
+MODEL_SELECTORS = {
+    'risk': "Active Risk Model Version",
+    'npl_forecast': "NPL Forecast Model",
+    'restructuring': "Restructuring Optimizer"
+}
+
 def admin_page():
     st.title("⚙️ Admin Panel")
     st.markdown("System configuration and management")
@@ -420,8 +616,25 @@ def admin_page():
         col1, col2 = st.columns(2)
         
         with col1:
-            st.selectbox("Active Risk Model Version", ["v2.1.0 (Production)", "v2.0.0", "v1.5.0"])
-            st.selectbox("NPL Forecast Model", ["v1.2.0 (Production)", "v1.1.0"])
+            registry = get_model_registry()
+            selected = {}
+            for kind, label in MODEL_SELECTORS.items():
+                versions = registry.versions(kind)
+                active = registry.active_version(kind)
+                selected[kind] = st.selectbox(label, versions, index=versions.index(active),
+                                              format_func=lambda version, active=active: (
+                                                  f"{version} (Active)" if version == active else version))
+            
+            if st.button("Activate Selected Models"):
+                # Each new version is loaded before the pointer swaps, so scoring never waits on it
+                for kind, version in selected.items():
+                    if version != registry.active_version(kind):
+                        seconds = registry.activate(kind, version)
+                        st.success(f"{MODEL_NAMES[kind]} {version} is now active (pre-warmed in {seconds * 1000:.1f} ms)")
+            loaded = registry.loaded()
+            st.caption("Loaded in this process: " + "; ".join(
+                f"{MODEL_NAMES[kind]} {', '.join(versions)}" for kind, versions in loaded.items()))
+            
             st.number_input("Retraining Frequency (Days)", value=30, min_value=1, max_value=90)
             
             if st.button("Schedule Model Retraining", type="primary"):
@@ -454,6 +667,35 @@ def admin_page():
         
         with col4:
             st.metric("Error Rate", "0.2%", "-0.1%")
+        
+        st.subheader("Dataset Cache")
+        cache_stats = dataset_cache.stats()
+        cache_col1, cache_col2, cache_col3, cache_col4 = st.columns(4)
+        cache_col1.metric("Cache Hits", f"{cache_stats['hits']:,}")
+        cache_col2.metric("Cache Misses", f"{cache_stats['misses']:,}")
+        cache_col3.metric("Hit Rate", f"{cache_stats['hit_rate']:.1f}%")
+        cache_col4.metric("Cached Datasets", cache_stats['entries'])
+        if st.button("Clear Dataset Cache"):
+            st.success(f"Invalidated {dataset_cache.invalidate()} cached datasets")
+        
+        st.subheader("Assessment Cache")
+        assessment_stats = assessment_cache.stats()
+        assess_col1, assess_col2, assess_col3, assess_col4 = st.columns(4)
+        assess_col1.metric("Cache Hits", f"{assessment_stats['hits']:,}")
+        assess_col2.metric("Cache Misses", f"{assessment_stats['misses']:,}")
+        assess_col3.metric("Hit Rate", f"{assessment_stats['hit_rate']:.1f}%")
+        assess_col4.metric("Cached Assessments", f"{assessment_stats['entries']:,} / {assessment_cache.max_entries:,}")
+        st.caption(f"Evictions: {assessment_stats['evictions']} · Expirations: {assessment_stats['expirations']} · "
+                   f"Replaced by a new model version: {assessment_stats['invalidations']}")
+        
+        st.subheader("Portfolio Snapshots")
+        version, _ = get_portfolio_snapshot().frame()
+        kpis = get_kpi_deltas(version)
+        previous = previous_version(DEFAULT_SNAPSHOT_DIR, version)
+        st.caption(f"Current snapshot {version}, compared with {previous or 'no earlier snapshot'}")
+        st.dataframe(kpis, use_container_width=True)
+        if st.button("Publish Snapshot"):
+            st.success(f"Published snapshot {publish_portfolio_snapshot()}")
     
     with tab3:
         st.subheader("System Configuration")
@@ -461,8 +703,9 @@ def admin_page():
         col1, col2 = st.columns(2)
         
         with col1:
-            st.number_input("Risk Score Threshold - Critical", value=80)
-            st.number_input("Risk Score Threshold - High", value=60)
+            st.number_input("Risk Score Threshold - Critical", value=80, key="critical_thresh")
+            st.number_input("Risk Score Threshold - High", value=60, key="high_thresh")
+            st.number_input("Risk Score Threshold - Medium", value=40, key="medium_thresh")
             st.number_input("NPL Alert Threshold (%)", value=10.0)
         
         with col2:
@@ -470,7 +713,12 @@ def admin_page():
             st.number_input("Auto-approval Limit (KES)", value=50000)
         
         if st.button("Save Configuration", type="primary"):
-            st.success("Configuration saved successfully!")
+            # Risk Analysis scoring and banding read the saved thresholds from the session
+            try:
+                st.session_state.risk_thresholds = risk_thresholds(st.session_state)
+                st.success("Configuration saved successfully!")
+            except ValueError:
+                st.error("Risk thresholds must be ordered Critical > High > Medium")
 
 # ========== NEW PAGES 6-11 ==========
 
@@ -517,6 +765,32 @@ def banking_integration_page():
         st.metric("Error Rate", "0.12%", "-0.03%")
     
     st.info("🌐 **Integration Status**: All core systems operating normally with real-time data synchronization")
+    
+    # Loan tape ingestion
+    st.subheader("📥 Loan Tape Ingestion")
+    
+    mapping_data = pd.DataFrame([
+        {'External System': external, 'KCB Field': field, 'Required': '✅' if column in REQUIRED_COLUMNS else ''}
+        for external, (field, column) in TAPE_MAPPING.items()
+    ])
+    st.dataframe(mapping_data, use_container_width=True, hide_index=True)
+    
+    tape = st.file_uploader("Upload Loan Tape", type=["csv", "parquet"])
+    rebuild_indexes = st.checkbox("Rebuild store indexes after the load (faster for large tapes)")
+    if tape is not None and st.button("Ingest Loan Tape", type="primary"):
+        try:
+            with st.spinner("Ingesting loan tape..."):
+                result = ingest_tape(tape, get_loan_store(), rebuild_indexes=rebuild_indexes)
+        except ValueError as exc:
+            st.error(str(exc))
+        else:
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Rows Read", f"{result['rows']:,}")
+            col2.metric("Loans Loaded", f"{result['loaded']:,}")
+            col3.metric("Rows Rejected", f"{len(result['rejected']):,}")
+            col4.metric("Throughput", f"{result['rows_per_second']:,.0f} rows/s")
+            if len(result['rejected']):
+                st.dataframe(result['rejected'].head(100), use_container_width=True, hide_index=True)
 
 def early_warning_page():
     st.title("🚨 AI-Powered Early Warning System")
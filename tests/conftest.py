@@ -0,0 +1,10 @@
+"""Point the app's persistent store, snapshots and model registry at a scratch
+directory before anything imports ``core``, so tests never touch ``data/``"""
+
+import os
+import tempfile
+
+_DATA_DIR = tempfile.mkdtemp(prefix='smartcredit-tests-')
+os.environ.setdefault('SMARTCREDIT_DB', os.path.join(_DATA_DIR, 'loans.db'))
+os.environ.setdefault('SMARTCREDIT_SNAPSHOTS', os.path.join(_DATA_DIR, 'snapshots'))
+os.environ.setdefault('SMARTCREDIT_MODELS', os.path.join(_DATA_DIR, 'models'))
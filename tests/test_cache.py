@@ -0,0 +1,72 @@
+"""DatasetCache hits, version invalidation, TTL expiry and LRU eviction"""
+
+import pandas as pd
+
+from core.cache import DatasetCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def counted(value):
+    calls = []
+
+    def compute():
+        calls.append(value)
+        return value
+
+    return compute, calls
+
+
+def test_same_version_is_computed_once():
+    cache = DatasetCache()
+    compute, calls = counted('summary')
+    assert cache.get('summary', 1, compute) == cache.get('summary', 1, compute) == 'summary'
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_new_version_replaces_the_old_entry():
+    cache = DatasetCache()
+    cache.get('summary', 1, lambda: 'old')
+    cache.get('other', 1, lambda: 'kept')
+    assert cache.get('summary', 2, lambda: 'new') == 'new'
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_entries_expire_after_the_ttl():
+    clock = Clock()
+    cache = DatasetCache(ttl=10, clock=clock)
+    compute, calls = counted('value')
+    cache.get('summary', 1, compute)
+    clock.now = 11
+    cache.get('summary', 1, compute)
+    assert len(calls) == 2
+    assert cache.stats()['expirations'] == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = DatasetCache(max_entries=2)
+    cache.get('a', 1, lambda: 'a')
+    cache.get('b', 1, lambda: 'b')
+    cache.get('a', 1, lambda: 'a')
+    cache.get('c', 1, lambda: 'c')
+    compute, calls = counted('b')
+    cache.get('b', 1, compute)
+    assert calls == ['b']
+    assert cache.stats()['evictions'] == 2
+
+
+def test_size_limit_keeps_the_newest_entry():
+    cache = DatasetCache(max_bytes=1)
+    frame = pd.DataFrame({'value': range(1000)})
+    cache.get('a', 1, lambda: frame)
+    assert cache.get('b', 1, lambda: frame) is frame
+    assert cache.stats()['entries'] == 1
+    assert cache.invalidate() == 1
@@ -0,0 +1,41 @@
+"""Portfolio cube roll-ups against pandas groupbys of the same book"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.cube import PortfolioCube
+from core.portfolio import NPL_DPD_THRESHOLD
+from utils.helpers import generate_sample_book
+
+
+@pytest.fixture(scope='module')
+def book():
+    borrowers, loans = generate_sample_book(300, 1000, seed=4)
+    return loans.merge(borrowers[['borrower_id', 'segment', 'region', 'credit_score']], on='borrower_id')
+
+
+def test_rollups_match_groupby(book):
+    cube = PortfolioCube(book)
+    for dimension, column in (('segment', 'segment'), ('region', 'region'), ('product_type', 'product_type')):
+        rollup = cube.rollup(dimension)
+        groups = book.groupby(column, observed=True)
+        assert rollup['loans'].to_dict() == groups.size().to_dict()
+        np.testing.assert_allclose(rollup['outstanding'], groups['outstanding_balance'].sum().reindex(rollup.index))
+        npl = groups['days_past_due'].apply(lambda dpd: (dpd > NPL_DPD_THRESHOLD).mean() * 100)
+        np.testing.assert_allclose(rollup['npl_ratio'], npl.reindex(rollup.index))
+
+
+def test_filtered_drill_down(book):
+    cube = PortfolioCube(book)
+    region = cube.labels('region')[0]
+    drill = cube.rollup('segment', region=region)
+    expected = book[book['region'] == region].groupby('segment', observed=True).size()
+    assert drill['loans'].to_dict() == expected.to_dict()
+    assert cube.totals(region=region)['loans'] == expected.sum()
+
+
+def test_chunks_build_the_same_cube(book):
+    whole = PortfolioCube(book).rollup('segment', 'risk_band')
+    chunked = PortfolioCube(book.iloc[i:i + 150] for i in range(0, len(book), 150)).rollup('segment', 'risk_band')
+    pd.testing.assert_frame_equal(whole.sort_index(), chunked.sort_index())
@@ -0,0 +1,33 @@
+"""Risk heatmap counts and cell styles"""
+
+import pandas as pd
+
+from core.cube import PortfolioCube
+from core.heatmap import HEATMAP_STYLES, heatmap_styles, risk_heatmap
+
+RED, GREEN = HEATMAP_STYLES[0], HEATMAP_STYLES[-1]
+
+
+def test_counts_match_crosstab():
+    loans = pd.DataFrame({
+        'segment': ['Retail', 'Retail', 'SME', 'SME', 'SME'],
+        'product_type': ['Mortgage', 'Auto Loan', 'SME Credit', 'SME Credit', 'Mortgage'],
+        'risk_band': ['Low', 'Critical', 'High', 'High', 'Low'],
+        'outstanding_balance': [1.0, 2.0, 3.0, 4.0, 5.0],
+        'days_past_due': [0, 120, 40, 60, 0]
+    })
+    cube = PortfolioCube(loans, dimensions=('segment', 'product_type', 'risk_band'))
+    counts = risk_heatmap(cube)
+    expected = pd.crosstab(loans['segment'], loans['risk_band'])
+    assert counts[expected.columns].equals(expected.rename_axis(columns='risk_band'))
+    assert counts[['Medium']].sum().item() == 0
+
+
+def test_adverse_bands_are_red_when_concentrated():
+    counts = pd.DataFrame({'Low': [90, 5], 'Medium': [5, 5], 'High': [5, 10], 'Critical': [0, 80]},
+                          index=pd.Index(['Healthy', 'Distressed'], name='Sector'))
+    styles = heatmap_styles(counts)
+    assert styles.at['Healthy', 'Low'] == GREEN
+    assert styles.at['Healthy', 'Critical'] == GREEN
+    assert styles.at['Distressed', 'Critical'] == RED
+    assert styles.at['Distressed', 'Low'] == RED
@@ -0,0 +1,56 @@
+"""Loan tape ingestion: rejected rows and their reasons, in process and in a worker pool"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from core.ingest import ingest_tape
+from core.store import LoanStore
+from utils.helpers import generate_sample_book
+
+
+@pytest.fixture
+def store(tmp_path):
+    borrowers, _ = generate_sample_book(5, 1, seed=1)
+    store = LoanStore(str(tmp_path / 'store.db'))
+    store.load_book(borrowers=borrowers)
+    return store
+
+
+def write_tape(tmp_path):
+    tape = pd.DataFrame({
+        'LoanID': ['LOAN000001', 'LOAN000002', 'LN2024-0003', 'LOAN000004', '5', 'LOAN000006', 'LOAN000007'],
+        'ClientID': ['BORR000001', 'BORR000002', 'BORR000001', 'BORR000099', 'BORR000003', 'BORR000004', '2'],
+        'Principal': [1000, 2000, 3000, 4000, 'lots', 6000, 7000],
+        'CurrentBalance': [500, 1500, 2500, 3500, 4500, -1, 6500],
+        'LoanProduct': ['Mortgage'] * 7,
+        'RiskGrade': ['low', 'Medium', 'Low', 'Low', 'Low', 'Low', 'Severe']
+    })
+    path = os.path.join(tmp_path, 'tape.csv')
+    tape.to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_invalid_rows_are_rejected_with_their_reason(store, tmp_path, workers):
+    result = ingest_tape(write_tape(tmp_path), store, workers=workers, chunk_bytes=64)
+    assert result['rows'] == 7
+    assert result['loaded'] == 2
+    assert result['rejected'][['row', 'reason']].values.tolist() == [
+        [3, 'invalid loan_id'],
+        [4, 'unknown borrower_id'],
+        [5, 'non-numeric loan_amount'],
+        [6, 'negative outstanding_balance'],
+        [7, 'unknown risk_band']
+    ]
+    loans = store.loans(order_by='loan_id')
+    assert loans['risk_band'].tolist() == ['Low', 'Medium']
+
+
+def test_missing_required_field_stops_the_load(store, tmp_path):
+    path = os.path.join(tmp_path, 'tape.csv')
+    pd.DataFrame({'LoanID': ['LOAN000001'], 'ClientID': ['BORR000001']}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match='missing required fields'):
+        ingest_tape(path, store)
+    assert store.count() == 0
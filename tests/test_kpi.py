@@ -0,0 +1,57 @@
+"""Portfolio KPIs and their deltas between published snapshots"""
+
+import numpy as np
+import pandas as pd
+
+from core.kpi import compare_kpis, kpi_delta, kpi_versions, portfolio_kpis, snapshot_deltas
+from core.snapshot import publish_snapshot
+
+
+def sample_loans(balances=(100000.0, np.nan, 300000.0, 0.0)):
+    return pd.DataFrame({
+        'loan_id': [1, 2, 3, 4],
+        'loan_amount': [200000.0, 50000.0, 300000.0, 80000.0],
+        'outstanding_balance': list(balances),
+        'interest_rate': [10.0, 20.0, 14.0, np.nan],
+        'days_past_due': [0, 95, 10, 120],
+        'status': ['Active', 'Active', 'Restructured', 'Written Off'],
+        'risk_band': ['Low', 'High', 'Medium', 'Critical']
+    })
+
+
+def test_averages_skip_missing_values():
+    kpis = portfolio_kpis(sample_loans())
+    assert kpis['total_loans'] == 4
+    assert kpis['average_loan_size'] == 400000.0 / 3
+    assert kpis['portfolio_yield'] == (100000.0 * 10 + 300000.0 * 14) / 400000.0
+    assert kpis['npl_ratio'] == 50.0
+    assert np.isnan(kpis['average_credit_score'])
+
+
+def test_deltas_are_relative_or_absolute_per_kpi():
+    previous = portfolio_kpis(sample_loans())
+    current = portfolio_kpis(sample_loans((150000.0, np.nan, 450000.0, 0.0)))
+    deltas = compare_kpis(current, previous)
+    assert deltas.at['total_outstanding', 'delta'] == 50.0
+    assert deltas.at['npl_count', 'delta'] == 0.0
+    assert kpi_delta(deltas, 'total_outstanding') == "+50.0%"
+    assert kpi_delta(deltas, 'npl_count', digits=0) == "+0"
+    assert kpi_delta(compare_kpis(current), 'total_outstanding') is None
+
+
+def test_zero_baseline_has_no_relative_delta():
+    previous = portfolio_kpis(sample_loans((0.0, np.nan, 0.0, 0.0)))
+    deltas = compare_kpis(portfolio_kpis(sample_loans()), previous)
+    assert kpi_delta(deltas, 'total_outstanding') == "n/a"
+    assert np.isnan(deltas.at['total_outstanding', 'change_pct'])
+
+
+def test_snapshot_deltas_outlive_pruned_snapshots(tmp_path):
+    directory = str(tmp_path)
+    for version, scale in (('20240101', 1.0), ('20240201', 2.0), ('20240301', 3.0)):
+        loans = sample_loans()
+        loans['outstanding_balance'] *= scale
+        publish_snapshot(loans, directory, version=version, keep=1)
+        deltas = snapshot_deltas(directory)
+    assert kpi_versions(directory) == ['20240201', '20240301']
+    assert deltas.at['total_outstanding', 'delta'] == 50.0
@@ -0,0 +1,58 @@
+"""Model registry versions, activation and version-keyed assessments"""
+
+import pytest
+
+from core.cache import DatasetCache
+from core.models import ModelRegistry, assess_application
+from core.scoring import RiskScorer
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.register('risk', 'v1.9.0', {'history_weight': 0.5}, activate=True)
+    return registry
+
+
+def test_activation_swaps_the_active_model(registry):
+    registry.register('risk', 'v1.10.0', {'history_weight': 0.25})
+    assert registry.versions('risk') == ['v1.9.0', 'v1.10.0']
+    assert registry.current('risk')[0] == 'v1.9.0'
+    registry.activate('risk', 'v1.10.0')
+    version, scorer = registry.current('risk')
+    assert version == 'v1.10.0'
+    assert isinstance(scorer, RiskScorer) and scorer.history_weight == 0.25
+    assert registry.loaded() == {'risk': ['v1.9.0', 'v1.10.0']}
+
+
+def test_activation_from_another_process_is_followed(registry, tmp_path):
+    other = ModelRegistry(str(tmp_path))
+    other.register('risk', 'v2.0.0', {'history_weight': 1.0}, activate=True)
+    assert registry.get('risk').history_weight == 1.0
+
+
+def test_a_model_that_fails_to_load_never_becomes_active(registry):
+    registry.register('risk', 'v3.0.0', {'no_such_parameter': 1})
+    with pytest.raises(TypeError):
+        registry.activate('risk', 'v3.0.0')
+    assert registry.active_version('risk') == 'v1.9.0'
+
+
+def test_versions_are_immutable_and_kinds_known(registry):
+    with pytest.raises(ValueError, match='already registered'):
+        registry.register('risk', 'v1.9.0', {})
+    with pytest.raises(ValueError, match='Unknown model kind'):
+        registry.register('pricing', 'v1', {})
+    with pytest.raises(FileNotFoundError):
+        registry.current('npl_forecast')
+
+
+def test_assessments_are_cached_per_model_version(registry):
+    cache = DatasetCache()
+    first = assess_application(100000, 500000, 200000, 36, registry=registry, cache=cache)
+    assert assess_application(100000.0, 500000, 200000, 36, registry=registry, cache=cache) == first
+    assert cache.stats()['hits'] == 1
+    registry.register('risk', 'v2.0.0', {'history_weight': 0.0}, activate=True)
+    second = assess_application(100000, 500000, 200000, 36, registry=registry, cache=cache)
+    assert (first['model_version'], second['model_version']) == ('v1.9.0', 'v2.0.0')
+    assert second['risk_score'] < first['risk_score']
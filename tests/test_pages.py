@@ -0,0 +1,33 @@
+"""Streamlit pages run end to end through AppTest"""
+
+import os
+
+import pytest
+
+pytest.importorskip('streamlit')
+from streamlit.testing.v1 import AppTest
+
+PAGES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Pages')
+
+
+def page(name):
+    return os.path.join(PAGES, name)
+
+
+def test_risk_analysis_report_exports_the_heatmap():
+    at = AppTest.from_file(page('2_🔍_Risk_Analysis.py'), default_timeout=120).run()
+    assert not at.exception
+    next(button for button in at.button if button.label == "Generate Risk Analysis Report").click().run()
+    assert not at.exception
+    assert at.get('download_button')
+
+
+def test_dashboard_breakdowns_come_from_the_portfolio_cube():
+    from utils.resources import get_portfolio_cube
+
+    at = AppTest.from_file(page('1_🏠_Dashboard.py'), default_timeout=120).run()
+    assert not at.exception
+    cube = get_portfolio_cube()
+    regions = next(frame.value for frame in at.dataframe if 'Region' in frame.value.columns)
+    assert sorted(regions['Region']) == sorted(cube.labels('region'))
+    assert abs(regions['Portfolio (KES M)'].sum() - cube.totals()['outstanding'] / 1e6) < 1
@@ -0,0 +1,62 @@
+"""PortfolioKPITracker against aggregate_portfolio on books with missing balances"""
+
+import numpy as np
+import pandas as pd
+
+from core.portfolio import PortfolioKPITracker, aggregate_portfolio
+
+
+def sample_loans():
+    return pd.DataFrame({
+        'loan_id': ['L1', 'L2', 'L3', 'L4'],
+        'product_type': ['Mortgage', 'Auto Loan', 'Mortgage', 'SME Credit'],
+        'outstanding_balance': [100000.0, np.nan, 300000.0, np.nan],
+        'days_past_due': [0, 95, 10, 0],
+        'risk_band': ['Low', 'High', 'Medium', 'Low']
+    })
+
+
+def test_missing_balances_match_batch_summary():
+    loans = sample_loans()
+    tracker = PortfolioKPITracker(loans)
+    assert tracker.reconcile(loans) == {}
+    assert tracker.summary()['average_loan_size'] == aggregate_portfolio(loans)['average_loan_size'] == 200000.0
+
+
+def test_events_on_missing_balances_stay_in_sync():
+    loans = sample_loans()
+    tracker = PortfolioKPITracker(loans)
+    tracker.apply_events([
+        {'type': 'repayment', 'loan_id': 'L2', 'amount': 5000},
+        {'type': 'write_off', 'loan_id': 'L4'},
+        {'type': 'repayment', 'loan_id': 'L1', 'amount': 40000},
+        {'type': 'disbursement', 'loan_id': 'L5', 'amount': 250000, 'product_type': 'Mortgage'},
+        {'type': 'restructure', 'loan_id': 'L3', 'outstanding_balance': 150000}
+    ])
+    expected = pd.concat([loans, pd.DataFrame({
+        'loan_id': ['L5'], 'product_type': ['Mortgage'], 'outstanding_balance': [250000.0],
+        'days_past_due': [0], 'risk_band': ['Low']
+    })], ignore_index=True)
+    expected['outstanding_balance'] = [60000.0, np.nan, 150000.0, 0.0, 250000.0]
+    expected.loc[2, 'days_past_due'] = 0
+    assert tracker.reconcile(expected) == {}
+
+
+def test_restructure_from_missing_or_unknown_band():
+    loans = sample_loans()
+    loans['risk_band'] = [np.nan, 'Severe', 'Medium', 'Low']
+    tracker = PortfolioKPITracker(loans)
+    tracker.apply_events([
+        {'type': 'restructure', 'loan_id': 'L1', 'risk_band': 'Medium'},
+        {'type': 'restructure', 'loan_id': 'L2', 'risk_band': 'Low'},
+        {'type': 'restructure', 'loan_id': 'L3', 'risk_band': 'Severe'},
+        {'type': 'disbursement', 'loan_id': 'L5', 'amount': 1000, 'product_type': 'Mortgage', 'risk_band': None}
+    ])
+    expected = pd.concat([loans, pd.DataFrame({
+        'loan_id': ['L5'], 'product_type': ['Mortgage'], 'outstanding_balance': [1000.0],
+        'days_past_due': [0], 'risk_band': [None]
+    })], ignore_index=True)
+    expected['risk_band'] = ['Medium', 'Low', 'Severe', 'Low', None]
+    expected['days_past_due'] = [0, 0, 0, 0, 0]
+    assert tracker.reconcile(expected) == {}
+    assert tracker.summary()['risk_distribution'] == {'Low': 2, 'Medium': 1, 'High': 0, 'Critical': 0}
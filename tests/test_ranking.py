@@ -0,0 +1,69 @@
+"""AtRiskIndex against a full sort of the book, before and after loan events"""
+
+import numpy as np
+import pytest
+
+from core.ranking import AtRiskIndex
+from core.risk import RISK_BANDS
+from core.store import LoanStore
+from utils.helpers import generate_sample_book
+
+
+@pytest.fixture
+def book():
+    borrowers, loans = generate_sample_book(80, 400, seed=7)
+    return borrowers, loans.merge(borrowers[['borrower_id', 'region']], on='borrower_id')
+
+
+def riskiest(loans, n, **filters):
+    loans = loans[~loans['status'].isin(['Closed', 'Written Off'])]
+    for column, value in filters.items():
+        loans = loans[loans[column] == value]
+    band = loans['risk_band'].astype(object).map(RISK_BANDS.index)
+    ranked = loans.assign(band=-band, dpd=-loans['days_past_due']).sort_values(['band', 'dpd', 'loan_id'])
+    return ranked['loan_id'].head(n).tolist()
+
+
+def test_top_matches_a_full_sort(book):
+    _, loans = book
+    index = AtRiskIndex(loans, capacity=8)
+    assert index.top(20)['loan_id'].tolist() == riskiest(loans, 20)
+    region = loans['region'].iloc[0]
+    assert index.top(5, region=region)['loan_id'].tolist() == riskiest(loans, 5, region=region)
+    assert index.top(5, region='Nowhere').empty
+
+
+def test_events_keep_the_ranking_current(book):
+    _, loans = book
+    loans = loans.copy()
+    index = AtRiskIndex(loans, capacity=8)
+    index.top(10)
+    first, second, low = index.top(2)['loan_id'].tolist() + [riskiest(loans, len(loans))[-1]]
+    events = [
+        {'type': 'write_off', 'loan_id': first},
+        {'type': 'restructure', 'loan_id': second, 'risk_band': 'Low'},
+        {'type': 'dpd_change', 'loan_id': low, 'days_past_due': 400}
+    ]
+    assert index.apply_events(events) == 3
+    rows = loans['loan_id'].isin([first, second, low])
+    loans.loc[loans['loan_id'] == first, 'status'] = 'Written Off'
+    loans.loc[loans['loan_id'] == second, ['risk_band', 'days_past_due', 'status']] = ['Low', 0, 'Restructured']
+    loans.loc[loans['loan_id'] == low, 'days_past_due'] = 400
+    assert rows.sum() == 3
+    assert index.top(10)['loan_id'].tolist() == riskiest(loans, 10)
+    assert not index.apply({'type': 'repayment', 'loan_id': 'LOAN999999', 'amount': 1.0})
+
+
+def test_sync_follows_the_store(tmp_path, book):
+    borrowers, loans = book
+    store = LoanStore(str(tmp_path / 'store.db'))
+    store.load_book(borrowers, loans.drop(columns='region'))
+    index = AtRiskIndex.from_store(store)
+    top = index.top(1)['loan_id'].iloc[0]
+    store.record_events([{'type': 'write_off', 'loan_id': top}])
+    assert index.sync(store) == 1
+    assert top not in index.top(10)['loan_id'].tolist()
+    expected = store.at_risk_loans(10)
+    found = index.top(10)
+    assert found['risk_band'].tolist() == expected['risk_band'].tolist()
+    assert np.array_equal(found['days_past_due'], expected['days_past_due'])
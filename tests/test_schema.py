@@ -0,0 +1,46 @@
+"""Compact loan layout: dtypes, round trips and missing counts"""
+
+import numpy as np
+import pandas as pd
+
+from core.schema import COMPACT_TARGET_REDUCTION, compact_loans, decode_ids, expand_loans, memory_footprint
+from core.store import LoanStore
+from utils.helpers import generate_sample_book
+
+
+def test_round_trip_keeps_the_book():
+    _, loans = generate_sample_book(100, 2000, seed=3)
+    legacy = loans.astype({column: object for column in loans.select_dtypes('category').columns})
+    compact = compact_loans(legacy)
+    assert compact['loan_id'].dtype == np.int32
+    assert compact['days_past_due'].dtype == np.int16
+    assert expand_loans(compact)['loan_id'].tolist() == legacy['loan_id'].tolist()
+    assert memory_footprint(legacy, compact).at['total', 'reduction'] >= COMPACT_TARGET_REDUCTION
+
+
+def test_decode_ids_pads_and_handles_empty_arrays():
+    assert decode_ids([7, 1234], 'LOAN').tolist() == ['LOAN007', 'LOAN1234']
+    assert decode_ids(np.array([], dtype=np.int32), 'BORR').tolist() == []
+
+
+def test_missing_days_past_due_and_terms():
+    loans = pd.DataFrame({
+        'loan_id': [1, 2],
+        'days_past_due': [np.nan, 40000.0],
+        'term_months': [np.nan, 24.0]
+    })
+    compact = compact_loans(loans)
+    assert compact['days_past_due'].tolist() == [0, np.iinfo(np.int16).max]
+    assert compact['term_months'].dtype == 'Int16'
+    assert compact['term_months'].isna().tolist() == [True, False]
+
+
+def test_loans_disbursed_through_events_compact(tmp_path):
+    borrowers, loans = generate_sample_book(10, 20, seed=3)
+    store = LoanStore(str(tmp_path / 'store.db'))
+    store.load_book(borrowers, loans)
+    store.record_events([{'type': 'disbursement', 'loan_id': 'LOAN999', 'borrower_id': 'BORR001',
+                          'product_type': 'Personal Loan', 'amount': 5000.0}])
+    compact = compact_loans(store.loans(order_by='loan_id', borrower_columns=('segment', 'region')))
+    assert len(compact) == 21
+    assert compact['term_months'].isna().sum() == 1
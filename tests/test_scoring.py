@@ -0,0 +1,75 @@
+"""Book scoring: saved scores, dirty-hash rescoring and the parallel path"""
+
+import pandas as pd
+import pytest
+
+from core.scoring import RiskScorer, borrower_features, score_features, score_store
+from core.store import LoanStore
+from utils.helpers import generate_sample_book
+
+AS_OF = '2024-06-30'
+
+
+@pytest.fixture
+def book():
+    return generate_sample_book(60, 150, seed=5, as_of=AS_OF)
+
+
+@pytest.fixture
+def store(tmp_path, book):
+    store = LoanStore(str(tmp_path / 'store.db'))
+    store.load_book(*book)
+    return store
+
+
+def open_loan(store):
+    loans = store.loans(status=['Active', 'Delinquent'], order_by='loan_id', limit=1)
+    return loans['loan_id'].iloc[0], loans['borrower_id'].iloc[0]
+
+
+def test_scores_match_the_formula(store, book):
+    borrowers, _ = book
+    result = score_store(store, as_of=AS_OF)
+    assert result['scored'] == len(borrowers) == sum(result['counts'].values())
+    saved = store.scores().set_index('borrower_id')['risk_score'].sort_index()
+    features = borrower_features(*store.scoring_inputs(), as_of=AS_OF)
+    expected = RiskScorer().score_frame(features)['risk_score'].sort_index()
+    assert saved.to_numpy() == pytest.approx(expected.to_numpy())
+
+
+def test_only_changed_borrowers_are_rescored(store):
+    score_store(store, as_of=AS_OF)
+    assert score_store(store, as_of=AS_OF, changed_only=True)['scored'] == 0
+
+    loan_id, borrower_id = open_loan(store)
+    store.record_events([{'type': 'repayment', 'loan_id': loan_id, 'amount': 1000.0}])
+    before = store.scores([borrower_id])['scored_at'].iloc[0]
+    result = score_store(store, as_of=AS_OF, changed_only=True)
+    assert (result['scored'], result['unchanged']) == (1, store.count('borrowers') - 1)
+    assert store.scores([borrower_id])['feature_hash'].notna().all()
+    assert store.scores([borrower_id])['scored_at'].iloc[0] >= before
+
+
+def test_new_thresholds_or_model_rescore_everyone(store):
+    score_store(store, as_of=AS_OF)
+    count = store.count('borrowers')
+    thresholds = {'critical_thresh': 70, 'high_thresh': 50, 'medium_thresh': 30}
+    assert score_store(store, thresholds=thresholds, as_of=AS_OF, changed_only=True)['scored'] == count
+    assert score_store(store, RiskScorer(history_weight=0.4), thresholds, as_of=AS_OF,
+                       changed_only=True)['scored'] == count
+
+
+def test_scores_of_removed_borrowers_are_dropped(store, book):
+    borrowers, loans = book
+    score_store(store, as_of=AS_OF)
+    kept = borrowers.iloc[10:]
+    store.load_book(kept, loans[loans['borrower_id'].isin(kept['borrower_id'])])
+    score_store(store, as_of=AS_OF, changed_only=True)
+    assert store.count('borrower_scores') == len(kept)
+
+
+def test_parallel_scores_match_in_process(store):
+    features = borrower_features(*store.scoring_inputs(), as_of=AS_OF)
+    serial = score_features(features)
+    parallel = score_features(features, workers=2, chunk_rows=16, min_rows=0)
+    pd.testing.assert_frame_equal(parallel, serial)
@@ -0,0 +1,57 @@
+"""Prefix, ID and typo search, and following a loan store"""
+
+from core.schema import decode_ids
+from core.search import SearchIndex
+from core.store import LoanStore
+from utils.helpers import generate_sample_book, generate_sample_borrowers
+
+
+def borrower_index(count=1500):
+    borrowers = generate_sample_borrowers(count, seed=0)[['borrower_id', 'first_name', 'last_name', 'phone']]
+    index = SearchIndex()
+    index.add_rows(borrowers, 'borrower_id')
+    return borrowers, index
+
+
+def found(index, query, limit=20):
+    return decode_ids(index.search(query, limit=limit), 'BORR').tolist()
+
+
+def test_zero_padded_id_prefixes():
+    _, index = borrower_index()
+    assert found(index, 'BORR01') == [f'BORR0{n}' for n in range(10, 20)]
+    assert found(index, 'BORR00') == [f'BORR00{n}' for n in range(1, 10)]
+    assert found(index, 'borr1234') == ['BORR1234']
+    assert all(borrower_id.startswith('BORR0') for borrower_id in found(index, 'BORR0'))
+    assert len(found(index, 'BORR')) == 20
+
+
+def test_names_phones_and_typos():
+    borrowers, index = borrower_index()
+    row = borrowers.iloc[41]
+    assert found(index, f"{row['first_name']} {row['last_name']}")[0] == row['borrower_id']
+    assert row['borrower_id'] in found(index, '0' + str(row['phone'])[4:])
+    typo = row['first_name'][:1] + row['first_name'][2] + row['first_name'][1] + row['first_name'][3:]
+    assert row['borrower_id'] in found(index, typo, limit=50)
+
+
+def test_incremental_adds_are_searchable():
+    _, index = borrower_index(100)
+    index.add([5000, 5000], ['Zebedee', 'Quartermaine'])
+    assert index.search('quarterm').tolist() == [5000]
+
+
+def test_sync_follows_new_rows_and_rebuilds_after_a_bulk_load(tmp_path):
+    store = LoanStore(str(tmp_path / 'loans.db'))
+    borrowers, loans = generate_sample_book(100, 200, seed=1)
+    store.load_book(borrowers, loans)
+    index = SearchIndex()
+    assert index.sync(store, 'borrowers') == 100
+    assert index.sync(store, 'borrowers') == 0
+    assert found(index, 'BORR090') == ['BORR090']
+
+    borrowers, loans = generate_sample_book(50, 80, seed=2)
+    store.load_book(borrowers, loans)
+    assert index.sync(store, 'borrowers') == 50
+    assert found(index, 'BORR090') == []
+    assert index.version == store.version()
@@ -0,0 +1,44 @@
+"""Published portfolio snapshots and the shared handle over them"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from core.schema import compact_loans
+from core.snapshot import SnapshotHandle, current_version, open_snapshot, publish_snapshot, snapshot_versions
+from utils.helpers import generate_sample_book
+
+
+@pytest.fixture
+def loans():
+    return compact_loans(generate_sample_book(20, 100, seed=6)[1])
+
+
+def test_published_frame_reads_back(tmp_path, loans):
+    version = publish_snapshot(loans, str(tmp_path))
+    assert current_version(str(tmp_path)) == version
+    frame = open_snapshot(str(tmp_path))
+    assert frame['loan_id'].tolist() == loans['loan_id'].tolist()
+    assert frame['outstanding_balance'].astype(float).sum() == pytest.approx(loans['outstanding_balance'].sum())
+
+
+def test_only_the_latest_snapshots_are_kept(tmp_path, loans):
+    for version in ('20240101', '20240201', '20240301'):
+        publish_snapshot(loans, str(tmp_path), version=version, keep=2)
+    assert snapshot_versions(str(tmp_path)) == ['20240201', '20240301']
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('.tmp-')]
+
+
+def test_handle_follows_publishes_with_the_matching_version(tmp_path, loans):
+    handle = SnapshotHandle(str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        handle.frame()
+    publish_snapshot(loans, str(tmp_path), version='20240101')
+    first = handle.frame()
+    assert handle.frame() is first
+    publish_snapshot(loans.head(10), str(tmp_path), version='20240201')
+    version, frame = handle.frame()
+    assert (version, len(frame)) == ('20240201', 10)
+    assert len(first[1]) == len(loans)
+    pd.testing.assert_series_equal(first[1]['loan_id'].astype('int32'), loans['loan_id'], check_names=False)
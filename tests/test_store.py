@@ -0,0 +1,76 @@
+"""LoanStore filters, data versions and transactional bulk loads"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.store import INDEXES, LoanStore
+from utils.helpers import generate_sample_book
+
+
+@pytest.fixture
+def book():
+    return generate_sample_book(50, 200, seed=2)
+
+
+@pytest.fixture
+def store(tmp_path, book):
+    store = LoanStore(str(tmp_path / 'store.db'))
+    store.load_book(*book)
+    return store
+
+
+def indexes(store):
+    return {row[0] for row in store.connection().execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def test_filters_match_the_frame(store, book):
+    _, loans = book
+    found = store.loans(risk_band=['High', 'Critical'], min_dpd=30, order_by='loan_id')
+    expected = loans[loans['risk_band'].isin(['High', 'Critical']) & (loans['days_past_due'] > 30)]
+    assert found['loan_id'].tolist() == sorted(expected['loan_id'])
+    assert store.count_loans(risk_band=['High', 'Critical'], min_dpd=30) == len(expected)
+
+
+@pytest.mark.parametrize('loan_id', ['LOAN007', 7, np.int64(7), [np.int64(7)], np.array([7])])
+def test_loan_id_filter_takes_strings_numbers_and_arrays(store, loan_id):
+    assert store.loans(loan_id=loan_id)['loan_id'].tolist() == ['LOAN007']
+
+
+def test_version_changes_with_every_write(store):
+    versions = [store.version()]
+    store.upsert_loans(pd.DataFrame({'loan_id': [1], 'days_past_due': [45]}))
+    versions.append(store.version())
+    store.record_events([{'type': 'repayment', 'loan_id': 'LOAN001', 'amount': 10.0}])
+    versions.append(store.version())
+    assert len(set(versions)) == 3
+
+
+@pytest.mark.parametrize('limit', [0, -3])
+def test_no_at_risk_loans_below_one(store, limit):
+    found = store.at_risk_loans(limit)
+    assert found.empty
+    assert 'borrower' in found.columns
+
+
+def test_at_risk_loans_walk_bands_from_critical(store, book):
+    _, loans = book
+    open_loans = loans[~loans['status'].isin(['Closed', 'Written Off'])].assign(
+        rank=loans['risk_band'].map({'Critical': 0, 'High': 1, 'Medium': 2, 'Low': 3}).astype(int))
+    expected = open_loans.sort_values(['rank', 'days_past_due'], ascending=[True, False]).head(60)
+    found = store.at_risk_loans(60)
+    assert found[['risk_band', 'days_past_due']].astype(object).values.tolist() == \
+        expected[['risk_band', 'days_past_due']].astype(object).values.tolist()
+
+
+@pytest.mark.parametrize('rebuild', [True, False])
+def test_failed_load_rolls_back_with_its_indexes(store, rebuild):
+    before = (store.count(), store.version(), indexes(store))
+    bad = pd.DataFrame({'loan_id': [1, 2], 'days_past_due': [0, object()]})
+    with pytest.raises(Exception):
+        if rebuild:
+            store.upsert_loans(bad, rebuild_indexes=True)
+        else:
+            store.load_book(loans=bad)
+    assert (store.count(), store.version(), indexes(store)) == before
+    assert set(INDEXES) <= before[2]
@@ -8,25 +8,34 @@ __version__ = "1.0.0"
 __author__ = "KCB SmartCredit Team"
 __description__ = "Utility functions for KCB SmartCredit Application"
 
-# Import key functions to make them easily accessible
-from .helpers import (
-    generate_sample_borrowers,
-    generate_sample_loans,
-    calculate_risk_band,
-    format_currency,
-    calculate_debt_to_income,
-    validate_loan_parameters
-)
-
-# List of available functions in this package
-__all__ = [
+# Key functions are loaded from .helpers on first access, so importing the package
+# stays cheap and free of side effects
+_HELPERS = (
     'generate_sample_borrowers',
-    'generate_sample_loans', 
+    'generate_sample_loans',
+    'generate_sample_book',
+    'iter_sample_loans',
+    'write_sample_loan_tape',
+    'open_sample_store',
+    'risk_thresholds',
     'calculate_risk_band',
+    'classify_risk_bands',
     'format_currency',
     'calculate_debt_to_income',
-    'validate_loan_parameters'
-]
+    'validate_loan_parameters',
+    'validate_loan_applications',
+    'calculate_affordability',
+    'calculate_affordability_batch',
+    'aggregate_portfolio',
+    'generate_portfolio_summary',
+    'PortfolioKPITracker'
+)
+
+# List of available functions in this package
+__all__ = list(_HELPERS)
 
-# Package initialization
-print(f"Initializing KCB SmartCredit Utils v{__version__}")
+def __getattr__(name):
+    if name in _HELPERS:
+        from . import helpers
+        return getattr(helpers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,80 +1,206 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import streamlit as st
-
-def generate_sample_borrowers(count=100):
-    """Generate sample borrower data for testing and demonstration"""
-    segments = ['SME', 'Consumer', 'Agriculture', 'Corporate']
-    employment_types = ['Salaried', 'Business Owner', 'Self-Employed', 'Contractor']
-    income_bands = ['Low (<50K)', 'Medium (50K-150K)', 'High (150K-500K)', 'Very High (>500K)']
-    regions = ['Nairobi', 'Coast', 'Central', 'Rift Valley', 'Western', 'Eastern']
-    
-    borrowers = []
-    for i in range(count):
-        income_band = np.random.choice(income_bands)
-        base_income = {
-            'Low (<50K)': np.random.randint(20000, 50000),
-            'Medium (50K-150K)': np.random.randint(50000, 150000),
-            'High (150K-500K)': np.random.randint(150000, 500000),
-            'Very High (>500K)': np.random.randint(500000, 1000000)
-        }[income_band]
-        
-        borrowers.append({
-            'borrower_id': f'BORR{i+1:03d}',
-            'first_name': f'FirstName{i+1}',
-            'last_name': f'LastName{i+1}',
-            'email': f'borrower{i+1}@kcb.com',
-            'phone': f'+2547{np.random.randint(10000000, 99999999)}',
-            'segment': np.random.choice(segments),
-            'employment_type': np.random.choice(employment_types),
-            'income_band': income_band,
-            'monthly_income': base_income,
-            'region': np.random.choice(regions),
-            'credit_score': np.random.randint(300, 850),
-            'registration_date': datetime.now() - timedelta(days=np.random.randint(1, 1000))
-        })
-    
-    return pd.DataFrame(borrowers)
-
-def generate_sample_loans(count=200):
-    """Generate sample loan data for testing and demonstration"""
-    products = ['Personal Loan', 'Business Loan', 'Mortgage', 'Auto Loan', 'SME Credit', 'Emergency Loan']
-    statuses = ['Active', 'Delinquent', 'Restructured', 'Closed', 'Written Off']
-    risk_bands = ['Low', 'Medium', 'High', 'Critical']
-    
-    loans = []
-    for i in range(count):
-        loan_amount = np.random.uniform(50000, 5000000)
-        status = np.random.choice(statuses, p=[0.75, 0.10, 0.05, 0.08, 0.02])
-        
-        loans.append({
-            'loan_id': f'LOAN{i+1:03d}',
-            'borrower_id': f'BORR{np.random.randint(1, 101):03d}',
-            'product_type': np.random.choice(products),
-            'loan_amount': loan_amount,
-            'outstanding_balance': loan_amount * np.random.uniform(0.1, 1.0),
-            'interest_rate': np.random.uniform(8.0, 25.0),
-            'term_months': np.random.choice([12, 24, 36, 48, 60]),
-            'days_past_due': np.random.randint(0, 120) if status in ['Delinquent', 'Restructured'] else 0,
-            'status': status,
-            'risk_band': np.random.choice(risk_bands, p=[0.60, 0.25, 0.10, 0.05]),
-            'collateral_value': loan_amount * np.random.uniform(0.5, 1.5),
-            'origination_date': datetime.now() - timedelta(days=np.random.randint(1, 365*3))
-        })
-    
-    return pd.DataFrame(loans)
-
-def calculate_risk_band(score):
-    """Calculate risk band from numerical score (0-100)"""
-    if score >= 80:
-        return "Critical"
-    elif score >= 60:
-        return "High"
-    elif score >= 40:
-        return "Medium"
+
+from core._columns import _categorical
+# Risk, affordability and portfolio logic lives in the headless core package; it is
+# re-exported here so existing ``utils.helpers`` imports keep working.
+from core.risk import (
+    RISK_BANDS, RISK_THRESHOLDS, VALIDATION_REASONS, VALIDATION_SUGGESTIONS,
+    risk_thresholds, calculate_risk_band, classify_risk_bands, calculate_debt_to_income,
+    validate_loan_parameters, validate_loan_applications, get_risk_color
+)
+from core.affordability import (
+    AFFORDABILITY_STATUSES, AFFORDABILITY_COLORS, AFFORDABILITY_CUTOFFS, INSUFFICIENT_DATA,
+    calculate_affordability, calculate_affordability_batch
+)
+from core.portfolio import (
+    NPL_DPD_THRESHOLD, LOAN_EVENT_TYPES, aggregate_portfolio, generate_portfolio_summary,
+    PortfolioKPITracker
+)
+
+SEGMENTS = ['SME', 'Consumer', 'Agriculture', 'Corporate']
+EMPLOYMENT_TYPES = ['Salaried', 'Business Owner', 'Self-Employed', 'Contractor']
+INCOME_BANDS = ['Low (<50K)', 'Medium (50K-150K)', 'High (150K-500K)', 'Very High (>500K)']
+INCOME_BAND_RANGES = [(20000, 50000), (50000, 150000), (150000, 500000), (500000, 1000000)]
+REGIONS = ['Nairobi', 'Coast', 'Central', 'Rift Valley', 'Western', 'Eastern']
+
+PRODUCTS = ['Personal Loan', 'Business Loan', 'Mortgage', 'Auto Loan', 'SME Credit', 'Emergency Loan']
+STATUSES = ['Active', 'Delinquent', 'Restructured', 'Closed', 'Written Off']
+STATUS_WEIGHTS = [0.75, 0.10, 0.05, 0.08, 0.02]
+RISK_BAND_WEIGHTS = [0.60, 0.25, 0.10, 0.05]
+TERMS = [12, 24, 36, 48, 60]
+# Sample model versions per kind (RiskScorer parameters for 'risk'), oldest first;
+# the last one of each kind starts active
+SAMPLE_MODELS = {
+    'risk': {
+        'v1.5.0': {'history_weight': 0.5, 'full_history': 60, 'floor': 20, 'cap': 100},
+        'v2.0.0': {'history_weight': 0.4, 'full_history': 120, 'floor': 20, 'cap': 100},
+        'v2.1.0': {'history_weight': 0.5, 'full_history': 120, 'floor': 20, 'cap': 100}
+    },
+    'npl_forecast': {'v1.1.0': {}, 'v1.2.0': {}},
+    'restructuring': {'v1.0.0': {}}
+}
+
+def _sequential_ids(prefix, count, start=1):
+    """Build zero-padded IDs such as BORR001 for a contiguous range of row numbers"""
+    numbers = np.arange(start, start + count).astype(str)
+    return np.char.add(prefix, np.char.zfill(numbers, 3)).astype(object)
+
+def _days_before(as_of, days):
+    """Dates ``days`` days before ``as_of`` (today by default) as datetime64 values"""
+    anchor = np.datetime64(pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.today(), 'D')
+    return (anchor - days.astype('timedelta64[D]')).astype('datetime64[ns]')
+
+def generate_sample_borrowers(count=100, seed=None, as_of=None):
+    """Generate sample borrower data for testing and demonstration
+
+    Each column is drawn as one array from ``np.random.default_rng(seed)``, so the same
+    seed and ``as_of`` date always produce the same frame.
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, count + 1).astype(str)
+
+    income_band = rng.integers(0, len(INCOME_BANDS), count)
+    low, high = np.array(INCOME_BAND_RANGES).T
+    monthly_income = rng.integers(low[income_band], high[income_band])
+
+    return pd.DataFrame({
+        'borrower_id': _sequential_ids('BORR', count),
+        'first_name': np.char.add('FirstName', ids).astype(object),
+        'last_name': np.char.add('LastName', ids).astype(object),
+        'email': np.char.add(np.char.add('borrower', ids), '@kcb.com').astype(object),
+        'phone': np.char.add('+2547', rng.integers(10000000, 99999999, count).astype(str)).astype(object),
+        'segment': _categorical(rng.integers(0, len(SEGMENTS), count), SEGMENTS),
+        'employment_type': _categorical(rng.integers(0, len(EMPLOYMENT_TYPES), count), EMPLOYMENT_TYPES),
+        'income_band': _categorical(income_band, INCOME_BANDS, ordered=True),
+        'monthly_income': monthly_income,
+        'region': _categorical(rng.integers(0, len(REGIONS), count), REGIONS),
+        'credit_score': rng.integers(300, 850, count),
+        'registration_date': _days_before(as_of, rng.integers(1, 1000, count))
+    })
+
+def generate_sample_loans(count=200, borrowers=None, seed=None, as_of=None, start=1):
+    """Generate sample loan data for testing and demonstration
+
+    ``borrowers`` is the borrower frame the loans should reference (or a borrower count,
+    100 by default); ``borrower_id`` is returned as a categorical over those IDs.
+    Loan IDs are numbered from ``start``.
+    """
+    rng = np.random.default_rng(seed)
+    if borrowers is None:
+        borrowers = 100
+    if isinstance(borrowers, pd.DataFrame):
+        borrower_ids = borrowers['borrower_id'].astype(object).to_numpy()
     else:
-        return "Low"
+        borrower_ids = _sequential_ids('BORR', borrowers)
+
+    loan_amount = rng.uniform(50000, 5000000, count)
+    status = rng.choice(len(STATUSES), count, p=STATUS_WEIGHTS)
+    in_arrears = np.isin(status, [STATUSES.index('Delinquent'), STATUSES.index('Restructured')])
+
+    return pd.DataFrame({
+        'loan_id': _sequential_ids('LOAN', count, start),
+        'borrower_id': _categorical(rng.integers(0, len(borrower_ids), count), borrower_ids),
+        'product_type': _categorical(rng.integers(0, len(PRODUCTS), count), PRODUCTS),
+        'loan_amount': loan_amount,
+        'outstanding_balance': loan_amount * rng.uniform(0.1, 1.0, count),
+        'interest_rate': rng.uniform(8.0, 25.0, count),
+        'term_months': rng.choice(TERMS, count),
+        'days_past_due': np.where(in_arrears, rng.integers(0, 120, count), 0),
+        'status': _categorical(status, STATUSES),
+        'risk_band': _categorical(rng.choice(len(RISK_BANDS), count, p=RISK_BAND_WEIGHTS), RISK_BANDS, ordered=True),
+        'collateral_value': loan_amount * rng.uniform(0.5, 1.5, count),
+        'origination_date': _days_before(as_of, rng.integers(1, 365*3, count))
+    })
+
+def generate_sample_book(borrower_count=100, loan_count=200, seed=None, as_of=None):
+    """Generate a borrower table and a loan table whose borrower_id values reference it
+
+    Borrowers and loans are drawn from independent child streams of ``seed`` so either
+    table can grow without changing the other.
+    """
+    borrower_seed, loan_seed = np.random.SeedSequence(seed).spawn(2)
+    borrowers = generate_sample_borrowers(borrower_count, seed=borrower_seed, as_of=as_of)
+    loans = generate_sample_loans(loan_count, borrowers=borrowers, seed=loan_seed, as_of=as_of)
+    return borrowers, loans
+
+def iter_sample_loans(count, chunk_size=1000000, borrowers=None, seed=None, as_of=None):
+    """Yield sample loans in frames of at most ``chunk_size`` rows
+
+    Loan IDs run on across chunks and each chunk draws from its own child stream of
+    ``seed``, so the concatenated chunks are reproducible while only one chunk is ever
+    held in memory.
+    """
+    if borrowers is None:
+        borrowers = 100
+    if not isinstance(borrowers, pd.DataFrame):
+        borrowers = pd.DataFrame({'borrower_id': _sequential_ids('BORR', borrowers)})
+
+    chunk_count = -(-count // chunk_size)
+    for i, chunk_seed in enumerate(np.random.SeedSequence(seed).spawn(chunk_count)):
+        offset = i * chunk_size
+        yield generate_sample_loans(min(chunk_size, count - offset), borrowers=borrowers,
+                                    seed=chunk_seed, as_of=as_of, start=offset + 1)
+
+def write_sample_loan_tape(path, count, chunk_size=1000000, partition_cols=('origination_month', 'product_type'),
+                           file_format='parquet', borrowers=None, seed=None, as_of=None):
+    """Stream a sample loan tape to a hive-partitioned Parquet or Arrow IPC dataset
+
+    Chunks from ``iter_sample_loans`` are written as they are generated, so memory use
+    depends on ``chunk_size`` rather than ``count``. An ``origination_month`` column
+    (YYYY-MM) is added for partitioning. The result can be read back with
+    ``pd.read_parquet(path)`` or ``pyarrow.dataset.dataset(path, partitioning='hive')``.
+    Returns the number of rows written.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError as exc:
+        raise ImportError("write_sample_loan_tape requires pyarrow (pip install pyarrow)") from exc
+
+    if file_format not in ('parquet', 'arrow'):
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+    written = 0
+    for i, chunk in enumerate(iter_sample_loans(count, chunk_size, borrowers, seed, as_of)):
+        chunk['origination_month'] = chunk['origination_date'].to_numpy().astype('datetime64[M]').astype(str)
+        ds.write_dataset(
+            pa.Table.from_pandas(chunk, preserve_index=False),
+            path,
+            format='parquet' if file_format == 'parquet' else 'ipc',
+            partitioning=list(partition_cols),
+            partitioning_flavor='hive',
+            basename_template=f'part-{i:05d}-{{i}}.{file_format}',
+            existing_data_behavior='overwrite_or_ignore'
+        )
+        written += len(chunk)
+    return written
+
+def open_sample_store(path=None, borrower_count=1000, loan_count=1247, seed=42):
+    """Open the loan store at ``path`` (``core.store.DEFAULT_STORE_PATH`` by default),
+    seeding it with a sample book the first time it is empty"""
+    from core.store import DEFAULT_STORE_PATH, LoanStore
+
+    store = LoanStore(path or DEFAULT_STORE_PATH)
+    if store.count() == 0:
+        borrowers, loans = generate_sample_book(borrower_count, loan_count, seed=seed)
+        store.load_book(borrowers, loans)
+    return store
+
+def open_sample_registry(registry=None):
+    """The model registry (``core.models.model_registry`` by default), seeding each model
+    kind with the ``SAMPLE_MODELS`` versions the first time it has no active version"""
+    from core.models import model_registry
+
+    registry = registry or model_registry
+    for kind, versions in SAMPLE_MODELS.items():
+        if registry.active_version(kind) is None:
+            for version, params in versions.items():
+                if version not in registry.versions(kind):
+                    registry.register(kind, version, params, description="Sample model")
+            registry.activate(kind, list(versions)[-1])
+    return registry
 
 def format_currency(amount, currency="KES"):
     """Format currency amount with proper formatting"""
@@ -85,98 +211,6 @@ def format_currency(amount, currency="KES"):
     else:
         return f"{currency} {amount:,.0f}"
 
-def calculate_debt_to_income(monthly_debt, monthly_income):
-    """Calculate debt-to-income ratio"""
-    if monthly_income == 0:
-        return float('inf')
-    return (monthly_debt / monthly_income) * 100
-
-def validate_loan_parameters(loan_amount, income, existing_debt=0, term_months=12):
-    """Validate loan parameters and return approval recommendation"""
-    dti = calculate_debt_to_income(existing_debt + (loan_amount / term_months), income)
-    
-    if dti > 60:
-        return {
-            "approved": False,
-            "reason": "Debt-to-income ratio too high",
-            "dti_ratio": f"{dti:.1f}%",
-            "suggestion": "Reduce loan amount or increase income"
-        }
-    elif loan_amount > income * 12:
-        return {
-            "approved": False,
-            "reason": "Loan amount exceeds annual income",
-            "suggestion": "Reduce loan amount"
-        }
-    elif term_months > 60:
-        return {
-            "approved": False,
-            "reason": "Loan term too long",
-            "suggestion": "Maximum term is 60 months"
-        }
-    else:
-        return {
-            "approved": True,
-            "dti_ratio": f"{dti:.1f}%",
-            "message": "Loan parameters are acceptable"
-        }
-
-def get_risk_color(risk_band):
-    """Get color code for risk bands"""
-    color_map = {
-        'Low': '#28a745',
-        'Medium': '#ffc107', 
-        'High': '#fd7e14',
-        'Critical': '#dc3545'
-    }
-    return color_map.get(risk_band, '#6c757d')
-
-def calculate_affordability(monthly_income, monthly_expenses, proposed_payment):
-    """Calculate affordability metrics"""
-    disposable_income = monthly_income - monthly_expenses
-    affordability_ratio = (proposed_payment / disposable_income) * 100 if disposable_income > 0 else 100
-    
-    if affordability_ratio <= 30:
-        status = "Excellent"
-        color = "green"
-    elif affordability_ratio <= 50:
-        status = "Good" 
-        color = "blue"
-    elif affordability_ratio <= 70:
-        status = "Fair"
-        color = "orange"
-    else:
-        status = "Poor"
-        color = "red"
-    
-    return {
-        "disposable_income": disposable_income,
-        "affordability_ratio": affordability_ratio,
-        "status": status,
-        "color": color
-    }
-
-def generate_portfolio_summary(loans_df):
-    """Generate portfolio summary statistics"""
-    total_loans = len(loans_df)
-    total_outstanding = loans_df['outstanding_balance'].sum()
-    avg_loan_size = loans_df['outstanding_balance'].mean()
-    
-    npl_loans = loans_df[loans_df['days_past_due'] > 90]
-    npl_ratio = (len(npl_loans) / total_loans) * 100 if total_loans > 0 else 0
-    
-    risk_distribution = loans_df['risk_band'].value_counts().to_dict()
-    
-    return {
-        "total_loans": total_loans,
-        "total_outstanding": total_outstanding,
-        "average_loan_size": avg_loan_size,
-        "npl_ratio": npl_ratio,
-        "npl_count": len(npl_loans),
-        "risk_distribution": risk_distribution,
-        "product_distribution": loans_df['product_type'].value_counts().to_dict()
-    }
-
 def create_sample_npl_trend():
     """Create sample NPL trend data"""
     months = pd.date_range('2023-01-01', periods=12, freq='M')
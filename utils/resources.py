@@ -0,0 +1,90 @@
+"""Process-wide resources shared by every Streamlit session and page
+
+Each ``get_*`` resource is an ``st.cache_resource``, so ``main.py`` and the standalone
+pages share one instance per process instead of rebuilding it on every rerun.
+Datasets derived from them are cached in ``core.cache.dataset_cache`` by version.
+"""
+
+import streamlit as st
+
+from core.cache import dataset_cache
+from core.cube import PortfolioCube
+from core.heatmap import heatmap_styles, risk_heatmap
+from core.kpi import snapshot_deltas
+from core.schema import compact_loans
+from core.snapshot import DEFAULT_SNAPSHOT_DIR, SnapshotHandle, current_version, publish_snapshot
+from utils.helpers import open_sample_registry, open_sample_store
+
+SNAPSHOT_BORROWER_COLUMNS = ('segment', 'region', 'credit_score')
+
+# Heatmap granularities: row label -> cube dimensions
+HEATMAP_ROWS = {
+    "Sector": ('segment',),
+    "Sector × Product": ('segment', 'product_type')
+}
+
+@st.cache_resource
+def get_loan_store():
+    """The sample-seeded ``LoanStore``, opened once per process"""
+    return open_sample_store()
+
+@st.cache_resource
+def get_model_registry():
+    """The sample-seeded ``ModelRegistry``, with the active models loaded here rather
+    than on the first request"""
+    registry = open_sample_registry()
+    registry.warm()
+    return registry
+
+@st.cache_resource
+def get_portfolio_snapshot():
+    """One memory-mapped snapshot view shared by every session; publishes swap it atomically
+
+    Snapshots from before the borrower columns were added are republished once.
+    """
+    snapshot = SnapshotHandle(DEFAULT_SNAPSHOT_DIR)
+    if current_version(DEFAULT_SNAPSHOT_DIR) is None or 'region' not in snapshot.frame()[1].columns:
+        publish_portfolio_snapshot()
+    return snapshot
+
+def publish_portfolio_snapshot():
+    """Publish the loan store as the new current snapshot and return its version"""
+    loans = get_loan_store().loans(order_by=None, borrower_columns=SNAPSHOT_BORROWER_COLUMNS)
+    return publish_snapshot(compact_loans(loans), DEFAULT_SNAPSHOT_DIR)
+
+def get_portfolio_cube(current=None):
+    """``PortfolioCube`` of the current snapshot, built once per snapshot version
+
+    ``current`` is a ``(version, frame)`` pair already read from the snapshot handle.
+    """
+    version, frame = current or get_portfolio_snapshot().frame()
+    return dataset_cache.get('portfolio_cube', version, lambda: PortfolioCube(frame))
+
+def get_risk_heatmap(rows):
+    """Loan counts by ``rows`` and risk band with their cell styles, computed once per
+    snapshot and granularity"""
+    current = get_portfolio_snapshot().frame()
+
+    def compute():
+        counts = risk_heatmap(get_portfolio_cube(current), rows)
+        counts = counts.rename_axis(index={'segment': 'Sector', 'product_type': 'Product'})
+        return counts, heatmap_styles(counts)
+
+    return dataset_cache.get(('risk_heatmap', rows), current[0], compute)
+
+def get_kpi_deltas(version=None):
+    """KPI values and deltas of a snapshot (the current one by default) against the
+    previous one, computed once per snapshot"""
+    version = version or get_portfolio_snapshot().frame()[0]
+    return dataset_cache.get('kpi_deltas', version, lambda: snapshot_deltas(DEFAULT_SNAPSHOT_DIR, version))
+
+def get_score_distribution():
+    """``LoanStore.score_distribution``, recomputed whenever new scores are saved"""
+    store = get_loan_store()
+    return dataset_cache.get('score_distribution', store.last_scored(), store.score_distribution)
+
+def get_average_risk_score():
+    """Average saved risk score over all scored borrowers, or None before the first scoring run"""
+    scores = get_score_distribution()
+    scored = scores['count'].sum()
+    return float((scores['count'] * scores['average_score']).sum() / scored) if scored else None
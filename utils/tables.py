@@ -0,0 +1,54 @@
+"""Server-side paginated tables for the Streamlit pages
+
+``paginated_table`` shows one page of a large result at a time. It asks its source
+for the matching row count and for the rows of the visible page only, with sorting
+and filtering passed down to the source's query, so a rerun serialises ``page_size``
+rows to the browser however large the underlying table is.
+"""
+
+import math
+
+import streamlit as st
+
+PAGE_SIZES = (25, 50, 100, 250)
+
+def paginated_table(key, count, fetch, sort_columns, filters=None, column_labels=None, page_size=50):
+    """Render a sortable, paginated table and return the page of rows shown
+
+    ``count(**filters)`` returns the number of matching rows and
+    ``fetch(offset, limit, sort_by, descending, **filters)`` one page of them, as
+    ``LoanStore.count_loans`` and ``LoanStore.loan_page`` do. ``key`` namespaces the
+    widget state; the table goes back to the first page whenever the filters, sort
+    order or page size change.
+    """
+    filters = filters or {}
+    column_labels = column_labels or {}
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_by = st.selectbox("Sort by", sort_columns, key=f"{key}_sort",
+                               format_func=lambda column: column_labels.get(column, column))
+    with col2:
+        order = st.selectbox("Order", ["Descending", "Ascending"], key=f"{key}_order")
+    with col3:
+        size = st.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_size",
+                            index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 0)
+
+    total = count(**filters)
+    pages = max(math.ceil(total / size), 1)
+    signature = repr((sorted(filters.items()), sort_by, order, size))
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[f"{key}_page"] = 1
+    st.session_state[f"{key}_page"] = min(st.session_state[f"{key}_page"], pages)
+
+    page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    offset = (page - 1) * size
+    rows = fetch(offset, size, sort_by, order == "Descending", **filters)
+
+    st.dataframe(rows.rename(columns=column_labels), use_container_width=True, hide_index=True)
+    if total:
+        st.caption(f"Rows {offset + 1:,}–{offset + len(rows):,} of {total:,}")
+    else:
+        st.caption("No matching rows")
+    return rows